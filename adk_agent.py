@@ -9,56 +9,52 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from google.adk.agents import LlmAgent
-from src.storage_service import StorageService
+from src.storage_service import get_storage_service
+from src.file_tools import FileTools
+from src.file_search import FileSearcher
+from src.search_index import get_search_index
+from src.file_query import FileQuery
+from src.columnar_cache import get_columnar_cache
 from config.settings import load_settings
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # Initialize storage service globally
 settings = load_settings()
-storage = StorageService(
-    endpoint=settings.minio_endpoint,
-    access_key=settings.minio_access_key,
-    secret_key=settings.minio_secret_key,
-    bucket_name=settings.minio_bucket_name,
-    secure=settings.minio_secure
+storage = get_storage_service(settings)
+file_tools = FileTools(
+    storage,
+    max_read_bytes=settings.read_file_max_bytes,
+    searcher=FileSearcher(
+        storage,
+        max_workers=settings.search_max_workers,
+        max_object_bytes=settings.search_max_file_mb * 1024 * 1024,
+        max_seconds=settings.search_max_seconds
+    ),
+    index=get_search_index(settings, storage),
+    querier=FileQuery(
+        storage,
+        max_json_bytes=settings.search_max_file_mb * 1024 * 1024,
+        columnar=get_columnar_cache(settings, storage)
+    )
 )
 
 
-def read_file(filename: str) -> Dict[str, Any]:
+def read_file(filename: str, offset: int = 0, max_bytes: int = 0) -> Dict[str, Any]:
     """
-    Read a file from storage
+    Read a file from storage, one chunk at a time
+
+    Large files are returned in parts. When the result has a next_offset,
+    call read_file again with offset=next_offset to get the following part.
 
     Args:
         filename: Name of the file to read (e.g., 'document.txt', 'data.csv')
+        offset: Byte offset to start reading from (0 for the beginning)
+        max_bytes: Maximum bytes to return (0 for the default chunk size)
 
     Returns:
-        dict: Result with file content or error
-    """
-    try:
-        file_data = storage.download_file(filename)
-
-        if file_data is None:
-            return {
-                "success": False,
-                "error": f"File '{filename}' not found"
-            }
-
-        try:
-            content = file_data.decode('utf-8')
-        except UnicodeDecodeError:
-            content = f"[Binary file, {len(file_data)} bytes]"
-
-        return {
-            "success": True,
-            "filename": filename,
-            "content": content,
-            "size": len(file_data)
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+        dict: Content chunk, total size and continuation offset, or error
+    """
+    return file_tools.read_file(filename, offset, max_bytes)
 
 
 def write_file(filename: str, content: str) -> Dict[str, Any]:
@@ -72,58 +68,151 @@ def write_file(filename: str, content: str) -> Dict[str, Any]:
     Returns:
         dict: Result with file info or error
     """
-    try:
-        file_data = content.encode('utf-8')
-
-        content_type = "text/plain"
-        if filename.endswith('.json'):
-            content_type = "application/json"
-        elif filename.endswith('.html'):
-            content_type = "text/html"
-        elif filename.endswith('.csv'):
-            content_type = "text/csv"
-
-        result = storage.upload_file(
-            file_data=file_data,
-            object_name=filename,
-            content_type=content_type
-        )
-
-        if result["success"]:
-            return {
-                "success": True,
-                "filename": filename,
-                "size": result["size"],
-                "s3_key": result["s3_key"]
-            }
-        else:
-            return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
-
-
-def list_files() -> Dict[str, Any]:
-    """
-    List all files currently in storage
+    return file_tools.write_file(filename, content)
+
+
+def append_file(filename: str, content: str) -> Dict[str, Any]:
+    """
+    Append text to the end of a file (created if it does not exist)
+
+    Much cheaper than rewriting the whole file with write_file.
+
+    Args:
+        filename: Name of the file to extend (e.g., 'notes.md', 'app.log')
+        content: Text to append (end it with a newline to finish the line)
+
+    Returns:
+        dict: Result with the new file size or error
+    """
+    return file_tools.append_file(filename, content)
+
+
+def patch_file(filename: str, start_line: int, end_line: int, content: str) -> Dict[str, Any]:
+    """
+    Replace a range of lines in a file without rewriting the rest
+
+    Lines are numbered from 1 and the range is inclusive. Use
+    end_line = start_line - 1 to insert before start_line, and empty
+    content to delete the lines.
+
+    Args:
+        filename: Name of the file to edit
+        start_line: First line to replace
+        end_line: Last line to replace
+        content: Replacement lines
+
+    Returns:
+        dict: Result with the new file size and lines replaced, or error
+    """
+    return file_tools.patch_file(filename, start_line, end_line, content)
+
+
+def read_files(filenames: List[str]) -> Dict[str, Any]:
+    """
+    Read several files from storage at once (fetched in parallel)
+
+    Args:
+        filenames: Names of the files to read
+
+    Returns:
+        dict: Per-file read results or error
+    """
+    return file_tools.read_files(filenames)
+
+
+def write_files(filenames: List[str], contents: List[str]) -> Dict[str, Any]:
+    """
+    Write several files to storage at once (uploaded in parallel)
+
+    Args:
+        filenames: Names for the files
+        contents: Content for each file, in the same order as filenames
+
+    Returns:
+        dict: Per-file write results or error
+    """
+    return file_tools.write_files(filenames, contents)
+
+
+def list_files(prefix: str = "", sort_by: str = "name", descending: bool = False) -> Dict[str, Any]:
+    """
+    List files in storage with their size and modification time
+
+    Args:
+        prefix: Only list files whose name starts with this ('' for all files)
+        sort_by: 'name', 'size' or 'last_modified'
+        descending: True for largest / newest first
 
     Returns:
         dict: List of files or error
     """
-    try:
-        files = storage.list_files()
-        return {
-            "success": True,
-            "files": files,
-            "count": len(files)
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return file_tools.list_files(prefix, sort_by, descending)
+
+
+def search_files(pattern: str, prefix: str = "", max_matches: int = 50) -> Dict[str, Any]:
+    """
+    Search the contents of all stored files for a regular expression
+
+    Only the matching lines (with a little surrounding context) are
+    returned, so this is much cheaper than reading every file.
+
+    Args:
+        pattern: Regular expression to search for (e.g., 'TODO', 'error|warning')
+        prefix: Only search files whose name starts with this ('' for all files)
+        max_matches: Maximum number of matching lines to return
+
+    Returns:
+        dict: Matching lines with file name, line number and context, or error
+    """
+    return file_tools.search_files(pattern, prefix, max_matches)
+
+
+def search_index(query: str, limit: int = 10) -> Dict[str, Any]:
+    """
+    Find the files most relevant to some words using the full-text index
+
+    Results are ranked by relevance and include the line numbers where
+    the words appear. Faster than search_files when there are many files;
+    use search_files for exact patterns.
+
+    Args:
+        query: Words to look for (e.g., 'quarterly revenue')
+        limit: Maximum number of files to return
+
+    Returns:
+        dict: Ranked file names with matching terms and line numbers, or error
+    """
+    return file_tools.search_index(query, limit)
+
+
+def query_file(
+    filename: str,
+    columns: str = "",
+    where: str = "",
+    group_by: str = "",
+    aggregates: str = "",
+    order_by: str = "",
+    limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Filter, group and aggregate a CSV, TSV, JSON or JSONL file server-side
+
+    Only the result rows are returned, so use this instead of read_file
+    to answer questions about tabular data.
+
+    Args:
+        filename: Data file to query (e.g., 'sales.csv', 'events.jsonl')
+        columns: Comma-separated columns to return ('' for all)
+        where: Filter in Python syntax, e.g. "price > 10 and lower(status) == 'paid'"
+        group_by: Comma-separated columns to group by
+        aggregates: Comma-separated aggregates, e.g. 'count(*), sum(amount)'
+        order_by: Result column to sort by, optionally followed by 'desc'
+        limit: Maximum number of rows to return
+
+    Returns:
+        dict: Result columns and rows, with the number of rows scanned and matched, or error
+    """
+    return file_tools.query_file(filename, columns, where, group_by, aggregates, order_by, limit)
 
 
 # Create the ADK agent with file tools
@@ -134,20 +223,34 @@ file_agent = LlmAgent(
                 "I can help you create files, read file contents, and list all available files.",
     instruction="""You are a helpful AI assistant with file I/O capabilities.
 
-You have access to three tools:
-1. read_file(filename) - Read the contents of a file
+You have access to these tools:
+1. read_file(filename, offset, max_bytes) - Read a file in chunks; follow next_offset for more
 2. write_file(filename, content) - Create or write a new file
-3. list_files() - List all files in storage
+3. append_file(filename, content) - Add text to the end of a file
+4. patch_file(filename, start_line, end_line, content) - Replace, insert or delete lines in a file
+5. read_files(filenames) - Read several files at once
+6. write_files(filenames, contents) - Write several files at once
+7. list_files(prefix, sort_by, descending) - List files, optionally sorted by size or last_modified
+8. search_files(pattern, prefix, max_matches) - Find lines matching a pattern across files
+9. search_index(query, limit) - Rank files by relevance to some words (fast full-text index)
+10. query_file(filename, columns, where, group_by, aggregates, order_by, limit) - Filter and aggregate a CSV/JSON/JSONL file
 
 When users ask you to:
 - Create, write, or save a file -> use write_file()
+- Add to or edit part of an existing file -> use append_file() / patch_file() instead of rewriting it
 - Read, view, or check a file -> use read_file()
+- Work with more than one file -> use read_files() / write_files() in a single call
 - List, show, or check what files exist -> use list_files()
+- Find which files mention something -> use search_index() for topics, search_files() for exact patterns
+- Answer questions about tabular data (counts, totals, top rows) -> use query_file() instead of reading the file
 
 Always be helpful and execute the file operations as requested.
 After writing a file, confirm what you created.
 When listing files, present them in a user-friendly format.""",
-    tools=[read_file, write_file, list_files]
+    tools=[
+        read_file, write_file, append_file, patch_file, read_files, write_files,
+        list_files, search_files, search_index, query_file
+    ]
 )
 
 
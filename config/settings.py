@@ -3,6 +3,7 @@ Configuration Module
 Loads and validates environment variables
 """
 import os
+import tempfile
 from dataclasses import dataclass
 from dotenv import load_dotenv
 import logging
@@ -28,8 +29,84 @@ class Settings:
     minio_bucket_name: str = "agent-files"
     minio_secure: bool = False
     
+    # MinIO HTTP pool
+    minio_max_connections: int = 20
+    minio_connect_timeout: float = 5.0
+    minio_read_timeout: float = 60.0
+    minio_pool_timeout: float = 30.0
+    minio_max_retries: int = 3
+    minio_backoff_factor: float = 0.2
+    minio_backoff_jitter: float = 0.2
+    minio_tcp_keepalive: bool = True
+    
+    # Streaming uploads
+    upload_part_size_mb: int = 8
+    upload_parallelism: int = 3
+    
+    # At-rest compression
+    storage_compression_enabled: bool = False
+    storage_compression_min_bytes: int = 4096
+    storage_compression_level: int = 3
+    
+    # Content-hash deduplication
+    storage_dedup_enabled: bool = True
+    
+    # Object cache
+    cache_enabled: bool = True
+    cache_memory_mb: int = 64
+    cache_disk_mb: int = 1024
+    cache_memory_object_kb: int = 256
+    cache_dir: str = os.path.join(tempfile.gettempdir(), "agent-file-cache")
+    
+    # Metadata catalog
+    catalog_enabled: bool = True
+    catalog_dir: str = os.path.join(tempfile.gettempdir(), "agent-catalog")
+    catalog_reconcile_seconds: int = 60
+    
+    # Change feed
+    change_feed_bucket_notifications: bool = True
+    change_feed_queue_size: int = 1000
+    
+    # Concurrency
+    storage_max_workers: int = 16
+    agent_max_concurrency: int = 4
+    batch_max_workers: int = 8
+    agent_tool_workers: int = 8
+    
     # Agent Config
     max_file_size_mb: int = 10
+    agent_max_tool_rounds: int = 10
+    read_file_max_bytes: int = 65536
+    
+    # Server-side search
+    search_max_workers: int = 8
+    search_max_file_mb: int = 100
+    search_max_seconds: float = 10.0
+    search_index_enabled: bool = True
+    search_index_dir: str = os.path.join(tempfile.gettempdir(), "agent-search-index")
+    search_index_reconcile_seconds: int = 300
+    
+    # Columnar (Parquet) sidecars for query_file; requires pyarrow
+    columnar_cache_enabled: bool = False
+    columnar_cache_dir: str = os.path.join(tempfile.gettempdir(), "agent-columnar-cache")
+    columnar_max_file_mb: int = 256
+    
+    # Context budget
+    context_max_tokens: int = 100000
+    context_keep_recent_tool_results: int = 2
+    tool_result_max_chars: int = 100000
+    
+    # Chat sessions
+    session_max_count: int = 500
+    session_ttl_seconds: int = 3600
+    session_max_turns: int = 20
+    session_max_memory_mb: int = 128
+    
+    # Tool result memoization
+    tool_memo_enabled: bool = True
+    tool_memo_max_entries: int = 1000
+    tool_memo_max_mb: int = 32
+    tool_memo_ttl_seconds: int = 30
     
     def __post_init__(self):
         """Validate required settings"""
@@ -39,6 +116,8 @@ class Settings:
                 "Please set GOOGLE_API_KEY in .env file. "
                 "Get your key from: https://makersuite.google.com/app/apikey"
             )
+        if self.upload_part_size_mb < 5:
+            raise ValueError("UPLOAD_PART_SIZE_MB must be at least 5 (S3 minimum part size)")
         logger.info("✅ Configuration loaded successfully")
 
 
@@ -52,5 +131,55 @@ def load_settings() -> Settings:
         minio_secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin123"),
         minio_bucket_name=os.getenv("MINIO_BUCKET_NAME", "agent-files"),
         minio_secure=os.getenv("MINIO_SECURE", "False").lower() == "true",
-        max_file_size_mb=int(os.getenv("MAX_FILE_SIZE_MB", "10"))
+        minio_max_connections=int(os.getenv("MINIO_MAX_CONNECTIONS", "20")),
+        minio_connect_timeout=float(os.getenv("MINIO_CONNECT_TIMEOUT", "5")),
+        minio_read_timeout=float(os.getenv("MINIO_READ_TIMEOUT", "60")),
+        minio_pool_timeout=float(os.getenv("MINIO_POOL_TIMEOUT", "30")),
+        minio_max_retries=int(os.getenv("MINIO_MAX_RETRIES", "3")),
+        minio_backoff_factor=float(os.getenv("MINIO_BACKOFF_FACTOR", "0.2")),
+        minio_backoff_jitter=float(os.getenv("MINIO_BACKOFF_JITTER", "0.2")),
+        minio_tcp_keepalive=os.getenv("MINIO_TCP_KEEPALIVE", "True").lower() == "true",
+        upload_part_size_mb=int(os.getenv("UPLOAD_PART_SIZE_MB", "8")),
+        upload_parallelism=int(os.getenv("UPLOAD_PARALLELISM", "3")),
+        storage_compression_enabled=os.getenv("STORAGE_COMPRESSION_ENABLED", "False").lower() == "true",
+        storage_compression_min_bytes=int(os.getenv("STORAGE_COMPRESSION_MIN_BYTES", "4096")),
+        storage_compression_level=int(os.getenv("STORAGE_COMPRESSION_LEVEL", "3")),
+        storage_dedup_enabled=os.getenv("STORAGE_DEDUP_ENABLED", "True").lower() == "true",
+        cache_enabled=os.getenv("CACHE_ENABLED", "True").lower() == "true",
+        cache_memory_mb=int(os.getenv("CACHE_MEMORY_MB", "64")),
+        cache_disk_mb=int(os.getenv("CACHE_DISK_MB", "1024")),
+        cache_memory_object_kb=int(os.getenv("CACHE_MEMORY_OBJECT_KB", "256")),
+        cache_dir=os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent-file-cache")),
+        catalog_enabled=os.getenv("CATALOG_ENABLED", "True").lower() == "true",
+        catalog_dir=os.getenv("CATALOG_DIR", os.path.join(tempfile.gettempdir(), "agent-catalog")),
+        catalog_reconcile_seconds=int(os.getenv("CATALOG_RECONCILE_SECONDS", "60")),
+        change_feed_bucket_notifications=os.getenv("CHANGE_FEED_BUCKET_NOTIFICATIONS", "True").lower() == "true",
+        change_feed_queue_size=int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "1000")),
+        storage_max_workers=int(os.getenv("STORAGE_MAX_WORKERS", "16")),
+        agent_max_concurrency=int(os.getenv("AGENT_MAX_CONCURRENCY", "4")),
+        batch_max_workers=int(os.getenv("BATCH_MAX_WORKERS", "8")),
+        agent_tool_workers=int(os.getenv("AGENT_TOOL_WORKERS", "8")),
+        max_file_size_mb=int(os.getenv("MAX_FILE_SIZE_MB", "10")),
+        agent_max_tool_rounds=int(os.getenv("AGENT_MAX_TOOL_ROUNDS", "10")),
+        read_file_max_bytes=int(os.getenv("READ_FILE_MAX_BYTES", "65536")),
+        search_max_workers=int(os.getenv("SEARCH_MAX_WORKERS", "8")),
+        search_max_file_mb=int(os.getenv("SEARCH_MAX_FILE_MB", "100")),
+        search_max_seconds=float(os.getenv("SEARCH_MAX_SECONDS", "10")),
+        search_index_enabled=os.getenv("SEARCH_INDEX_ENABLED", "True").lower() == "true",
+        search_index_dir=os.getenv("SEARCH_INDEX_DIR", os.path.join(tempfile.gettempdir(), "agent-search-index")),
+        search_index_reconcile_seconds=int(os.getenv("SEARCH_INDEX_RECONCILE_SECONDS", "300")),
+        columnar_cache_enabled=os.getenv("COLUMNAR_CACHE_ENABLED", "False").lower() == "true",
+        columnar_cache_dir=os.getenv("COLUMNAR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "agent-columnar-cache")),
+        columnar_max_file_mb=int(os.getenv("COLUMNAR_MAX_FILE_MB", "256")),
+        context_max_tokens=int(os.getenv("CONTEXT_MAX_TOKENS", "100000")),
+        context_keep_recent_tool_results=int(os.getenv("CONTEXT_KEEP_RECENT_TOOL_RESULTS", "2")),
+        tool_result_max_chars=int(os.getenv("TOOL_RESULT_MAX_CHARS", "100000")),
+        session_max_count=int(os.getenv("SESSION_MAX_COUNT", "500")),
+        session_ttl_seconds=int(os.getenv("SESSION_TTL_SECONDS", "3600")),
+        session_max_turns=int(os.getenv("SESSION_MAX_TURNS", "20")),
+        session_max_memory_mb=int(os.getenv("SESSION_MAX_MEMORY_MB", "128")),
+        tool_memo_enabled=os.getenv("TOOL_MEMO_ENABLED", "True").lower() == "true",
+        tool_memo_max_entries=int(os.getenv("TOOL_MEMO_MAX_ENTRIES", "1000")),
+        tool_memo_max_mb=int(os.getenv("TOOL_MEMO_MAX_MB", "32")),
+        tool_memo_ttl_seconds=int(os.getenv("TOOL_MEMO_TTL_SECONDS", "30"))
     )
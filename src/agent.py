@@ -3,12 +3,24 @@ AI Agent Module
 Integrates Google Gemini with file tools
 """
 import google.generativeai as genai
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Iterator, AsyncIterator, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import asyncio
+import inspect
 import json
+import weakref
 import logging
 
 from src.file_tools import FileTools
+from src.file_search import FileSearcher
+from src.search_index import get_search_index
+from src.file_query import FileQuery
+from src.columnar_cache import get_columnar_cache
 from src.storage_service import StorageService
+from src.session_store import SessionStore
+from src.context_budget import ContextBudget
+from src.tool_memo import ToolMemo
 from config.settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -27,24 +39,76 @@ class Agent:
         """
         self.settings = settings
         self.storage = storage_service
-        self.file_tools = FileTools(storage_service)
+        self.file_tools = FileTools(
+            storage_service,
+            max_read_bytes=settings.read_file_max_bytes,
+            searcher=FileSearcher(
+                storage_service,
+                max_workers=settings.search_max_workers,
+                max_object_bytes=settings.search_max_file_mb * 1024 * 1024,
+                max_seconds=settings.search_max_seconds
+            ),
+            index=get_search_index(settings, storage_service),
+            querier=FileQuery(
+                storage_service,
+                max_json_bytes=settings.search_max_file_mb * 1024 * 1024,
+                columnar=get_columnar_cache(settings, storage_service)
+            )
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.agent_max_concurrency,
+            thread_name_prefix="agent"
+        )
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=settings.agent_tool_workers,
+            thread_name_prefix="agent-tool"
+        )
+        # Async callers queue for a session here, without tying up an executor
+        # worker on the session's thread lock while another turn is running
+        self._turn_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+        self.sessions = SessionStore(
+            max_sessions=settings.session_max_count,
+            ttl_seconds=settings.session_ttl_seconds,
+            max_turns=settings.session_max_turns,
+            max_total_bytes=settings.session_max_memory_mb * 1024 * 1024
+        )
+        self.context_budget = ContextBudget(
+            max_tokens=settings.context_max_tokens,
+            keep_recent_tool_results=settings.context_keep_recent_tool_results,
+            tool_result_max_chars=settings.tool_result_max_chars
+        )
+        self.memo = ToolMemo(
+            storage_service,
+            max_entries=settings.tool_memo_max_entries,
+            max_total_bytes=settings.tool_memo_max_mb * 1024 * 1024,
+            ttl_seconds=settings.tool_memo_ttl_seconds
+        ) if settings.tool_memo_enabled else None
 
         # Configure Google AI
         genai.configure(api_key=settings.google_api_key)
 
         # Create tool functions that the model can call
-        def read_file(filename: str) -> str:
+        def read_file(filename: str, offset: int = 0, max_bytes: int = 0) -> str:
             """
-            Read a file from storage
+            Read a file from storage, one chunk at a time
+
+            Large files are returned in parts. When the result has a
+            next_offset, call read_file again with offset=next_offset to
+            get the following part.
 
             Args:
                 filename: Name of the file to read (e.g., 'document.txt', 'data.csv')
+                offset: Byte offset to start reading from (0 for the beginning)
+                max_bytes: Maximum bytes to return (0 for the default chunk size)
 
             Returns:
-                The file content as a string
+                The content chunk, total size and continuation offset
             """
-            result = self.file_tools.read_file(filename)
-            return json.dumps(result)
+            return self._memoized(
+                "read_file", [filename, offset, max_bytes], [filename],
+                lambda: self.file_tools.read_file(filename, offset, max_bytes)
+            )
 
         def write_file(filename: str, content: str) -> str:
             """
@@ -60,58 +124,442 @@ class Agent:
             result = self.file_tools.write_file(filename, content)
             return json.dumps(result)
 
-        def list_files() -> str:
+        def append_file(filename: str, content: str) -> str:
+            """
+            Append text to the end of a file (created if it does not exist)
+
+            Much cheaper than rewriting the whole file with write_file.
+
+            Args:
+                filename: Name of the file to extend (e.g., 'notes.md', 'app.log')
+                content: Text to append (end it with a newline to finish the line)
+
+            Returns:
+                The new file size
+            """
+            result = self.file_tools.append_file(filename, content)
+            return json.dumps(result)
+
+        def patch_file(filename: str, start_line: int, end_line: int, content: str) -> str:
+            """
+            Replace a range of lines in a file without rewriting the rest
+
+            Lines are numbered from 1 and the range is inclusive. Use
+            end_line = start_line - 1 to insert before start_line, and
+            empty content to delete the lines.
+
+            Args:
+                filename: Name of the file to edit
+                start_line: First line to replace
+                end_line: Last line to replace
+                content: Replacement lines
+
+            Returns:
+                The new file size and number of lines replaced
             """
-            List all files in storage
+            result = self.file_tools.patch_file(filename, start_line, end_line, content)
+            return json.dumps(result)
+
+        def read_files(filenames: list[str]) -> str:
+            """
+            Read several files from storage at once (fetched in parallel)
+
+            Args:
+                filenames: Names of the files to read
+
+            Returns:
+                The content of each file
+            """
+            return self._memoized(
+                "read_files", list(filenames), list(filenames),
+                lambda: self.file_tools.read_files(filenames)
+            )
+
+        def write_files(filenames: list[str], contents: list[str]) -> str:
+            """
+            Write several files to storage at once (uploaded in parallel)
+
+            Args:
+                filenames: Names for the files
+                contents: Content for each file, in the same order as filenames
+
+            Returns:
+                Success message with details for each file
+            """
+            result = self.file_tools.write_files(filenames, contents)
+            return json.dumps(result)
+
+        def list_files(prefix: str = "", sort_by: str = "name", descending: bool = False) -> str:
+            """
+            List files in storage with their size and modification time
+
+            Args:
+                prefix: Only list files whose name starts with this ('' for all files)
+                sort_by: 'name', 'size' or 'last_modified'
+                descending: True for largest / newest first
+
+            Returns:
+                List of available files
+            """
+            return self._memoized(
+                "list_files", [prefix, sort_by, descending], None,
+                lambda: self.file_tools.list_files(prefix, sort_by, descending)
+            )
+
+        def search_files(pattern: str, prefix: str = "", max_matches: int = 50) -> str:
+            """
+            Search the contents of all stored files for a regular expression
+
+            Only the matching lines (with a little surrounding context) are
+            returned, so this is much cheaper than reading every file.
+
+            Args:
+                pattern: Regular expression to search for (e.g., 'TODO', 'error|warning')
+                prefix: Only search files whose name starts with this ('' for all files)
+                max_matches: Maximum number of matching lines to return
+
+            Returns:
+                Matching lines with file name, line number and context
+            """
+            return self._memoized(
+                "search_files", [pattern, prefix, max_matches], None,
+                lambda: self.file_tools.search_files(pattern, prefix, max_matches)
+            )
+
+        def search_index(query: str, limit: int = 10) -> str:
+            """
+            Find the files most relevant to some words using the full-text index
+
+            Results are ranked by relevance and include the line numbers
+            where the words appear. Faster than search_files when there
+            are many files; use search_files for exact patterns.
+
+            Args:
+                query: Words to look for (e.g., 'quarterly revenue')
+                limit: Maximum number of files to return
 
             Returns:
-                List of all available files
+                Ranked file names with matching terms and line numbers
             """
-            result = self.file_tools.list_files()
+            result = self.file_tools.search_index(query, limit)
             return json.dumps(result)
 
+        def query_file(
+            filename: str,
+            columns: str = "",
+            where: str = "",
+            group_by: str = "",
+            aggregates: str = "",
+            order_by: str = "",
+            limit: int = 100
+        ) -> str:
+            """
+            Filter, group and aggregate a CSV, TSV, JSON or JSONL file server-side
+
+            Only the result rows are returned, so use this instead of
+            read_file to answer questions about tabular data.
+
+            Args:
+                filename: Data file to query (e.g., 'sales.csv', 'events.jsonl')
+                columns: Comma-separated columns to return ('' for all)
+                where: Filter in Python syntax, e.g. "price > 10 and lower(status) == 'paid'"
+                group_by: Comma-separated columns to group by
+                aggregates: Comma-separated aggregates, e.g. 'count(*), sum(amount)'
+                order_by: Result column to sort by, optionally followed by 'desc'
+                limit: Maximum number of rows to return
+
+            Returns:
+                Result columns and rows, with the number of rows scanned and matched
+            """
+            return self._memoized(
+                "query_file", [filename, columns, where, group_by, aggregates, order_by, limit], [filename],
+                lambda: self.file_tools.query_file(
+                    filename, columns, where, group_by, aggregates, order_by, limit
+                )
+            )
+
         # Store tool functions
         self.tool_functions = {
             'read_file': read_file,
             'write_file': write_file,
-            'list_files': list_files
+            'append_file': append_file,
+            'patch_file': patch_file,
+            'read_files': read_files,
+            'write_files': write_files,
+            'list_files': list_files,
+            'search_files': search_files,
+            'search_index': search_index,
+            'query_file': query_file
         }
 
         # Initialize model with tools
         self.model = genai.GenerativeModel(
             model_name=settings.agent_model,
-            tools=[read_file, write_file, list_files]
+            tools=[
+                read_file, write_file, append_file, patch_file, read_files, write_files,
+                list_files, search_files, search_index, query_file
+            ]
         )
 
         logger.info(f"✅ Agent initialized with model: {settings.agent_model}")
     
-    def chat(self, message: str) -> str:
+    def chat(self, message: str, session_id: Optional[str] = None) -> str:
         """
         Process a user message and return response
 
         Args:
             message: User's message
+            session_id: Continue this conversation (None for a one-off chat)
 
         Returns:
             str: Agent's response
         """
         logger.info(f"💬 User: {message}")
 
-        try:
-            # Start chat session with automatic function calling
-            # The SDK will automatically call the tool functions we provided
-            chat = self.model.start_chat(enable_automatic_function_calling=True)
+        texts = []
+        for event in self._events(message, stream=False, session_id=session_id):
+            if event["type"] == "text":
+                texts.append(event["text"])
+            elif event["type"] == "error":
+                return f"I encountered an error: {event['error']}"
+
+        final_response = "".join(texts)
+        logger.info(f"🤖 Agent: {final_response[:100]}...")
+        return final_response
+
+    def chat_stream(self, message: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Process a user message, yielding progress as it happens
+
+        Events are dicts with a `type` of `text` (partial model output),
+        `tool_call`, `tool_result`, `error` or `done`.
+
+        Args:
+            message: User's message
+            session_id: Continue this conversation (None for a one-off chat)
+
+        Yields:
+            dict: Progress events
+        """
+        logger.info(f"💬 User (stream): {message}")
+        yield from self._events(message, stream=True, session_id=session_id)
+
+    def _events(
+        self,
+        message: str,
+        stream: bool,
+        session_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Run one user message through the model/tool loop as a stream of events"""
+        session = None
+        if session_id:
+            session = self.sessions.get_or_create(session_id, self.model.start_chat)
+
+        # One turn at a time per session; ephemeral chats need no lock
+        with session.lock if session else nullcontext():
+            chat = session.chat if session else self.model.start_chat()
+            history_before = list(chat.history)
+            try:
+                # Function calls are handled by our own loop so that several
+                # calls in one model response can run concurrently
+                content = message
+
+                for _ in range(self.settings.agent_max_tool_rounds + 1):
+                    # Keep each round trip's prompt size flat as tool outputs pile up
+                    compacted = self.context_budget.compact(chat.history)
+                    if compacted is not None:
+                        chat.history = compacted
+
+                    response = chat.send_message(content, stream=stream)
+
+                    function_calls = []
+                    for chunk in (response if stream else [response]):
+                        for part in self._parts(chunk):
+                            if part.function_call and part.function_call.name:
+                                function_calls.append(part.function_call)
+                            elif part.text:
+                                yield {"type": "text", "text": part.text}
 
-            # Send message - tools will be called automatically by the SDK
-            response = chat.send_message(message)
+                    if not function_calls:
+                        break
 
-            # Get final text response
-            final_response = response.text
-            logger.info(f"🤖 Agent: {final_response[:100]}...")
+                    for fc in function_calls:
+                        yield {
+                            "type": "tool_call",
+                            "name": fc.name,
+                            "args": type(fc).to_dict(fc).get("args", {})
+                        }
+                    outputs = [
+                        self.context_budget.clip(output)
+                        for output in self._execute_tool_calls(function_calls)
+                    ]
+                    for fc, output in zip(function_calls, outputs):
+                        yield {
+                            "type": "tool_result",
+                            "name": fc.name,
+                            "success": json.loads(output).get("success", False)
+                        }
+                    content = self._function_responses(function_calls, outputs)
+                else:
+                    raise RuntimeError("Tool call limit reached before the model answered")
 
-            return final_response
+                yield {"type": "done"}
 
+            except GeneratorExit:
+                # Consumer went away mid-turn (e.g. client disconnected)
+                chat.history = history_before
+                raise
+
+            except Exception as e:
+                # Never leave a half-finished turn in a reusable session
+                chat.history = history_before
+                error_msg = f"Error processing message: {str(e)}"
+                logger.error(f"❌ {error_msg}")
+                yield {"type": "error", "error": error_msg}
+
+            finally:
+                if session:
+                    self.sessions.update(session)
+
+    @staticmethod
+    def _parts(response) -> List[Any]:
+        """Content parts of a (possibly partial) model response"""
+        if not response.candidates:
+            return []
+        return list(response.candidates[0].content.parts)
+
+    def _memoized(
+        self,
+        tool: str,
+        args: Any,
+        objects: Optional[List[str]],
+        compute: Callable[[], Dict[str, Any]]
+    ) -> str:
+        """JSON result of a read-only tool, served from the memo when it is enabled"""
+        if self.memo is None:
+            return json.dumps(compute())
+        return self.memo.call(tool, args, objects, compute)
+
+    def _run_tool(self, name: str, args: Dict[str, Any]) -> str:
+        """Run one tool function, turning failures into an error result"""
+        tool = self.tool_functions.get(name)
+        if tool is None:
+            return json.dumps({"success": False, "error": f"Unknown tool '{name}'"})
+        try:
+            return tool(**self._coerce_args(tool, args))
         except Exception as e:
-            error_msg = f"Error processing message: {str(e)}"
-            logger.error(f"❌ {error_msg}")
-            return f"I encountered an error: {error_msg}"
+            logger.error(f"❌ Tool {name} failed: {e}")
+            return json.dumps({"success": False, "error": str(e)})
+
+    @staticmethod
+    def _coerce_args(tool: Callable[..., str], args: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn whole floats into ints for int parameters; Gemini sends every number as a float"""
+        parameters = inspect.signature(tool).parameters
+        coerced = dict(args)
+        for key, value in args.items():
+            parameter = parameters.get(key)
+            if (
+                parameter is not None
+                and parameter.annotation is int
+                and isinstance(value, float)
+                and value.is_integer()
+            ):
+                coerced[key] = int(value)
+        return coerced
+
+    def _execute_tool_calls(self, function_calls: List[Any]) -> List[str]:
+        """
+        Execute all function calls from one model turn concurrently
+
+        Args:
+            function_calls: FunctionCall protos from a single response
+
+        Returns:
+            list: JSON tool outputs, in call order
+        """
+        logger.info(f"🔧 Running {len(function_calls)} tool call(s): "
+                    f"{', '.join(fc.name for fc in function_calls)}")
+
+        futures = [
+            self._tool_executor.submit(
+                self._run_tool,
+                fc.name,
+                type(fc).to_dict(fc).get("args", {})
+            )
+            for fc in function_calls
+        ]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _function_responses(function_calls: List[Any], outputs: List[str]) -> "genai.protos.Content":
+        """One message carrying every function response, in call order"""
+        return genai.protos.Content(parts=[
+            genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                name=fc.name,
+                response={"result": output}
+            ))
+            for fc, output in zip(function_calls, outputs)
+        ])
+
+    async def achat(self, message: str, session_id: Optional[str] = None) -> str:
+        """
+        Process a user message without blocking the event loop
+
+        The model call and any tool calls run on the agent's bounded
+        executor, so concurrent requests overlap instead of serializing.
+        Requests for a session that is mid-turn wait on the event loop.
+
+        Args:
+            message: User's message
+            session_id: Continue this conversation (None for a one-off chat)
+
+        Returns:
+            str: Agent's response
+        """
+        loop = asyncio.get_running_loop()
+        if not session_id:
+            return await loop.run_in_executor(self._executor, self.chat, message, session_id)
+        async with self._turn_lock(session_id):
+            return await loop.run_in_executor(self._executor, self.chat, message, session_id)
+
+    async def achat_stream(
+        self,
+        message: str,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async variant of chat_stream
+
+        Each step of the event generator runs on the agent's executor,
+        so slow model or tool calls never block the event loop.
+
+        Args:
+            message: User's message
+            session_id: Continue this conversation (None for a one-off chat)
+
+        Yields:
+            dict: Progress events
+        """
+        loop = asyncio.get_running_loop()
+        turn_lock = self._turn_lock(session_id) if session_id else None
+        if turn_lock is not None:
+            await turn_lock.acquire()
+        try:
+            events = self.chat_stream(message, session_id)
+            finished = object()
+            while True:
+                event = await loop.run_in_executor(self._executor, next, events, finished)
+                if event is finished:
+                    break
+                yield event
+        finally:
+            if turn_lock is not None:
+                turn_lock.release()
+
+    def _turn_lock(self, session_id: str) -> asyncio.Lock:
+        """Per-session asyncio lock; turns of one session run one after another"""
+        lock = self._turn_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._turn_locks[session_id] = lock
+        return lock
@@ -8,15 +8,26 @@ import os
 # Add project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.responses import HTMLResponse, FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import asyncio
+import json
+from urllib.parse import quote
+import uuid
 import logging
 
 from src.agent import Agent
-from src.storage_service import StorageService
+from src.storage_service import get_storage_service
+from src.async_storage import AsyncStorageService
+from src.file_search import FileSearcher
+from src.search_index import SearchIndex, get_search_index
+from src.change_feed import ChangeFeed
+from src.compression import CompressionMiddleware
 from config.settings import load_settings
 
 # Setup logging
@@ -30,19 +41,31 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Middleware has to be installed before startup, so its settings come straight from the environment
+if os.getenv("COMPRESSION_ENABLED", "True").lower() == "true":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    )
+
 # Global variables for agent and storage
 agent: Optional[Agent] = None
-storage: Optional[StorageService] = None
+storage: Optional[AsyncStorageService] = None
+searcher: Optional[FileSearcher] = None
+index: Optional[SearchIndex] = None
+changes: Optional[ChangeFeed] = None
 
 
 # Request/Response Models
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = Field(None, max_length=128)
 
 
 class ChatResponse(BaseModel):
     response: str
     success: bool
+    session_id: Optional[str] = None
     error: Optional[str] = None
 
 
@@ -50,12 +73,16 @@ class FileInfo(BaseModel):
     name: str
     size: Optional[int] = None
     last_modified: Optional[str] = None
+    etag: Optional[str] = None
 
 
 class FileListResponse(BaseModel):
     files: list[FileInfo]
     count: int
     success: bool
+    is_truncated: bool = False
+    next_start_after: Optional[str] = None
+    next_offset: Optional[int] = None
     error: Optional[str] = None
 
 
@@ -64,13 +91,69 @@ class FileContentResponse(BaseModel):
     content: str
     size: int
     success: bool
+    binary: bool = False
+    content_type: Optional[str] = None
+    raw_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    filenames: list[str] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchGetResponse(BaseModel):
+    files: list[FileContentResponse]
+    count: int
+    success: bool
+
+
+class FileUploadResponse(BaseModel):
+    filename: str
+    size: int
+    etag: Optional[str] = None
+    sha256: Optional[str] = None
+    unchanged: bool = False
+    success: bool
     error: Optional[str] = None
 
 
+class SearchMatch(BaseModel):
+    filename: str
+    line_number: int
+    line: str
+    before: list[str] = []
+    after: list[str] = []
+
+
+class SearchResponse(BaseModel):
+    pattern: str
+    matches: list[SearchMatch]
+    count: int
+    files_scanned: int
+    truncated: bool
+    success: bool
+    error: Optional[str] = None
+
+
+class IndexHit(BaseModel):
+    filename: str
+    score: float
+    terms: list[str]
+    lines: list[int]
+
+
+class IndexSearchResponse(BaseModel):
+    query: str
+    results: list[IndexHit]
+    count: int
+    documents: int
+    success: bool
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize agent and storage on startup"""
-    global agent, storage
+    global agent, storage, searcher, index, changes
 
     try:
         logger.info("🚀 Starting AI Agent Web Server...")
@@ -80,17 +163,27 @@ async def startup_event():
         logger.info("✅ Configuration loaded")
 
         # Initialize storage
-        storage = StorageService(
-            endpoint=settings.minio_endpoint,
-            access_key=settings.minio_access_key,
-            secret_key=settings.minio_secret_key,
-            bucket_name=settings.minio_bucket_name,
-            secure=settings.minio_secure
+        storage_service = get_storage_service(settings)
+        storage = AsyncStorageService(
+            storage_service,
+            max_workers=settings.storage_max_workers
+        )
+        searcher = FileSearcher(
+            storage_service,
+            max_workers=settings.search_max_workers,
+            max_object_bytes=settings.search_max_file_mb * 1024 * 1024,
+            max_seconds=settings.search_max_seconds
+        )
+        index = get_search_index(settings, storage_service)
+        changes = ChangeFeed(
+            storage_service,
+            bucket_notifications=settings.change_feed_bucket_notifications,
+            queue_size=settings.change_feed_queue_size
         )
         logger.info("✅ Storage connected")
 
         # Initialize agent
-        agent = Agent(settings, storage)
+        agent = Agent(settings, storage_service)
         logger.info("✅ Agent initialized")
 
         logger.info("🎉 Web server ready!")
@@ -100,6 +193,15 @@ async def startup_event():
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let in-flight storage calls finish before exiting"""
+    if index:
+        index.close()
+    if storage:
+        storage.shutdown()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """Serve the main web interface"""
@@ -127,6 +229,30 @@ async def health_check():
     }
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Object cache counters (hits, misses, evictions, tier usage)"""
+    if not storage:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    cache = storage.sync.cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/api/catalog/stats")
+async def catalog_stats():
+    """Metadata catalog size, readiness and last reconciliation"""
+    if not storage:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    catalog = storage.sync.catalog
+    if catalog is None:
+        return {"enabled": False}
+    return {"enabled": True, **catalog.stats()}
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -144,11 +270,13 @@ async def chat(request: ChatRequest):
 
     try:
         logger.info(f"💬 Chat request: {request.message}")
-        response = agent.chat(request.message)
+        session_id = request.session_id or uuid.uuid4().hex
+        response = await agent.achat(request.message, session_id)
 
         return ChatResponse(
             response=response,
-            success=True
+            success=True,
+            session_id=session_id
         )
     except Exception as e:
         logger.error(f"❌ Chat error: {e}")
@@ -159,34 +287,129 @@ async def chat(request: ChatRequest):
         )
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Chat with the AI agent, streaming progress as Server-Sent Events
+
+    Each event is a `data:` line holding a JSON object whose `type` is
+    `session` (first event, carries `session_id`), `text` (partial
+    response), `tool_call`, `tool_result`, `error` or `done`.
+    """
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+
+    logger.info(f"💬 Chat stream request: {request.message}")
+    session_id = request.session_id or uuid.uuid4().hex
+
+    async def event_source():
+        yield f"data: {json.dumps({'type': 'session', 'session_id': session_id})}\n\n"
+        async for event in agent.achat_stream(request.message, session_id):
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.delete("/api/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """
+    End a chat session and free its history
+    """
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+
+    if not agent.sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found")
+
+    return {
+        "success": True,
+        "message": f"Session '{session_id}' deleted"
+    }
+
+
+@app.get("/api/sessions/stats")
+async def session_stats():
+    """Live session count, history memory and eviction counters"""
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+
+    return agent.sessions.stats()
+
+
+@app.get("/api/memo/stats")
+async def memo_stats():
+    """Tool-result memo size, hit rate and invalidation counters"""
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+
+    if agent.memo is None:
+        return {"enabled": False}
+    return {"enabled": True, **agent.memo.stats()}
+
+
 @app.get("/api/files", response_model=FileListResponse)
-async def list_files():
+async def list_files(
+    prefix: str = "",
+    limit: int = Query(1000, ge=1, le=10000),
+    start_after: Optional[str] = None,
+    sort: Literal["name", "size", "last_modified"] = "name",
+    order: Literal["asc", "desc"] = "asc",
+    offset: int = Query(0, ge=0),
+    min_size: Optional[int] = Query(None, ge=0),
+    max_size: Optional[int] = Query(None, ge=0),
+    modified_after: Optional[datetime] = None,
+    modified_before: Optional[datetime] = None,
+    suffix: str = ""
+):
     """
-    List all files in storage
+    List files in storage, one page at a time
+
+    Served from the local metadata catalog. Pass `next_start_after`
+    (name order) or `next_offset` (other orders) from a truncated
+    response to fetch the following page.
     """
     if not storage:
         raise HTTPException(status_code=503, detail="Storage not initialized")
 
     try:
-        files = storage.list_files()
-
-        # Get metadata for each file
-        file_info_list = []
-        for filename in files:
-            metadata = storage.get_file_metadata(filename)
-            if metadata:
-                file_info_list.append(FileInfo(
-                    name=metadata["name"],
-                    size=metadata["size"],
-                    last_modified=str(metadata["last_modified"])
-                ))
-            else:
-                file_info_list.append(FileInfo(name=filename))
+        # Fetch one extra entry to find out whether another page exists
+        entries = await storage.list_files_detailed(
+            prefix=prefix,
+            start_after=start_after,
+            limit=limit + 1,
+            sort=sort,
+            descending=order == "desc",
+            offset=offset,
+            min_size=min_size,
+            max_size=max_size,
+            modified_after=modified_after,
+            modified_before=modified_before,
+            suffix=suffix
+        )
+        is_truncated = len(entries) > limit
+        entries = entries[:limit]
+
+        file_info_list = [
+            FileInfo(
+                name=entry["name"],
+                size=entry["size"],
+                last_modified=str(entry["last_modified"]) if entry["last_modified"] else None,
+                etag=entry["etag"]
+            )
+            for entry in entries
+        ]
 
         return FileListResponse(
             files=file_info_list,
             count=len(file_info_list),
-            success=True
+            success=True,
+            is_truncated=is_truncated,
+            next_start_after=entries[-1]["name"] if is_truncated and sort == "name" and order == "asc" else None,
+            next_offset=offset + limit if is_truncated else None
         )
     except Exception as e:
         logger.error(f"❌ Error listing files: {e}")
@@ -198,32 +421,296 @@ async def list_files():
         )
 
 
+@app.get("/api/changes")
+async def change_stream():
+    """
+    Stream file changes as Server-Sent Events
+
+    The first event is `{"type": "ready"}`; clients load the listing
+    once and then apply `put` / `delete` events (carrying `name` and, for
+    puts, `size`, `etag`, `last_modified`). A `reset` event means events
+    were dropped and the listing should be reloaded.
+    """
+    if not changes:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    queue = changes.subscribe()
+
+    async def event_source():
+        try:
+            yield f"data: {json.dumps({'type': 'ready'})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            changes.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/search", response_model=SearchResponse)
+async def search_files(
+    pattern: str = Query(..., min_length=1),
+    prefix: str = "",
+    max_matches: int = Query(100, ge=1, le=10000),
+    context_lines: int = Query(2, ge=0, le=20),
+    ignore_case: bool = False
+):
+    """
+    Search file contents for a regular expression
+
+    Objects are scanned in parallel on the server and decoded as they
+    stream in; only matching lines and their context are returned.
+    """
+    if not storage or not searcher:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    result = await storage.run(
+        searcher.search,
+        pattern,
+        prefix=prefix,
+        max_matches=max_matches,
+        context_lines=context_lines,
+        ignore_case=ignore_case
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return SearchResponse(**result)
+
+
+@app.get("/api/search/index", response_model=IndexSearchResponse)
+async def search_index(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=1000),
+    prefix: str = ""
+):
+    """
+    Rank files by relevance to a query using the full-text index
+
+    Served from the local inverted index; no objects are read.
+    """
+    if not index:
+        raise HTTPException(status_code=503, detail="Search index not enabled")
+
+    result = await storage.run(index.search, q, limit=limit, prefix=prefix)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return IndexSearchResponse(**result)
+
+
+@app.get("/api/search/index/stats")
+async def search_index_stats():
+    """Indexed document count and last reconciliation result"""
+    if not index:
+        raise HTTPException(status_code=503, detail="Search index not enabled")
+
+    return index.stats()
+
+
+@app.post("/api/files", response_model=FileUploadResponse)
+async def upload_file(file: UploadFile = File(...)):
+    """
+    Upload a file to storage
+
+    The request body is streamed to MinIO in multipart chunks, so the
+    whole file is never held in memory.
+    """
+    if not storage:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Filename is required")
+
+    result = await storage.upload_stream(
+        file.file,
+        object_name=file.filename,
+        content_type=file.content_type or "application/octet-stream"
+    )
+
+    if not result["success"]:
+        logger.error(f"❌ Error uploading file: {result['error']}")
+        return FileUploadResponse(
+            filename=file.filename,
+            size=0,
+            success=False,
+            error=result["error"]
+        )
+
+    return FileUploadResponse(
+        filename=file.filename,
+        size=result["size"],
+        etag=result["etag"],
+        sha256=result["sha256"],
+        unchanged=result["unchanged"],
+        success=True
+    )
+
+
+@app.post("/api/files:batchGet", response_model=BatchGetResponse)
+async def batch_get_files(request: BatchRequest):
+    """
+    Read several files in one request
+
+    Objects are fetched in parallel on a bounded worker pool.
+    """
+    if not storage:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    contents = await storage.download_files(request.filenames)
+
+    files = []
+    for filename in request.filenames:
+        file_data = contents.get(filename)
+        if file_data is None:
+            files.append(FileContentResponse(
+                filename=filename,
+                content="",
+                size=0,
+                success=False,
+                error=f"File '{filename}' not found"
+            ))
+            continue
+
+        files.append(_content_response(filename, file_data))
+
+    return BatchGetResponse(
+        files=files,
+        count=len(files),
+        success=all(f.success for f in files)
+    )
+
+
+@app.post("/api/files:batchDelete")
+async def batch_delete_files(request: BatchRequest):
+    """
+    Delete several files with a single S3 multi-object delete
+    """
+    if not storage:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    result = await storage.delete_files(request.filenames)
+    if result["errors"]:
+        logger.error(f"❌ Batch delete errors: {result['errors']}")
+    return result
+
+
+def _content_response(
+    filename: str,
+    file_data,
+    content_type: Optional[str] = None
+) -> FileContentResponse:
+    """
+    JSON view of a file's bytes
+
+    Text is decoded straight from the buffer; binary content is not
+    mangled into a string but flagged, with a link to the raw bytes.
+    """
+    try:
+        content = str(file_data, 'utf-8')
+        binary = False
+    except UnicodeDecodeError:
+        content = ""
+        binary = True
+
+    return FileContentResponse(
+        filename=filename,
+        content=content,
+        size=len(file_data),
+        success=True,
+        binary=binary,
+        content_type=content_type,
+        raw_url=f"/api/files/{quote(filename, safe='')}/raw"
+    )
+
+
+def _cache_headers(metadata: dict) -> dict:
+    """Validators and caching policy for a stored object"""
+    headers = {
+        # Clients may keep a copy but must revalidate it, which is a cheap 304
+        "Cache-Control": "private, no-cache"
+    }
+    if metadata.get("etag"):
+        headers["ETag"] = f'"{metadata["etag"]}"'
+    if metadata.get("last_modified"):
+        headers["Last-Modified"] = format_datetime(metadata["last_modified"], usegmt=True)
+    return headers
+
+
+def _not_modified(
+    metadata: dict,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str]
+) -> bool:
+    """
+    Evaluate conditional request headers against an object's metadata
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when it is absent (RFC 9110).
+    """
+    if if_none_match is not None:
+        etag = metadata.get("etag")
+        if not etag:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(
+            tag.removeprefix("W/").strip('"') == etag for tag in tags
+        )
+
+    if if_modified_since and metadata.get("last_modified"):
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return metadata["last_modified"].replace(microsecond=0) <= since
+    return False
+
+
 @app.get("/api/files/{filename}", response_model=FileContentResponse)
-async def read_file(filename: str):
+async def read_file(
+    filename: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
     """
     Read a specific file from storage
+
+    Responses carry ETag / Last-Modified; conditional requests that
+    match are answered with 304 after a single metadata lookup.
     """
     if not storage:
         raise HTTPException(status_code=503, detail="Storage not initialized")
 
     try:
-        file_data = storage.download_file(filename)
+        metadata = await storage.get_file_metadata(filename)
+        if metadata is None:
+            raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+
+        headers = _cache_headers(metadata)
+        if _not_modified(metadata, if_none_match, if_modified_since):
+            return Response(status_code=304, headers=headers)
+
+        file_data = await storage.read_range(filename, etag=metadata["etag"])
 
         if file_data is None:
             raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
 
-        # Try to decode as text
-        try:
-            content = file_data.decode('utf-8')
-        except UnicodeDecodeError:
-            content = f"[Binary file, {len(file_data)} bytes]"
-
-        return FileContentResponse(
-            filename=filename,
-            content=content,
-            size=len(file_data),
-            success=True
-        )
+        response.headers.update(headers)
+        return _content_response(filename, file_data, metadata["content_type"])
     except HTTPException:
         raise
     except Exception as e:
@@ -237,6 +724,110 @@ async def read_file(filename: str):
         )
 
 
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range` header into an inclusive (start, end) pair
+
+    Returns None when the header should be ignored (multiple ranges or
+    an unsupported unit) and raises 416 when the range cannot be served.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            suffix = int(end_text)
+            if suffix <= 0:
+                raise ValueError
+            start = max(size - suffix, 0)
+            end = size - 1
+    except ValueError:
+        start, end = size, size  # malformed, treated as unsatisfiable
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+
+@app.get("/api/files/{filename}/raw")
+async def download_file(
+    filename: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    download: bool = False
+):
+    """
+    Stream the raw bytes of a file
+
+    Served with the stored content type, inline (or as an attachment
+    with `?download=true`), and sandboxed so uploaded HTML or SVG
+    cannot run scripts on this origin.
+
+    Supports single `Range: bytes=start-end` requests with
+    `206 Partial Content`, so clients can resume or fetch a slice, and
+    conditional requests (`If-None-Match`, `If-Modified-Since`,
+    `If-Range`) validated against the object's ETag.
+    """
+    if not storage:
+        raise HTTPException(status_code=503, detail="Storage not initialized")
+
+    metadata = await storage.get_file_metadata(filename)
+    if metadata is None:
+        raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"{'attachment' if download else 'inline'}; "
+                               f"filename*=UTF-8''{quote(filename, safe='')}",
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": "sandbox",
+        **_cache_headers(metadata)
+    }
+    if _not_modified(metadata, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    # A Range is only honoured if the client's copy is still current
+    if range_header and if_range and if_range.strip('"') != metadata["etag"]:
+        range_header = None
+
+    size = metadata["size"]
+    byte_range = _parse_range(range_header, size) if range_header else None
+
+    if byte_range:
+        start, end = byte_range
+        chunks = await storage.download_stream(
+            filename, offset=start, length=end - start + 1, etag=metadata["etag"]
+        )
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+    else:
+        chunks = await storage.download_stream(filename, etag=metadata["etag"])
+        status_code = 200
+        headers["Content-Length"] = str(size)
+
+    if chunks is None:
+        raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+
+    return StreamingResponse(
+        chunks,
+        status_code=status_code,
+        media_type=metadata["content_type"] or "application/octet-stream",
+        headers=headers
+    )
+
+
 @app.delete("/api/files/{filename}")
 async def delete_file(filename: str):
     """
@@ -246,7 +837,7 @@ async def delete_file(filename: str):
         raise HTTPException(status_code=503, detail="Storage not initialized")
 
     try:
-        success = storage.delete_file(filename)
+        success = await storage.delete_file(filename)
 
         if not success:
             raise HTTPException(status_code=404, detail=f"Failed to delete '{filename}'")
@@ -0,0 +1,153 @@
+"""
+Async Storage Module
+Non-blocking facade over StorageService for use inside an event loop
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import Dict, List, Optional, BinaryIO, Iterable, Iterator, Tuple, Union
+import logging
+
+from src.storage_service import StorageService, DEFAULT_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncStorageService:
+    """Runs StorageService calls on a bounded thread pool so the event loop stays free"""
+
+    def __init__(self, storage_service: StorageService, max_workers: int = 16):
+        """
+        Wrap a synchronous storage service
+
+        Args:
+            storage_service: Storage service instance to delegate to
+            max_workers: Maximum number of storage calls running at once
+        """
+        self.sync = storage_service
+        self.bucket_name = storage_service.bucket_name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="storage"
+        )
+        logger.info(f"Async storage ready with {max_workers} worker(s)")
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking call on the storage executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def run(self, func, *args, **kwargs):
+        """Run another storage-bound blocking call (e.g. a search) on the storage executor"""
+        return await self._run(func, *args, **kwargs)
+
+    async def upload_file(
+        self,
+        file_data: bytes,
+        object_name: str,
+        content_type: str = "application/octet-stream"
+    ) -> dict:
+        """Upload a file to MinIO"""
+        return await self._run(self.sync.upload_file, file_data, object_name, content_type)
+
+    async def upload_stream(
+        self,
+        source: Union[BinaryIO, Iterable[bytes]],
+        object_name: str,
+        content_type: str = "application/octet-stream"
+    ) -> dict:
+        """Upload a stream of unknown length to MinIO"""
+        return await self._run(self.sync.upload_stream, source, object_name, content_type)
+
+    async def download_file(self, object_name: str) -> Optional[bytes]:
+        """Download a file from MinIO"""
+        return await self._run(self.sync.download_file, object_name)
+
+    async def read_range(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> Optional[memoryview]:
+        """Read a file (or a byte range of it) as a memoryview"""
+        return await self._run(self.sync.read_range, object_name, offset, length, etag)
+
+    async def read_chunk(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> Optional[Tuple[memoryview, int]]:
+        """Read a byte range together with the object's total size"""
+        return await self._run(self.sync.read_chunk, object_name, offset, length, etag)
+
+    async def download_stream(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        etag: Optional[str] = None
+    ) -> Optional[Iterator[bytes]]:
+        """
+        Open a (ranged) download without blocking the loop
+
+        The returned iterator is synchronous; Starlette's StreamingResponse
+        consumes it on its own thread pool.
+        """
+        return await self._run(
+            self.sync.download_stream, object_name,
+            offset=offset, length=length, chunk_size=chunk_size, etag=etag
+        )
+
+    async def delete_file(self, object_name: str) -> bool:
+        """Delete a file from MinIO"""
+        return await self._run(self.sync.delete_file, object_name)
+
+    async def delete_files(self, object_names: List[str]) -> dict:
+        """Delete many files with S3 multi-object delete"""
+        return await self._run(self.sync.delete_files, object_names)
+
+    async def download_files(self, object_names: List[str]) -> Dict[str, Optional[bytes]]:
+        """Download many files in parallel"""
+        return await self._run(self.sync.download_files, object_names)
+
+    async def upload_files(self, files: List[dict]) -> List[dict]:
+        """Upload many files in parallel"""
+        return await self._run(self.sync.upload_files, files)
+
+    async def list_files(self, prefix: str = "") -> list:
+        """List files in the bucket"""
+        return await self._run(self.sync.list_files, prefix)
+
+    async def list_files_detailed(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None,
+        **filters
+    ) -> list:
+        """List files with their metadata (from the catalog when ready)"""
+        return await self._run(
+            self.sync.list_files_detailed, prefix,
+            start_after=start_after, limit=limit, **filters
+        )
+
+    async def get_file_metadata(self, object_name: str) -> Optional[dict]:
+        """Get metadata for a file"""
+        return await self._run(self.sync.get_file_metadata, object_name)
+
+    async def generate_presigned_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(hours=1)
+    ) -> Optional[str]:
+        """Generate a presigned URL for temporary file access"""
+        return await self._run(self.sync.generate_presigned_url, object_name, expires)
+
+    def shutdown(self):
+        """Stop accepting work and wait for running calls to finish"""
+        self._executor.shutdown(wait=True)
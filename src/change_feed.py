@@ -0,0 +1,156 @@
+"""
+Change Feed Module
+Fans storage change events out to connected clients
+"""
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+import logging
+
+from src.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+# A change seen from both the in-process hook and bucket notifications is sent once
+DEDUP_SECONDS = 30
+DEDUP_MAX_ENTRIES = 10000
+
+
+class ChangeFeed:
+    """Publishes put/delete events to asyncio subscribers (e.g. SSE streams)"""
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        bucket_notifications: bool = True,
+        queue_size: int = 1000
+    ):
+        """
+        Start collecting change events
+
+        Args:
+            storage_service: Storage service whose writes and deletes are published
+            bucket_notifications: Also follow MinIO bucket notifications, so
+                changes made by other clients are published
+            queue_size: Events buffered per subscriber before it is told to resync
+        """
+        self.storage = storage_service
+        self.queue_size = queue_size
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self._seq = 0
+
+        storage_service.add_listener(self.publish)
+        if bucket_notifications:
+            threading.Thread(
+                target=self._follow_bucket,
+                name="change-feed",
+                daemon=True
+            ).start()
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Register the calling event loop for change events
+
+        Returns:
+            asyncio.Queue: Receives event dicts; a `reset` event means
+            events were dropped and the client should reload its listing
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Stop delivering events to a queue"""
+        with self._lock:
+            self._subscribers = {
+                (loop, q) for loop, q in self._subscribers if q is not queue
+            }
+
+    def publish(self, event: dict):
+        """
+        Send a storage change event to every subscriber
+
+        Safe to call from any thread; an event repeating the last change
+        to the same name (same type and ETag) shortly after is dropped.
+
+        Args:
+            event: `put` or `delete` event (see StorageService.add_listener)
+        """
+        key = (event["type"], event.get("etag"))
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and (
+                len(self._recent) > DEDUP_MAX_ENTRIES
+                or next(iter(self._recent.values()))[1] < now - DEDUP_SECONDS
+            ):
+                self._recent.popitem(last=False)
+            # Only a repeat of the last change to this name is a duplicate
+            last = self._recent.pop(event["name"], None)
+            self._recent[event["name"]] = (key, now)
+            if last is not None and last[0] == key:
+                return
+
+            self._seq += 1
+            message = self._to_message(event, self._seq)
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:
+                # Loop already closed; the subscriber is gone
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: Dict[str, Any]):
+        """Queue a message, replacing the backlog with a reset if the client is too slow"""
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "reset", "seq": message["seq"]})
+
+    @staticmethod
+    def _to_message(event: dict, seq: int) -> Dict[str, Any]:
+        """JSON-ready copy of an event"""
+        message = {"seq": seq, "type": event["type"], "name": event["name"]}
+        if event["type"] == "put":
+            last_modified: Optional[Any] = event.get("last_modified")
+            message.update(
+                size=event.get("size"),
+                etag=event.get("etag"),
+                last_modified=last_modified.isoformat() if last_modified else None
+            )
+        return message
+
+    def _follow_bucket(self):
+        """Publish bucket notifications, reconnecting with backoff"""
+        delay = 1
+        while True:
+            try:
+                for event in self.storage.listen_bucket_events():
+                    delay = 1
+                    self.publish(event)
+            except Exception as e:
+                logger.warning(f"Bucket notifications interrupted: {e}; retrying in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def stats(self) -> dict:
+        """
+        Feed counters
+
+        Returns:
+            dict: Connected subscribers and events published
+        """
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "events": self._seq
+            }
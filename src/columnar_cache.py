@@ -0,0 +1,561 @@
+"""
+Columnar Cache Module
+Parquet sidecars of tabular files for fast repeat queries
+"""
+import os
+import io
+import csv
+import json
+import itertools
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+import logging
+
+from config.settings import Settings
+from src.storage_service import StorageService, INTERNAL_PREFIX
+from src.file_search import iter_lines
+
+try:
+    import pyarrow
+    import pyarrow.compute as pyarrow_compute
+    import pyarrow.csv as pyarrow_csv
+    import pyarrow.parquet as pyarrow_parquet
+except ImportError:  # optional
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# Sidecars live in the bucket at INTERNAL_PREFIX + SIDECAR_PREFIX + <name>.parquet
+SIDECAR_PREFIX = "columnar/"
+SOURCE_ETAG_HEADER = "X-Amz-Meta-Source-Etag"
+
+TABULAR_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+# Comparisons pyarrow can push down into the Parquet scan
+PUSHDOWN_OPS = {"==", "<", "<=", ">", ">=", "in"}
+
+# CSV cells FileQuery's coerce() turns into ints rather than floats
+INTEGER_PATTERN = r"^[+-]?\d+$"
+
+# Schema metadata key listing float columns whose integral values were ints
+INTEGRAL_COLUMNS_KEY = b"integral_columns"
+
+
+def tabular_format(filename: str) -> Optional[str]:
+    """csv, tsv or jsonl for files that get a sidecar, else None"""
+    lowered = filename.lower()
+    for extension, fmt in TABULAR_FORMATS.items():
+        if lowered.endswith(extension):
+            return fmt
+    return None
+
+
+def _comparable(arrow_type: "pyarrow.DataType", value: Any) -> bool:
+    """Whether a pushed-down constant (or list of them) can be compared with a column"""
+    values = value if isinstance(value, list) else [value]
+    if pyarrow.types.is_string(arrow_type):
+        return all(isinstance(item, str) for item in values)
+    if pyarrow.types.is_integer(arrow_type) or pyarrow.types.is_floating(arrow_type):
+        return all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in values)
+    if pyarrow.types.is_boolean(arrow_type):
+        return all(isinstance(item, bool) for item in values)
+    return False
+
+
+class _ChunkReader(io.RawIOBase):
+    """Readable file over an iterator of byte chunks"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _profile_column(column: "pyarrow.ChunkedArray", profile: Dict[str, bool], number_pattern: str):
+    """
+    Update what is known about a CSV text column from one batch of it
+
+    Args:
+        column: Cells of the batch (empty cells are null)
+        profile: Flags accumulated over earlier batches
+        number_pattern: Pattern of cells FileQuery reads as numbers
+    """
+    if not profile["numeric"]:
+        return
+    values = column.drop_null()
+    if len(values) == 0:
+        return
+    if not pyarrow_compute.all(pyarrow_compute.match_substring_regex(values, number_pattern)).as_py():
+        profile["numeric"] = False
+        return
+
+    int_like = pyarrow_compute.match_substring_regex(values, INTEGER_PATTERN)
+    ints = values.filter(int_like)
+    floats = values.filter(pyarrow_compute.invert(int_like))
+    if len(ints):
+        profile["ints"] = True
+        try:
+            parsed = pyarrow_compute.cast(
+                pyarrow_compute.replace_substring_regex(ints, r"^\+", ""), pyarrow.int64()
+            )
+        except pyarrow.ArrowInvalid:
+            # Beyond int64
+            profile["int_overflow"] = True
+        else:
+            bound = 2 ** 53
+            if pyarrow_compute.max(parsed).as_py() >= bound or pyarrow_compute.min(parsed).as_py() <= -bound:
+                profile["large_ints"] = True
+    if len(floats):
+        profile["floats"] = True
+        parsed = pyarrow_compute.cast(floats, pyarrow.float64())
+        if pyarrow_compute.any(pyarrow_compute.equal(pyarrow_compute.floor(parsed), parsed)).as_py():
+            # e.g. "3.0", which must stay a float next to ints in the same column
+            profile["integral_floats"] = True
+
+
+def _column_type(profile: Dict[str, bool]) -> Tuple["pyarrow.DataType", bool]:
+    """
+    Parquet type of a profiled CSV column
+
+    Returns:
+        tuple: (type, whether integral values are read back as ints)
+    """
+    if not profile["numeric"] or not (profile["ints"] or profile["floats"]):
+        return pyarrow.string(), False
+    if not profile["floats"]:
+        if profile["int_overflow"]:
+            return pyarrow.string(), False
+        return pyarrow.int64(), False
+    if not profile["ints"]:
+        return pyarrow.float64(), False
+    if profile["int_overflow"] or profile["large_ints"] or profile["integral_floats"]:
+        # float64 could not tell the ints apart from the floats
+        return pyarrow.string(), False
+    return pyarrow.float64(), True
+
+
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def get_columnar_cache(settings: Settings, storage_service: StorageService) -> Optional["ColumnarCache"]:
+    """
+    Return the process-wide columnar cache for a storage service
+
+    Args:
+        settings: Application settings
+        storage_service: Storage service whose tabular files are converted
+
+    Returns:
+        ColumnarCache: Shared cache, or None when disabled or pyarrow is missing
+    """
+    if not settings.columnar_cache_enabled:
+        return None
+    if pyarrow is None:
+        logger.warning("⚠️ COLUMNAR_CACHE_ENABLED is set but pyarrow is not installed; queries will parse files directly")
+        return None
+
+    with _shared_lock:
+        cache = _shared_caches.get(id(storage_service))
+        if cache is None:
+            cache = ColumnarCache(
+                storage_service,
+                cache_dir=os.path.join(settings.columnar_cache_dir, storage_service.bucket_name),
+                max_object_bytes=settings.columnar_max_file_mb * 1024 * 1024
+            )
+            _shared_caches[id(storage_service)] = cache
+        return cache
+
+
+class ColumnarCache:
+    """Converts CSV/TSV/JSONL objects to Parquet and serves pruned, filtered reads"""
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        cache_dir: str,
+        max_object_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        Start converting tabular files as they are written
+
+        Each sidecar records the ETag of the object it was built from and
+        is only used while that object is unchanged. Sidecars are shared
+        through the bucket and kept on local disk for reads.
+
+        Args:
+            storage_service: Storage service holding the files
+            cache_dir: Local directory for Parquet copies
+            max_object_bytes: Larger objects are not converted
+        """
+        if pyarrow is None:
+            raise RuntimeError("Columnar sidecars require the pyarrow package")
+        self.storage = storage_service
+        self.cache_dir = cache_dir
+        self.max_object_bytes = max_object_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: Set[Tuple[str, Optional[str]]] = set()
+        # name -> ETag of content that could not be converted, so it is not retried
+        self._unconvertible: Dict[str, str] = {}
+        # One worker keeps conversions of the same object in event order
+        self._updates = ThreadPoolExecutor(max_workers=1, thread_name_prefix="columnar")
+        storage_service.add_listener(self._on_change)
+
+    def _on_change(self, event: dict):
+        """Storage listener: convert written tabular files, drop sidecars of deleted ones"""
+        if event["name"].startswith(INTERNAL_PREFIX) or tabular_format(event["name"]) is None:
+            return
+        if event["type"] == "put" and event["size"] <= self.max_object_bytes:
+            self._schedule(event["name"], event["etag"])
+        else:
+            self._updates.submit(self.remove, event["name"])
+
+    def _schedule(self, object_name: str, etag: Optional[str]):
+        key = (object_name, etag)
+        with self._lock:
+            if key in self._pending or (etag and self._unconvertible.get(object_name) == etag):
+                return
+            self._pending.add(key)
+
+        def run():
+            try:
+                self.convert(object_name, etag)
+            except Exception as e:
+                logger.error(f"❌ Columnar conversion of {object_name} failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        self._updates.submit(run)
+
+    def _local_path(self, object_name: str) -> str:
+        digest = hashlib.sha256(object_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.parquet")
+
+    @staticmethod
+    def _sidecar_name(object_name: str) -> str:
+        return f"{SIDECAR_PREFIX}{object_name}.parquet"
+
+    def convert(self, object_name: str, etag: Optional[str] = None) -> bool:
+        """
+        Build (or rebuild) the Parquet sidecar of one object
+
+        Args:
+            object_name: CSV, TSV or JSONL object
+            etag: ETag the content is expected to have (looked up if omitted)
+
+        Returns:
+            bool: True if a sidecar for the current content was written
+        """
+        fmt = tabular_format(object_name)
+        metadata = self.storage.get_file_metadata(object_name)
+        if fmt is None or metadata is None or metadata["size"] > self.max_object_bytes:
+            return False
+        if etag is not None and metadata["etag"] != etag:
+            # Superseded by a later write, which has its own conversion queued
+            return False
+        etag = metadata["etag"]
+        if self._local_etag(object_name) == etag:
+            return True
+
+        chunks = self.storage.download_stream(object_name)
+        if chunks is None:
+            return False
+        path = self._local_path(object_name)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            try:
+                num_rows, num_columns = self._write_parquet(
+                    chunks, fmt, temp_path, {"source_etag": etag, "source_name": object_name}
+                )
+            except (pyarrow.ArrowException, ValueError, TypeError) as e:
+                # e.g. ragged CSV rows or a JSONL column mixing numbers and text
+                logger.warning(f"⚠️ {object_name} cannot be stored as Parquet: {e}")
+                with self._lock:
+                    self._unconvertible[object_name] = etag
+                return False
+            finally:
+                chunks.close()
+
+            # The object may have changed while it was being read
+            current = self.storage.get_file_metadata(object_name)
+            if current is None or current["etag"] != etag:
+                return False
+
+            with open(temp_path, "rb") as f:
+                data = f.read()
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.storage.put_internal(
+            self._sidecar_name(object_name),
+            data,
+            metadata={SOURCE_ETAG_HEADER: etag}
+        )
+        logger.info(
+            f"🗂️ Columnar sidecar for {object_name}: {num_rows} row(s), "
+            f"{num_columns} column(s), {len(data)} bytes"
+        )
+        return True
+
+    def _write_parquet(
+        self,
+        chunks: Iterator[bytes],
+        fmt: str,
+        path: str,
+        metadata: Dict[str, str]
+    ) -> Tuple[int, int]:
+        """
+        Convert an object body to a Parquet file matching FileQuery's row semantics
+
+        JSONL is only converted when Parquet can hold the rows unchanged:
+        flat values, one type per column and the same keys in every row;
+        anything else raises ValueError.
+
+        Args:
+            chunks: Object body
+            fmt: csv, tsv or jsonl
+            path: Parquet file to write
+            metadata: Schema metadata to record
+
+        Returns:
+            tuple: (row count, column count)
+        """
+        if fmt != "jsonl":
+            return self._write_csv(chunks, "\t" if fmt == "tsv" else ",", path, metadata)
+        table = self._read_jsonl(chunks).replace_schema_metadata(metadata)
+        pyarrow_parquet.write_table(table, path, compression="zstd")
+        return table.num_rows, table.num_columns
+
+    def _write_csv(
+        self,
+        chunks: Iterator[bytes],
+        delimiter: str,
+        path: str,
+        metadata: Dict[str, str]
+    ) -> Tuple[int, int]:
+        """
+        Convert a CSV/TSV body to Parquet one batch at a time
+
+        Cells are first staged as text (only empty cells are null). A
+        column is then stored as int64 or float64 only when every cell
+        is one FileQuery's coerce() reads as a number, so rows come back
+        exactly as when the file is parsed directly while numeric
+        conditions can still be pushed into the scan. A column holding
+        both ints and floats is stored as float64 with its integral
+        values read back as ints, unless that could not be told apart.
+        """
+        # file_query imports this module
+        from src.file_query import NUMBER_RE
+
+        chunks = iter(chunks)
+        # The header is parsed as FileQuery parses it, from the first line only
+        head = b""
+        for chunk in chunks:
+            head += chunk
+            if b"\n" in head:
+                break
+        header = next(csv.reader(iter_lines([head]), delimiter=delimiter), None)
+        if not header:
+            raise ValueError("no header row")
+        if len(set(header)) != len(header):
+            raise ValueError("duplicate column names")
+
+        reader = pyarrow_csv.open_csv(
+            io.BufferedReader(_ChunkReader(itertools.chain([head], chunks))),
+            read_options=pyarrow_csv.ReadOptions(column_names=header, skip_rows=1),
+            parse_options=pyarrow_csv.ParseOptions(delimiter=delimiter),
+            convert_options=pyarrow_csv.ConvertOptions(
+                column_types={name: pyarrow.string() for name in header},
+                null_values=[""],
+                strings_can_be_null=True
+            )
+        )
+        profiles = {
+            name: {
+                "numeric": True, "ints": False, "floats": False,
+                "int_overflow": False, "large_ints": False, "integral_floats": False
+            }
+            for name in header
+        }
+        fd, staging_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            num_rows = 0
+            with pyarrow_parquet.ParquetWriter(staging_path, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    num_rows += batch.num_rows
+                    for name, column in zip(header, batch.columns):
+                        _profile_column(column, profiles[name], NUMBER_RE.pattern)
+
+            types = {name: _column_type(profiles[name]) for name in header}
+            integral = [name for name in header if types[name][1]]
+            if integral:
+                metadata = {**metadata, INTEGRAL_COLUMNS_KEY.decode(): json.dumps(integral)}
+            schema = pyarrow.schema(
+                [pyarrow.field(name, types[name][0]) for name in header], metadata=metadata
+            )
+            staged = pyarrow_parquet.ParquetFile(staging_path)
+            try:
+                with pyarrow_parquet.ParquetWriter(path, schema, compression="zstd") as writer:
+                    for batch in staged.iter_batches():
+                        arrays = []
+                        for field, column in zip(schema, batch.columns):
+                            if pyarrow.types.is_integer(field.type):
+                                # int64 parsing rejects the "+" coerce() accepts
+                                column = pyarrow_compute.replace_substring_regex(column, r"^\+", "")
+                            if not pyarrow.types.is_string(field.type):
+                                column = pyarrow_compute.cast(column, field.type)
+                            arrays.append(column)
+                        writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+            finally:
+                staged.close()
+        finally:
+            os.remove(staging_path)
+        return num_rows, len(header)
+
+    @staticmethod
+    def _read_jsonl(chunks: Iterator[bytes]) -> "pyarrow.Table":
+        """Rows of a JSONL body as a table, refusing rows Parquet would change"""
+        rows = []
+        keys = None
+        types: Dict[str, type] = {}
+        for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            row = item if isinstance(item, dict) else {"value": item}
+            if keys is None:
+                keys = list(row)
+            elif list(row) != keys:
+                # Missing keys would come back as nulls
+                raise ValueError("rows have different keys")
+            for key, value in row.items():
+                if value is None:
+                    continue
+                if isinstance(value, (dict, list)):
+                    raise ValueError(f"column '{key}' holds nested values")
+                if types.setdefault(key, type(value)) is not type(value):
+                    # e.g. ints would come back as floats
+                    raise ValueError(f"column '{key}' mixes {types[key].__name__} and {type(value).__name__} values")
+            rows.append(row)
+        return pyarrow.Table.from_pylist(rows)
+
+    def _local_etag(self, object_name: str) -> Optional[str]:
+        """Source ETag recorded in the local Parquet copy, if there is one"""
+        try:
+            schema_metadata = pyarrow_parquet.read_schema(self._local_path(object_name)).metadata or {}
+        except (OSError, pyarrow.ArrowException):
+            return None
+        etag = schema_metadata.get(b"source_etag")
+        return etag.decode("utf-8") if etag else None
+
+    def _ensure_local(self, object_name: str, etag: str) -> bool:
+        """Make the local copy current, fetching the bucket sidecar if another process built it"""
+        if self._local_etag(object_name) == etag:
+            return True
+        fetched = self.storage.get_internal(self._sidecar_name(object_name))
+        if fetched is not None:
+            data, headers = fetched
+            source_etag = {key.lower(): value for key, value in headers.items()}.get(SOURCE_ETAG_HEADER.lower())
+            if source_etag == etag:
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self._local_path(object_name))
+                return True
+        return False
+
+    def open(
+        self,
+        object_name: str,
+        etag: str,
+        columns: Optional[Set[str]] = None,
+        conditions: Optional[List[Tuple[str, str, Any]]] = None
+    ) -> Optional[Tuple[Iterator[dict], List[str]]]:
+        """
+        Read an object's rows from its sidecar
+
+        Args:
+            object_name: Tabular object
+            etag: Current ETag of the object; stale sidecars are ignored
+            columns: Columns to read (None for all)
+            conditions: (column, op, value) filters, all of which must hold;
+                rows failing them may be skipped, so they only narrow the scan
+
+        Returns:
+            tuple: (row dict generator, all column names), or None if no
+            current sidecar exists (one is then built in the background)
+        """
+        if not self._ensure_local(object_name, etag):
+            self._schedule(object_name, etag)
+            return None
+
+        path = self._local_path(object_name)
+        schema = pyarrow_parquet.read_schema(path)
+        names = schema.names
+        selected = [name for name in names if columns is None or name in columns]
+        integral = set(json.loads((schema.metadata or {}).get(INTEGRAL_COLUMNS_KEY, b"[]")))
+        restore = [name for name in selected if name in integral]
+        # Conditions whose constant does not fit the column's type stay with FileQuery
+        filters = [
+            (column, op, value) for column, op, value in (conditions or [])
+            if column in names and op in PUSHDOWN_OPS
+            and _comparable(schema.field(column).type, value)
+        ]
+        try:
+            table = pyarrow_parquet.read_table(path, columns=selected, filters=filters or None)
+        except (pyarrow.ArrowException, TypeError, ValueError):
+            # e.g. a text constant compared with a numeric column
+            table = pyarrow_parquet.read_table(path, columns=selected)
+
+        def rows():
+            for batch in table.to_batches():
+                for row in batch.to_pylist():
+                    for name in restore:
+                        value = row[name]
+                        if value is not None and value.is_integer():
+                            row[name] = int(value)
+                    yield row
+
+        return rows(), names
+
+    def remove(self, object_name: str):
+        """Drop the sidecar of a deleted (or no longer convertible) object"""
+        with self._lock:
+            self._unconvertible.pop(object_name, None)
+        path = self._local_path(object_name)
+        if os.path.exists(path):
+            os.remove(path)
+        self.storage.remove_internal(self._sidecar_name(object_name))
+
+    def close(self):
+        """Stop converting"""
+        self._updates.shutdown(wait=False)
@@ -0,0 +1,238 @@
+"""
+Compression Module
+Negotiated, streaming response compression for the web API
+"""
+import zlib
+from typing import List, Optional, Tuple
+import logging
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Content types that are already compressed or must not be buffered
+SKIP_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/pdf",
+)
+
+# Statuses whose body must not be re-encoded
+SKIP_STATUSES = {204, 206, 304}
+
+
+class _GzipEncoder:
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def available_encodings() -> List[str]:
+    """Encodings this process can produce, most preferred first"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def choose_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Pick the encoding to use for an Accept-Encoding header
+
+    Our own preference order breaks ties between encodings the client
+    accepts with the same quality.
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    candidates = [
+        (accepted.get(encoding, accepted.get("*", 0.0)), -rank, encoding)
+        for rank, encoding in enumerate(encodings)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def _new_encoder(encoding: str):
+    if encoding == "zstd":
+        return _ZstdEncoder()
+    if encoding == "br":
+        return _BrotliEncoder()
+    return _GzipEncoder()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with zstd, brotli or gzip
+
+    Small bodies, already-compressed content types, event streams and
+    partial / empty responses pass through untouched. Streaming bodies
+    are compressed chunk by chunk, so they are never buffered whole.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        """
+        Args:
+            app: ASGI application to wrap
+            minimum_size: Bodies smaller than this are sent uncompressed
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+        logger.info(f"Response compression: {', '.join(self.encodings)}")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = choose_encoding(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Decides per response whether to compress, then rewrites the body messages"""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self._start = None
+        self._encoder = None
+        self._passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self._start = message
+            if not self._eligible(message):
+                self._passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._encoder is None:
+            if not more_body and len(body) < self.minimum_size:
+                # Too small to be worth it
+                self._passthrough = True
+                self._start["headers"] = self._with_vary(self._start["headers"])
+                await self._send(self._start)
+                await self._send(message)
+                return
+
+            self._encoder = _new_encoder(self.encoding)
+            await self._send({**self._start, "headers": self._compressed_headers()})
+
+        data = self._encoder.compress(body)
+        if not more_body:
+            data += self._encoder.finish()
+        if data or not more_body:
+            await self._send({
+                "type": "http.response.body",
+                "body": data,
+                "more_body": more_body
+            })
+
+    @staticmethod
+    def _eligible(start) -> bool:
+        """Whether a response (judged by its start message) may be compressed"""
+        if start["status"] in SKIP_STATUSES:
+            return False
+        content_type = ""
+        for name, value in start["headers"]:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return not content_type.startswith(SKIP_CONTENT_TYPES)
+
+    @staticmethod
+    def _with_vary(headers) -> List[Tuple[bytes, bytes]]:
+        vary = [value for name, value in headers if name == b"vary"]
+        headers = [(name, value) for name, value in headers if name != b"vary"]
+        headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+        return headers
+
+    def _compressed_headers(self) -> List[Tuple[bytes, bytes]]:
+        headers = []
+        for name, value in self._start["headers"]:
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                # The encoded body differs byte-for-byte from the stored object
+                value = b"W/" + value
+            headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        return self._with_vary(headers)
@@ -0,0 +1,175 @@
+"""
+Context Budget Module
+Keeps chat history within a prompt-token budget
+"""
+import json
+from typing import Any, Dict, List, Optional
+import google.generativeai as genai
+import logging
+
+from src.session_store import content_size, turn_starts
+
+logger = logging.getLogger(__name__)
+
+# Rough bytes-per-token ratio used for estimates
+BYTES_PER_TOKEN = 4
+
+COMPACTED_NOTE = "Output removed from context to save tokens; call the tool again to re-fetch it"
+
+
+def estimate_tokens(content: Any) -> int:
+    """Approximate prompt tokens taken by one history entry"""
+    return content_size(content) // BYTES_PER_TOKEN + 1
+
+
+def summarize_result(result: Any) -> Dict[str, Any]:
+    """
+    Shrink a tool result to a short reference
+
+    Scalars and short strings (filename, size, success, error...) are
+    kept; file contents and long lists are dropped.
+    """
+    if not isinstance(result, dict):
+        return {"compacted": True, "note": COMPACTED_NOTE}
+
+    summary = {
+        key: value for key, value in result.items()
+        if isinstance(value, (bool, int, float))
+        or (isinstance(value, str) and len(value) <= 200)
+    }
+    files = result.get("files")
+    if isinstance(files, list):
+        summary["files"] = [
+            (item.get("filename") or item.get("name")) if isinstance(item, dict) else item
+            for item in files[:50]
+        ]
+    summary["compacted"] = True
+    summary["note"] = COMPACTED_NOTE
+    return summary
+
+
+class ContextBudget:
+    """Compacts old tool outputs (then old turns) when history exceeds a token budget"""
+
+    def __init__(
+        self,
+        max_tokens: int = 100_000,
+        keep_recent_tool_results: int = 2,
+        tool_result_max_chars: int = 100_000
+    ):
+        """
+        Initialize the budget
+
+        Args:
+            max_tokens: Target upper bound for the history's prompt tokens
+            keep_recent_tool_results: Most recent tool-result messages never compacted
+            tool_result_max_chars: Hard cap on a single fresh tool output
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent_tool_results = keep_recent_tool_results
+        self.tool_result_max_chars = tool_result_max_chars
+        self.compactions = 0
+
+    def clip(self, output: str) -> str:
+        """
+        Cap a fresh tool output before it enters the history
+
+        Args:
+            output: JSON tool output
+
+        Returns:
+            str: The output, or a truncated notice when it is too large
+        """
+        if len(output) <= self.tool_result_max_chars:
+            return output
+        try:
+            result = json.loads(output)
+        except ValueError:
+            result = {}
+        summary = summarize_result(result)
+        summary["truncated"] = True
+        summary["note"] = (
+            f"Output was {len(output)} characters, over the "
+            f"{self.tool_result_max_chars}-character limit; request a smaller part"
+        )
+        return json.dumps(summary)
+
+    def compact(self, history: List[Any]) -> Optional[List[Any]]:
+        """
+        Bring a history under budget
+
+        Old tool outputs are replaced by short references first, oldest
+        first; if that is not enough, whole turns are dropped from the
+        start while keeping the current one.
+
+        Args:
+            history: Chat history contents
+
+        Returns:
+            list: Compacted history, or None when it already fits
+        """
+        sizes = [estimate_tokens(content) for content in history]
+        total = sum(sizes)
+        if total <= self.max_tokens:
+            return None
+
+        history = list(history)
+        tool_indices = [
+            index for index, content in enumerate(history)
+            if any(part.function_response.name for part in content.parts)
+        ]
+        if self.keep_recent_tool_results:
+            tool_indices = tool_indices[:-self.keep_recent_tool_results]
+
+        for index in tool_indices:
+            if total <= self.max_tokens:
+                break
+            compacted = self._compact_content(history[index])
+            if compacted is None:
+                continue
+            new_size = estimate_tokens(compacted)
+            total -= sizes[index] - new_size
+            history[index] = compacted
+            sizes[index] = new_size
+
+        starts = turn_starts(history)
+        while total > self.max_tokens and len(starts) > 1:
+            cut = starts[1]
+            total -= sum(sizes[:cut])
+            del history[:cut]
+            del sizes[:cut]
+            starts = turn_starts(history)
+
+        self.compactions += 1
+        logger.info(f"Compacted history to ~{total} tokens ({len(history)} messages)")
+        return history
+
+    @staticmethod
+    def _compact_content(content: Any) -> Optional[Any]:
+        """Replace the tool outputs in one message with references; None if nothing to do"""
+        parts = []
+        changed = False
+        for part in content.parts:
+            response = part.function_response
+            if not response.name:
+                parts.append(part)
+                continue
+
+            raw = response.response.get("result") if response.response else None
+            try:
+                result = json.loads(raw) if isinstance(raw, str) else raw
+            except ValueError:
+                result = None
+            if isinstance(result, dict) and result.get("compacted"):
+                parts.append(part)
+                continue
+
+            parts.append(genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                name=response.name,
+                response={"result": json.dumps(summarize_result(result))}
+            )))
+            changed = True
+
+        if not changed:
+            return None
+        return genai.protos.Content(role=content.role, parts=parts)
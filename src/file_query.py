@@ -0,0 +1,592 @@
+"""
+File Query Module
+Server-side filtering, projection and aggregation over CSV / JSON / JSONL files
+"""
+import re
+import csv
+import ast
+import json
+import heapq
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from src.storage_service import StorageService
+from src.file_search import iter_lines
+from src.columnar_cache import ColumnarCache, tabular_format
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on rows returned by one query
+MAX_RESULT_ROWS = 1000
+
+AGGREGATE_RE = re.compile(r"^\s*(count|sum|avg|min|max)\s*\(\s*(.*?)\s*\)\s*$", re.IGNORECASE)
+NUMBER_RE = re.compile(r"^[+-]?(\d+\.?\d*([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?)$")
+BACKTICK_RE = re.compile(r"`([^`]+)`")
+
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+# Functions callable from a where expression
+WHERE_FUNCTIONS = {
+    "lower": lambda value: value.lower() if isinstance(value, str) else value,
+    "upper": lambda value: value.upper() if isinstance(value, str) else value,
+    "len": lambda value: len(value) if value is not None else None,
+    "abs": lambda value: abs(value) if value is not None else None,
+    "round": lambda value, digits=0: round(value, digits) if value is not None else None,
+    "contains": lambda value, part: part in value if isinstance(value, str) else False,
+    "startswith": lambda value, part: value.startswith(part) if isinstance(value, str) else False,
+    "endswith": lambda value, part: value.endswith(part) if isinstance(value, str) else False,
+}
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Is, ast.IsNot, ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod,
+    ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List, ast.Call,
+)
+
+
+COMPARISON_OPS = {ast.Eq: "==", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+FLIPPED_OPS = {ast.Eq: ast.Eq, ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE}
+
+
+class QueryError(ValueError):
+    """A query that cannot be run as written"""
+
+
+def coerce(value: Any) -> Any:
+    """Turn a CSV cell into a number, None (empty) or leave it as text"""
+    if not isinstance(value, str):
+        return value
+    if value == "":
+        return None
+    if NUMBER_RE.match(value):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
+
+
+class _Row(dict):
+    """Row namespace for where expressions; absent columns read as None"""
+
+    def __missing__(self, key):
+        return WHERE_FUNCTIONS.get(key)
+
+
+def _parse_where(expression: str) -> Tuple[ast.Expression, Dict[str, str]]:
+    """Parse a where expression, replacing backticked columns by placeholder names"""
+    quoted = {}
+
+    def placeholder(match):
+        name = f"__column_{len(quoted)}"
+        quoted[name] = match.group(1)
+        return name
+
+    source = BACKTICK_RE.sub(placeholder, expression.strip())
+    try:
+        return ast.parse(source, mode="eval"), quoted
+    except SyntaxError as e:
+        raise QueryError(f"Invalid where expression: {e.msg}")
+
+
+def compile_where(expression: str) -> Tuple[Optional[Callable[[dict], bool]], List[str]]:
+    """
+    Compile a where expression into a row predicate
+
+    Expressions use Python syntax restricted to comparisons, and/or/not,
+    arithmetic, constants and a few functions (lower, upper, len, abs,
+    round, contains, startswith, endswith). Column names that are not
+    identifiers are written in backticks, e.g. `unit price` > 10.
+
+    Args:
+        expression: Filter such as "amount > 100 and status == 'paid'"
+
+    Returns:
+        tuple: (predicate or None for no filter, referenced column names)
+    """
+    if not expression or not expression.strip():
+        return None, []
+
+    tree, quoted = _parse_where(expression)
+    columns = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise QueryError(f"Unsupported syntax in where expression: {type(node).__name__}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in WHERE_FUNCTIONS or node.keywords:
+                raise QueryError(f"Unsupported function in where expression (allowed: {', '.join(WHERE_FUNCTIONS)})")
+        elif isinstance(node, ast.Name) and node.id.startswith("__") and node.id not in quoted:
+            raise QueryError(f"Unsupported name in where expression: {node.id}")
+        elif isinstance(node, ast.Name) and node.id not in WHERE_FUNCTIONS:
+            columns.append(quoted.get(node.id, node.id))
+
+    # Backticked columns are bound under their placeholder names at eval time
+    code = compile(tree, "<where>", "eval")
+    namespace = {"__builtins__": {}, **WHERE_FUNCTIONS}
+
+    def predicate(row: dict) -> bool:
+        values = _Row(row)
+        for name, column in quoted.items():
+            values[name] = row.get(column)
+        try:
+            return bool(eval(code, namespace, values))
+        except (TypeError, ValueError, ZeroDivisionError, AttributeError):
+            # e.g. comparing a missing value with a number: the row does not match
+            return False
+
+    return predicate, list(dict.fromkeys(columns))
+
+
+def pushdown_conditions(expression: str) -> List[Tuple[str, str, Any]]:
+    """
+    Simple conditions of a where expression that a columnar reader can apply
+
+    Only top-level `and` terms comparing a column with numbers or text
+    are returned (e.g. price > 10, status in ('paid', 'open')). Rows
+    failing them can never match the full expression, so skipping them
+    early is safe; the full predicate is still applied afterwards.
+
+    Returns:
+        list: (column, op, value) tuples with op one of ==, <, <=, >, >=, in
+    """
+    if not expression or not expression.strip():
+        return []
+    tree, quoted = _parse_where(expression)
+    body = tree.body
+    terms = body.values if isinstance(body, ast.BoolOp) and isinstance(body.op, ast.And) else [body]
+
+    def constant(node):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float, str):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = constant(node.operand)
+            return -value if type(value) in (int, float) else None
+        return None
+
+    conditions = []
+    for term in terms:
+        if not isinstance(term, ast.Compare) or len(term.ops) != 1:
+            continue
+        left, op, right = term.left, type(term.ops[0]), term.comparators[0]
+        if isinstance(right, ast.Name) and op in FLIPPED_OPS:
+            left, right, op = right, left, FLIPPED_OPS[op]
+        if not isinstance(left, ast.Name) or left.id in WHERE_FUNCTIONS:
+            continue
+        column = quoted.get(left.id, left.id)
+        if op is ast.In and isinstance(right, (ast.Tuple, ast.List)):
+            values = [constant(element) for element in right.elts]
+            if values and None not in values:
+                conditions.append((column, "in", values))
+        elif op in COMPARISON_OPS and constant(right) is not None:
+            conditions.append((column, COMPARISON_OPS[op], constant(right)))
+    return conditions
+
+
+def parse_aggregates(aggregates: List[str]) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Parse aggregate specs such as 'avg(price)' or 'count(*)'
+
+    Returns:
+        list: (output name, function, column or None for count(*))
+    """
+    parsed = []
+    for spec in aggregates:
+        match = AGGREGATE_RE.match(spec)
+        if not match:
+            raise QueryError(f"Invalid aggregate '{spec}' (use count, sum, avg, min or max, e.g. 'avg(price)')")
+        function, column = match.group(1).lower(), match.group(2).strip("`")
+        if column in ("", "*"):
+            if function != "count":
+                raise QueryError(f"{function}() needs a column")
+            column = None
+        parsed.append((f"{function}({column or '*'})", function, column))
+    return parsed
+
+
+class _Accumulator:
+    """Running state of the aggregates for one group"""
+
+    __slots__ = ("values",)
+
+    def __init__(self, aggregates):
+        self.values = [[0, 0, None, None] for _ in aggregates]  # count, sum, min, max
+
+    def add(self, aggregates, row: dict):
+        for state, (_, function, column) in zip(self.values, aggregates):
+            if column is None:
+                state[0] += 1
+                continue
+            value = row.get(column)
+            if value is None:
+                continue
+            state[0] += 1
+            if function in ("sum", "avg") and isinstance(value, (int, float)) and not isinstance(value, bool):
+                state[1] += value
+            if function == "min" and (state[2] is None or _order_key(value) < _order_key(state[2])):
+                state[2] = value
+            if function == "max" and (state[3] is None or _order_key(value) > _order_key(state[3])):
+                state[3] = value
+
+    def results(self, aggregates) -> List[Any]:
+        results = []
+        for (count, total, low, high), (_, function, _) in zip(self.values, aggregates):
+            if function == "count":
+                results.append(count)
+            elif function == "sum":
+                results.append(total)
+            elif function == "avg":
+                results.append(total / count if count else None)
+            elif function == "min":
+                results.append(low)
+            else:
+                results.append(high)
+        return results
+
+
+def _order_key(value: Any, descending: bool = False) -> Tuple[bool, bool, Any]:
+    """Sort key that puts None last (in either direction) and never compares numbers with text"""
+    if value is None:
+        return (not descending, False, 0)
+    if isinstance(value, (int, float)):
+        return (descending, False, value)
+    return (descending, True, str(value))
+
+
+class _Descending:
+    """Wraps a sort key to invert its order (for bounded top-k heaps)"""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        # Tuple comparison checks equality first; without this, tied keys
+        # never reach the tie-breaker that follows them
+        return self.key == other.key
+
+
+class FileQuery:
+    """Runs filter / projection / aggregation queries over one stored file"""
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        max_json_bytes: int = 100 * 1024 * 1024,
+        columnar: Optional[ColumnarCache] = None
+    ):
+        """
+        Initialize the query engine
+
+        Args:
+            storage_service: Storage service holding the files
+            max_json_bytes: JSON documents (not JSONL) are parsed whole,
+                so larger ones are refused
+            columnar: Parquet sidecars to read CSV/TSV/JSONL files from
+                when they are current
+        """
+        self.storage = storage_service
+        self.max_json_bytes = max_json_bytes
+        self.columnar = columnar
+
+    def query(
+        self,
+        filename: str,
+        columns: Optional[List[str]] = None,
+        where: str = "",
+        group_by: Optional[List[str]] = None,
+        aggregates: Optional[List[str]] = None,
+        order_by: str = "",
+        limit: int = 100,
+        format: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Query a CSV, TSV, JSON (array of objects) or JSONL file
+
+        Rows are streamed, so only the result is held in memory (JSON
+        documents excepted). Without aggregates, matching rows are
+        projected onto `columns`; with aggregates, one row per group
+        is returned.
+
+        Args:
+            filename: File to query
+            columns: Columns to return (default: all, or the group columns)
+            where: Filter expression (see compile_where)
+            group_by: Columns to group by before aggregating
+            aggregates: e.g. ['count(*)', 'avg(price)', 'max(date)']
+            order_by: Output column to sort by, optionally followed by 'desc'
+            limit: Maximum number of rows returned
+            format: csv, tsv, json or jsonl (default: from the extension)
+
+        Returns:
+            dict: Result columns and rows with scan statistics, or error
+        """
+        rows = None
+        try:
+            fmt = self._format(filename, format)
+            predicate, where_columns = compile_where(where)
+            parsed_aggregates = parse_aggregates(aggregates or [])
+            group_by = list(group_by or [])
+            if group_by and not parsed_aggregates:
+                parsed_aggregates = parse_aggregates(["count(*)"])
+            limit = max(1, min(int(limit), MAX_RESULT_ROWS))
+            sort_column, descending = self._parse_order(order_by)
+
+            output_columns = list(columns or [])
+            if parsed_aggregates:
+                output_columns = group_by + [name for name, _, _ in parsed_aggregates]
+            needed = None
+            if columns or parsed_aggregates:
+                needed = set(where_columns) | set(group_by) | set(columns or []) | {
+                    column for _, _, column in parsed_aggregates if column is not None
+                }
+
+            rows, header = self._rows(filename, fmt, needed, where)
+            if header is not None:
+                unknown = [column for column in (needed or where_columns) if column not in header]
+                if unknown:
+                    raise QueryError(
+                        f"Unknown column(s) {', '.join(unknown)}; "
+                        f"'{filename}' has: {', '.join(header)}"
+                    )
+                if not output_columns:
+                    output_columns = list(header)
+            if sort_column and output_columns and sort_column not in output_columns:
+                raise QueryError(f"order_by must name a result column: {', '.join(output_columns)}")
+
+            stats = {"scanned": 0, "matched": 0}
+
+            def matching():
+                for row in rows:
+                    stats["scanned"] += 1
+                    if predicate is None or predicate(row):
+                        stats["matched"] += 1
+                        yield row
+
+            if parsed_aggregates:
+                result_rows = self._aggregate(matching(), group_by, parsed_aggregates)
+                truncated = False
+            else:
+                result_rows, truncated, output_columns = self._project(
+                    matching(), output_columns, sort_column, descending, limit
+                )
+
+            if sort_column and parsed_aggregates:
+                index = output_columns.index(sort_column)
+                result_rows.sort(key=lambda row: _order_key(row[index], descending), reverse=descending)
+            if len(result_rows) > limit:
+                result_rows, truncated = result_rows[:limit], True
+        except QueryError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        finally:
+            if rows is not None:
+                rows.close()
+
+        logger.info(
+            f"🧮 Query on {filename}: {stats['matched']} of {stats['scanned']} row(s) matched, "
+            f"{len(result_rows)} returned"
+        )
+        return {
+            "success": True,
+            "filename": filename,
+            "columns": output_columns,
+            "rows": result_rows,
+            "count": len(result_rows),
+            "rows_scanned": stats["scanned"],
+            "rows_matched": stats["matched"],
+            "truncated": truncated
+        }
+
+    @staticmethod
+    def _format(filename: str, format: str) -> str:
+        if format:
+            if format.lower() not in FORMATS.values():
+                raise QueryError(f"Unsupported format '{format}' (use csv, tsv, json or jsonl)")
+            return format.lower()
+        for extension, fmt in FORMATS.items():
+            if filename.lower().endswith(extension):
+                return fmt
+        raise QueryError(f"Cannot tell the format of '{filename}'; pass format (csv, tsv, json or jsonl)")
+
+    @staticmethod
+    def _parse_order(order_by: str) -> Tuple[str, bool]:
+        order_by = (order_by or "").strip()
+        if order_by.startswith("-"):
+            return order_by[1:].strip().strip("`"), True
+        column, _, direction = order_by.rpartition(" ")
+        if direction.lower() in ("asc", "desc") and column:
+            return column.strip().strip("`"), direction.lower() == "desc"
+        return order_by.strip("`"), False
+
+    def _rows(
+        self,
+        filename: str,
+        fmt: str,
+        needed: Optional[set],
+        where: str = ""
+    ) -> Tuple[Iterator[dict], Optional[List[str]]]:
+        """
+        Open a file as a stream of row dicts
+
+        A current Parquet sidecar is preferred: only the needed columns
+        are read and simple where conditions prune rows in the scan.
+
+        Returns:
+            tuple: (row generator, header for CSV/TSV or None)
+        """
+        if self.columnar is not None and tabular_format(filename) == fmt:
+            metadata = self.storage.get_file_metadata(filename)
+            if metadata is None:
+                raise QueryError(f"File '{filename}' not found")
+            opened = self.columnar.open(filename, metadata["etag"], needed, pushdown_conditions(where))
+            if opened is not None:
+                rows, names = opened
+                if fmt == "jsonl":
+                    return rows, None
+                # Text cells get the same number coercion as when parsing the CSV
+                return ({name: coerce(value) for name, value in row.items()} for row in rows), names
+
+        chunks = self.storage.download_stream(filename)
+        if chunks is None:
+            raise QueryError(f"File '{filename}' not found")
+
+        if fmt in ("csv", "tsv"):
+            lines = iter_lines(chunks)
+            reader = csv.reader(lines, delimiter="\t" if fmt == "tsv" else ",")
+            header = next(reader, None)
+            if header is None:
+                chunks.close()
+                return (row for row in ()), []
+            indexes = [
+                (name, index) for index, name in enumerate(header)
+                if needed is None or name in needed
+            ]
+
+            def csv_rows():
+                try:
+                    for values in reader:
+                        if not values:
+                            continue
+                        yield {
+                            name: coerce(values[index]) if index < len(values) else None
+                            for name, index in indexes
+                        }
+                finally:
+                    chunks.close()
+
+            return csv_rows(), header
+
+        if fmt == "jsonl":
+            def jsonl_rows():
+                try:
+                    for line_number, line in enumerate(iter_lines(chunks), start=1):
+                        if not line.strip():
+                            continue
+                        try:
+                            item = json.loads(line)
+                        except json.JSONDecodeError as e:
+                            raise QueryError(f"Invalid JSON on line {line_number}: {e.msg}")
+                        yield item if isinstance(item, dict) else {"value": item}
+                finally:
+                    chunks.close()
+
+            return jsonl_rows(), None
+
+        try:
+            data = bytearray()
+            for chunk in chunks:
+                data += chunk
+                if len(data) > self.max_json_bytes:
+                    raise QueryError(
+                        f"'{filename}' is too large to query as a JSON document; store it as JSONL instead"
+                    )
+        finally:
+            chunks.close()
+        try:
+            document = json.loads(bytes(data))
+        except json.JSONDecodeError as e:
+            raise QueryError(f"Invalid JSON: {e.msg}")
+        if isinstance(document, dict):
+            # Accept {"records": [...]}-style wrappers with a single list
+            lists = [value for value in document.values() if isinstance(value, list)]
+            document = lists[0] if len(lists) == 1 else [document]
+        if not isinstance(document, list):
+            document = [document]
+
+        def json_rows():
+            for item in document:
+                yield item if isinstance(item, dict) else {"value": item}
+
+        return json_rows(), None
+
+    @staticmethod
+    def _aggregate(rows: Iterator[dict], group_by: List[str], aggregates) -> List[List[Any]]:
+        """Fold rows into one accumulator per group"""
+        groups: Dict[Tuple, _Accumulator] = {}
+        for row in rows:
+            key = tuple(row.get(column) for column in group_by)
+            accumulator = groups.get(key)
+            if accumulator is None:
+                accumulator = groups[key] = _Accumulator(aggregates)
+            accumulator.add(aggregates, row)
+        if not group_by and not groups:
+            groups[()] = _Accumulator(aggregates)
+        return [list(key) + accumulator.results(aggregates) for key, accumulator in groups.items()]
+
+    @staticmethod
+    def _project(
+        rows: Iterator[dict],
+        columns: List[str],
+        sort_column: str,
+        descending: bool,
+        limit: int
+    ) -> Tuple[List[List[Any]], bool, List[str]]:
+        """
+        Project matching rows onto columns
+
+        Unsorted queries stop reading at limit + 1 rows; sorted ones keep
+        only the best `limit` rows in a heap.
+
+        Returns:
+            tuple: (rows, whether more rows matched, columns)
+        """
+        if not sort_column:
+            selected = []
+            for row in rows:
+                if not columns:
+                    # JSON rows: columns come from the first match
+                    columns = list(row)
+                selected.append([row.get(column) for column in columns])
+                if len(selected) > limit:
+                    return selected[:limit], True, columns
+            return selected, False, columns
+
+        heap = []
+        matched = 0
+        for row in rows:
+            if not columns:
+                columns = list(row)
+            key = _order_key(row.get(sort_column), descending)
+            # Keep the `limit` best rows: the heap root is the worst one kept
+            # Ties keep the earlier row
+            entry = (key if descending else _Descending(key), -matched, [row.get(column) for column in columns])
+            matched += 1
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+        ordered = sorted(heap, reverse=True)
+        return [values for _, _, values in ordered], matched > limit, columns
@@ -0,0 +1,365 @@
+"""
+File Search Module
+Server-side grep across stored objects
+"""
+import re
+import time
+import codecs
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Set, Tuple
+import logging
+
+from src.storage_service import StorageService
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Matching lines (and context lines) are clipped to this many characters
+MAX_LINE_CHARS = 500
+
+# Longest regular expression accepted from a caller
+MAX_PATTERN_CHARS = 1000
+
+_REPEATS = {sre_parse.MIN_REPEAT, sre_parse.MAX_REPEAT}
+_REPEATS.update(op for op in [getattr(sre_parse, "POSSESSIVE_REPEAT", None)] if op is not None)
+
+
+# Code points checked when deciding whether two alternatives can start alike
+_CHAR_SAMPLE = range(0x300)
+_CATEGORY_CHARS = {
+    items[0][1]: {code for code in _CHAR_SAMPLE if re.match(escape, chr(code))}
+    for escape, (op, items) in sre_parse.CATEGORIES.items()
+    if op is sre_parse.IN and len(items) == 1 and items[0][0] is sre_parse.CATEGORY
+}
+
+
+def _first_chars(parsed, ignore_case: bool) -> Tuple[Set[int], bool, bool]:
+    """
+    Characters a sequence can start with
+
+    Returns:
+        tuple: (code points, whether any other character may start it,
+        whether it can match the empty string)
+    """
+    chars: Set[int] = set()
+    for op, arg in parsed:
+        broad, nullable = False, False
+        if op is sre_parse.LITERAL:
+            item = {arg}
+            if ignore_case:
+                item |= {ord(chr(arg).lower()), ord(chr(arg).upper())}
+        elif op is sre_parse.IN:
+            item = set()
+            for item_op, item_arg in arg:
+                if item_op is sre_parse.LITERAL:
+                    item.add(item_arg)
+                elif item_op is sre_parse.RANGE and item_arg[1] - item_arg[0] < len(_CHAR_SAMPLE):
+                    item.update(range(item_arg[0], item_arg[1] + 1))
+                elif item_op is sre_parse.CATEGORY and item_arg in _CATEGORY_CHARS:
+                    item |= _CATEGORY_CHARS[item_arg]
+                    broad = broad or len(_CATEGORY_CHARS[item_arg]) > len(_CHAR_SAMPLE) // 2
+                else:
+                    broad = True
+            if ignore_case:
+                item |= {ord(chr(code).lower()) for code in item} | {ord(chr(code).upper()) for code in item}
+        elif op is sre_parse.SUBPATTERN:
+            item, broad, nullable = _first_chars(arg[-1], ignore_case)
+        elif op is sre_parse.BRANCH:
+            item = set()
+            for branch in arg[1]:
+                branch_chars, branch_broad, branch_nullable = _first_chars(branch, ignore_case)
+                item |= branch_chars
+                broad, nullable = broad or branch_broad, nullable or branch_nullable
+        elif op in _REPEATS:
+            item, broad, nullable = _first_chars(arg[2], ignore_case)
+            nullable = nullable or arg[0] == 0
+        elif op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            item, nullable = set(), True
+        else:
+            # ANY, NOT_LITERAL, group references, ...
+            item, broad, nullable = set(), True, op is sre_parse.GROUPREF
+        chars |= item
+        if broad:
+            return chars, True, False
+        if not nullable:
+            return chars, False, False
+    return chars, False, True
+
+
+def _overlap(first: Tuple[Set[int], bool], other: Tuple[Set[int], bool]) -> bool:
+    """Whether two (chars, broad) first sets share a character"""
+    if first[1] and (other[1] or other[0]) or other[1] and first[0]:
+        return True
+    return bool(first[0] & other[0])
+
+
+def _ambiguous(
+    parsed,
+    ignore_case: bool,
+    inside_unbounded: bool = False,
+    follow: Tuple[Set[int], bool] = (set(), False)
+) -> bool:
+    """
+    True if the pattern can backtrack exponentially
+
+    That is, an unbounded quantifier wraps a variable-length repeat, e.g.
+    (a+)+, or alternatives that can start with the same character, e.g.
+    (a|a)* or (a|aa)*. `follow` is what may come after this sequence.
+    """
+    for index, (op, arg) in enumerate(parsed):
+        rest_chars, rest_broad, rest_nullable = _first_chars(parsed[index + 1:], ignore_case)
+        after = (rest_chars | follow[0], rest_broad or follow[1]) if rest_nullable else (rest_chars, rest_broad)
+        if op in _REPEATS:
+            low, high, body = arg
+            if inside_unbounded and low != high:
+                return True
+            if high is sre_parse.MAXREPEAT or high > 1:
+                # The body may be followed by another pass of itself
+                body_chars, body_broad, _ = _first_chars(body, ignore_case)
+                after = (after[0] | body_chars, after[1] or body_broad)
+            if _ambiguous(body, ignore_case, inside_unbounded or high is sre_parse.MAXREPEAT, after):
+                return True
+        elif op is sre_parse.SUBPATTERN:
+            if _ambiguous(arg[-1], ignore_case, inside_unbounded, after):
+                return True
+        elif op is sre_parse.BRANCH:
+            if inside_unbounded:
+                starts = []
+                for branch in arg[1]:
+                    chars, broad, nullable = _first_chars(branch, ignore_case)
+                    if nullable:
+                        chars, broad = chars | after[0], broad or after[1]
+                    starts.append((chars, broad, nullable))
+                for position, start in enumerate(starts):
+                    for other in starts[position + 1:]:
+                        if start[2] and other[2] or _overlap(start[:2], other[:2]):
+                            return True
+            if any(_ambiguous(branch, ignore_case, inside_unbounded, after) for branch in arg[1]):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _ambiguous(arg[1], ignore_case, inside_unbounded):
+                return True
+    return False
+
+
+def compile_pattern(pattern: str, ignore_case: bool = False) -> "re.Pattern":
+    """
+    Compile a caller-supplied regular expression
+
+    Patterns that can backtrack exponentially on a single line, such as
+    nested quantifiers or overlapping alternatives under a quantifier,
+    are refused.
+
+    Args:
+        pattern: Regular expression
+        ignore_case: Case-insensitive matching
+
+    Returns:
+        re.Pattern: Compiled expression
+
+    Raises:
+        re.error: If the pattern is invalid, too long or too expensive
+    """
+    if len(pattern) > MAX_PATTERN_CHARS:
+        raise re.error(f"pattern is longer than {MAX_PATTERN_CHARS} characters")
+    flags = re.IGNORECASE if ignore_case else 0
+    parsed = sre_parse.parse(pattern, flags)
+    if _ambiguous(parsed, bool(parsed.state.flags & re.IGNORECASE)):
+        raise re.error("nested quantifiers such as (a+)+ and repeated overlapping alternatives such as (a|aa)* are not supported")
+    return re.compile(pattern, flags)
+
+
+class _SearchState:
+    """Match budget shared by the workers of one search"""
+
+    def __init__(self, max_matches: int, deadline: float):
+        self.remaining = max_matches
+        self.deadline = deadline
+        self.truncated = False
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def expired(self) -> bool:
+        """True once the search has run out of time; stops every worker"""
+        if time.monotonic() < self.deadline:
+            return False
+        with self._lock:
+            self.truncated = True
+            self.done.set()
+        return True
+
+    def claim(self) -> bool:
+        """Reserve a slot for one match; False once the budget is spent"""
+        with self._lock:
+            if self.remaining <= 0:
+                self.truncated = True
+                self.done.set()
+                return False
+            self.remaining -= 1
+            return True
+
+
+def iter_lines(chunks: Iterator[bytes]) -> Iterator[str]:
+    """
+    Decode a byte stream as UTF-8 and yield it line by line
+
+    Invalid bytes are replaced rather than aborting the scan.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _clip(line: str) -> str:
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS] + "…"
+
+
+class FileSearcher:
+    """Scans objects in parallel and returns only the matching lines"""
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        max_workers: int = 8,
+        max_object_bytes: int = 100 * 1024 * 1024,
+        max_seconds: float = 10
+    ):
+        """
+        Initialize the searcher
+
+        Args:
+            storage_service: Storage service to scan
+            max_workers: Objects scanned concurrently
+            max_object_bytes: Larger objects are skipped
+            max_seconds: Scan time per search; results found so far are
+                returned as truncated when it runs out
+        """
+        self.storage = storage_service
+        self.max_workers = max_workers
+        self.max_object_bytes = max_object_bytes
+        self.max_seconds = max_seconds
+
+    def search(
+        self,
+        pattern: str,
+        prefix: str = "",
+        max_matches: int = 100,
+        context_lines: int = 0,
+        ignore_case: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Find lines matching a regular expression
+
+        Args:
+            pattern: Regular expression searched for in each line
+            prefix: Only scan objects whose name starts with this
+            max_matches: Stop after this many matching lines
+            context_lines: Lines of context returned before and after each match
+            ignore_case: Case-insensitive matching
+
+        Returns:
+            dict: Matches with file name, line number and context, or error
+        """
+        try:
+            regex = compile_pattern(pattern, ignore_case)
+        except re.error as e:
+            return {
+                "success": False,
+                "error": f"Invalid pattern: {e}"
+            }
+
+        objects = [
+            entry for entry in self.storage.list_files_detailed(prefix=prefix)
+            if entry["size"] is not None
+            and not entry["name"].endswith("/")
+            and entry["size"] <= self.max_object_bytes
+        ]
+        state = _SearchState(max(1, max_matches), time.monotonic() + self.max_seconds)
+        context_lines = max(0, context_lines)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            per_file = executor.map(
+                lambda entry: self._scan(entry["name"], regex, context_lines, state),
+                objects
+            )
+            matches = [match for file_matches in per_file for match in file_matches]
+
+        matches.sort(key=lambda match: (match["filename"], match["line_number"]))
+        logger.info(f"🔎 Search '{pattern}': {len(matches)} match(es) in {len(objects)} file(s)")
+        return {
+            "success": True,
+            "pattern": pattern,
+            "matches": matches,
+            "count": len(matches),
+            "files_scanned": len(objects),
+            "truncated": state.truncated
+        }
+
+    def _scan(
+        self,
+        name: str,
+        regex: "re.Pattern",
+        context_lines: int,
+        state: _SearchState
+    ) -> List[Dict[str, Any]]:
+        """Stream one object and collect its matching lines"""
+        if state.done.is_set() or state.expired():
+            return []
+
+        chunks = self.storage.download_stream(name)
+        if chunks is None:
+            return []
+
+        matches = []
+        awaiting_after = []
+        before = deque(maxlen=context_lines)
+        try:
+            first = next(chunks, b"")
+            if b"\0" in first[:8192]:
+                return []  # binary file
+
+            def stream():
+                yield first
+                yield from chunks
+
+            for line_number, line in enumerate(iter_lines(stream()), start=1):
+                if state.done.is_set() and not awaiting_after:
+                    break
+                if line_number % 1024 == 0 and state.expired():
+                    break
+
+                for match in awaiting_after:
+                    match["after"].append(_clip(line))
+                awaiting_after = [m for m in awaiting_after if len(m["after"]) < context_lines]
+
+                if not state.done.is_set() and regex.search(line):
+                    if state.claim():
+                        match = {
+                            "filename": name,
+                            "line_number": line_number,
+                            "line": _clip(line),
+                            "before": list(before),
+                            "after": []
+                        }
+                        matches.append(match)
+                        if context_lines:
+                            awaiting_after.append(match)
+
+                before.append(_clip(line))
+        finally:
+            chunks.close()
+
+        return matches
@@ -3,53 +3,129 @@ File Tools for AI Agent
 Provides read and write capabilities
 """
 import json
-from typing import Dict, Any
-from src.storage_service import StorageService
+from typing import Dict, Any, List, Optional
+from src.storage_service import StorageService, iter_text_chunks
+from src.file_search import FileSearcher
+from src.file_query import FileQuery
+from src.search_index import SearchIndex
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Default and maximum chunk sizes for read_file
+DEFAULT_READ_BYTES = 64 * 1024
+MAX_READ_BYTES_LIMIT = 1024 * 1024
+
+
+def utf8_safe_length(data) -> int:
+    """Length of the longest prefix of data that does not end inside a UTF-8 sequence"""
+    end = len(data)
+    for back in range(1, min(4, end) + 1):
+        byte = data[end - back]
+        if byte & 0xC0 != 0x80:
+            # ASCII or a lead byte: check whether its sequence is complete
+            if byte >= 0xC0:
+                needed = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+                if needed > back:
+                    return end - back
+            return end
+    return end
+
+
+def content_type_for(filename: str) -> str:
+    """Guess the content type the agent should store a text file with"""
+    if filename.endswith('.json'):
+        return "application/json"
+    elif filename.endswith('.html'):
+        return "text/html"
+    elif filename.endswith('.csv'):
+        return "text/csv"
+    return "text/plain"
+
+
 class FileTools:
     """Tools for file operations that the agent can use"""
     
-    def __init__(self, storage_service: StorageService):
+    def __init__(
+        self,
+        storage_service: StorageService,
+        max_read_bytes: int = DEFAULT_READ_BYTES,
+        searcher: Optional[FileSearcher] = None,
+        index: Optional[SearchIndex] = None,
+        querier: Optional[FileQuery] = None
+    ):
         self.storage = storage_service
+        self.max_read_bytes = max_read_bytes
+        self.searcher = searcher or FileSearcher(storage_service)
+        self.index = index
+        self.querier = querier or FileQuery(storage_service)
     
-    def read_file(self, filename: str) -> Dict[str, Any]:
+    def read_file(
+        self,
+        filename: str,
+        offset: int = 0,
+        max_bytes: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
-        Read a file from storage
+        Read part of a file from storage
+        
+        Only the requested byte range is downloaded. Pass the returned
+        `next_offset` back as `offset` to continue; it is None at the end.
         
         Args:
             filename: Name of the file to read
+            offset: Byte offset to start reading from
+            max_bytes: Maximum bytes to return (defaults to the tool's chunk size)
             
         Returns:
-            dict: Result with file content or error
+            dict: Result with the content chunk and continuation cursor, or error
         """
-        logger.info(f"🔍 Reading file: {filename}")
+        logger.info(f"🔍 Reading file: {filename} (offset {offset})")
+        
+        # Model function calls deliver numbers as floats
+        offset = max(0, int(offset or 0))
+        max_bytes = int(max_bytes or 0)
+        if max_bytes <= 0:
+            max_bytes = self.max_read_bytes
+        max_bytes = min(max_bytes, MAX_READ_BYTES_LIMIT)
         
         try:
-            # Download file from storage
-            file_data = self.storage.download_file(filename)
+            # Range read; cached copies are sliced, not copied
+            chunk = self.storage.read_chunk(filename, offset, max_bytes)
             
-            if file_data is None:
+            if chunk is None:
                 return {
                     "success": False,
                     "error": f"File '{filename}' not found"
                 }
             
+            file_data, total_size = chunk
+            end = offset + len(file_data)
+            if end < total_size:
+                # Don't split a multi-byte character across chunks
+                safe_length = utf8_safe_length(file_data)
+                if safe_length:
+                    file_data = file_data[:safe_length]
+                    end = offset + safe_length
+            
             # Try to decode as text
             try:
-                content = file_data.decode('utf-8')
+                content = str(file_data, 'utf-8')
             except UnicodeDecodeError:
-                content = f"[Binary file, {len(file_data)} bytes]"
+                content = f"[Binary file, {total_size} bytes]"
             
-            logger.info(f"✅ Successfully read file: {filename}")
+            eof = end >= total_size
+            logger.info(f"✅ Successfully read file: {filename} ({offset}-{end} of {total_size})")
             return {
                 "success": True,
                 "filename": filename,
                 "content": content,
-                "size": len(file_data)
+                "size": total_size,
+                "offset": offset,
+                "bytes_read": len(file_data),
+                "eof": eof,
+                "next_offset": None if eof else end
             }
             
         except Exception as e:
@@ -59,6 +135,56 @@ class FileTools:
                 "error": str(e)
             }
     
+    @staticmethod
+    def _read_result(filename: str, file_data) -> Dict[str, Any]:
+        """Build a read_file result from raw bytes (or None if missing)"""
+        if file_data is None:
+            return {
+                "success": False,
+                "error": f"File '{filename}' not found"
+            }
+        
+        # Try to decode as text
+        try:
+            content = str(file_data, 'utf-8')
+        except UnicodeDecodeError:
+            content = f"[Binary file, {len(file_data)} bytes]"
+        
+        return {
+            "success": True,
+            "filename": filename,
+            "content": content,
+            "size": len(file_data)
+        }
+    
+    def read_files(self, filenames: List[str]) -> Dict[str, Any]:
+        """
+        Read several files from storage in parallel
+        
+        Args:
+            filenames: Names of the files to read
+            
+        Returns:
+            dict: Per-file read results or error
+        """
+        logger.info(f"🔍 Reading {len(filenames)} file(s)")
+        
+        try:
+            contents = self.storage.download_files(filenames)
+            results = [self._read_result(name, contents.get(name)) for name in filenames]
+            logger.info(f"✅ Read {sum(r['success'] for r in results)} of {len(filenames)} file(s)")
+            return {
+                "success": all(r["success"] for r in results),
+                "files": results,
+                "count": len(results)
+            }
+        except Exception as e:
+            logger.error(f"❌ Error reading files: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
     def write_file(self, filename: str, content: str) -> Dict[str, Any]:
         """
         Write a file to storage
@@ -68,28 +194,16 @@ class FileTools:
             content: Content to write
             
         Returns:
-            dict: Result with file info or error
+            dict: Result with file info, content hash and `unchanged` flag, or error
         """
         logger.info(f"✍️  Writing file: {filename}")
         
         try:
-            # Convert content to bytes
-            file_data = content.encode('utf-8')
-            
-            # Determine content type
-            content_type = "text/plain"
-            if filename.endswith('.json'):
-                content_type = "application/json"
-            elif filename.endswith('.html'):
-                content_type = "text/html"
-            elif filename.endswith('.csv'):
-                content_type = "text/csv"
-            
-            # Upload to storage
-            result = self.storage.upload_file(
-                file_data=file_data,
+            # Stream to storage, encoding the content one chunk at a time
+            result = self.storage.upload_stream(
+                iter_text_chunks(content),
                 object_name=filename,
-                content_type=content_type
+                content_type=content_type_for(filename)
             )
             
             if result["success"]:
@@ -98,7 +212,9 @@ class FileTools:
                     "success": True,
                     "filename": filename,
                     "size": result["size"],
-                    "s3_key": result["s3_key"]
+                    "s3_key": result["s3_key"],
+                    "sha256": result["sha256"],
+                    "unchanged": result["unchanged"]
                 }
             else:
                 return result
@@ -110,22 +226,261 @@ class FileTools:
                 "error": str(e)
             }
     
-    def list_files(self) -> Dict[str, Any]:
+    def write_files(self, filenames: List[str], contents: List[str]) -> Dict[str, Any]:
+        """
+        Write several files to storage in parallel
+        
+        Args:
+            filenames: Names for the files
+            contents: Content for each file, in the same order as filenames
+            
+        Returns:
+            dict: Per-file write results or error
+        """
+        logger.info(f"✍️  Writing {len(filenames)} file(s)")
+        
+        if len(filenames) != len(contents):
+            return {
+                "success": False,
+                "error": "filenames and contents must have the same length"
+            }
+        
+        try:
+            uploads = self.storage.upload_files([
+                {
+                    "name": filename,
+                    "data": iter_text_chunks(content),
+                    "content_type": content_type_for(filename)
+                }
+                for filename, content in zip(filenames, contents)
+            ])
+            results = [
+                {
+                    "success": True,
+                    "filename": filename,
+                    "size": upload["size"],
+                    "s3_key": upload["s3_key"],
+                    "sha256": upload["sha256"],
+                    "unchanged": upload["unchanged"]
+                } if upload["success"] else {
+                    "success": False,
+                    "filename": filename,
+                    "error": upload["error"]
+                }
+                for filename, upload in zip(filenames, uploads)
+            ]
+            logger.info(f"✅ Wrote {sum(r['success'] for r in results)} of {len(filenames)} file(s)")
+            return {
+                "success": all(r["success"] for r in results),
+                "files": results,
+                "count": len(results)
+            }
+        except Exception as e:
+            logger.error(f"❌ Error writing files: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def append_file(self, filename: str, content: str) -> Dict[str, Any]:
         """
-        List all files in storage
+        Append text to the end of a file, creating it if it does not exist
         
+        Large files are extended server-side, so only the new text is uploaded.
+        
+        Args:
+            filename: Name of the file to extend
+            content: Text to append
+            
         Returns:
-            dict: List of files or error
+            dict: Result with the new file size or error
+        """
+        logger.info(f"✍️  Appending to file: {filename}")
+        
+        try:
+            data = content.encode('utf-8')
+            result = self.storage.append_file(filename, data, content_type_for(filename))
+            
+            if result["success"]:
+                logger.info(f"✅ Appended {len(data)} bytes to: {filename}")
+                return {
+                    "success": True,
+                    "filename": filename,
+                    "size": result["size"],
+                    "bytes_appended": len(data),
+                    "s3_key": result["s3_key"]
+                }
+            else:
+                return result
+                
+        except Exception as e:
+            logger.error(f"❌ Error appending to file: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def patch_file(
+        self,
+        filename: str,
+        start_line: int,
+        end_line: int,
+        content: str
+    ) -> Dict[str, Any]:
+        """
+        Replace a range of lines in a file
+        
+        Lines are numbered from 1 and the range is inclusive. Use
+        end_line = start_line - 1 to insert before start_line without
+        removing anything, and empty content to delete the lines.
+        
+        Args:
+            filename: Name of the file to edit
+            start_line: First line replaced
+            end_line: Last line replaced
+            content: Replacement text (a final newline is added if missing)
+            
+        Returns:
+            dict: Result with the new file size or error
+        """
+        logger.info(f"✍️  Patching file: {filename} (lines {start_line}-{end_line})")
+        
+        if start_line < 1 or end_line < start_line - 1:
+            return {
+                "success": False,
+                "error": "start_line must be at least 1 and end_line at least start_line - 1"
+            }
+        
+        try:
+            span = self._line_span(filename, start_line, end_line)
+            if span is None:
+                return {
+                    "success": False,
+                    "error": f"File '{filename}' not found"
+                }
+            if "error" in span:
+                return {
+                    "success": False,
+                    "error": span["error"]
+                }
+            
+            if content and not content.endswith("\n") and span["terminated"]:
+                content += "\n"
+            result = self.storage.splice_file(filename, span["start"], span["end"], content.encode('utf-8'))
+            
+            if result["success"]:
+                logger.info(f"✅ Patched file: {filename}")
+                return {
+                    "success": True,
+                    "filename": filename,
+                    "size": result["size"],
+                    "lines_replaced": span["lines"],
+                    "s3_key": result["s3_key"]
+                }
+            else:
+                return result
+                
+        except Exception as e:
+            logger.error(f"❌ Error patching file: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def _line_span(self, filename: str, start_line: int, end_line: int) -> Optional[Dict[str, Any]]:
+        """
+        Locate lines start_line..end_line as a byte range
+        
+        The file is streamed only up to the end of the range.
+        
+        Returns:
+            dict: `start` / `end` byte offsets, number of `lines` covered and
+            whether the range is `terminated` by a newline; an `error` if the
+            file is too short; None if the file cannot be read
+        """
+        chunks = self.storage.download_stream(filename)
+        if chunks is None:
+            return None
+        
+        stop_line = end_line + 1
+        starts = {1: 0}  # line number -> byte offset of its first byte
+        line, position, ends_with_newline = 1, 0, False
+        try:
+            for chunk in chunks:
+                index = chunk.find(b"\n")
+                while index != -1 and line < stop_line:
+                    line += 1
+                    if line in (start_line, stop_line):
+                        starts[line] = position + index + 1
+                    index = chunk.find(b"\n", index + 1)
+                position += len(chunk)
+                if chunk:
+                    ends_with_newline = chunk.endswith(b"\n")
+                if line >= stop_line:
+                    break
+        finally:
+            chunks.close()
+        
+        if start_line not in starts:
+            line_count = line - 1 if ends_with_newline or position == 0 else line
+            return {"error": f"'{filename}' has only {line_count} line(s)"}
+        
+        if stop_line in starts:
+            end, terminated = starts[stop_line], True
+        else:
+            # The range runs to the end of the file
+            end, terminated = position, ends_with_newline
+        last_line = line - 1 if stop_line not in starts and ends_with_newline else line
+        return {
+            "start": starts[start_line],
+            "end": end,
+            "lines": max(0, min(end_line, last_line) - start_line + 1),
+            "terminated": terminated
+        }
+    
+    def list_files(
+        self,
+        prefix: str = "",
+        sort_by: str = "name",
+        descending: bool = False,
+        limit: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        List files in storage
+        
+        Args:
+            prefix: Only files whose name starts with this
+            sort_by: `name`, `size` or `last_modified`
+            descending: Largest / newest / last name first
+            limit: Maximum number of files returned
+            
+        Returns:
+            dict: Files with size and modification time, or error
         """
         logger.info("📋 Listing files")
         
         try:
-            files = self.storage.list_files()
+            entries = self.storage.list_files_detailed(
+                prefix,
+                limit=limit + 1 if limit > 0 else None,
+                sort=sort_by,
+                descending=descending
+            )
+            truncated = limit > 0 and len(entries) > limit
+            files = [
+                {
+                    "name": entry["name"],
+                    "size": entry["size"],
+                    "last_modified": entry["last_modified"].isoformat() if entry["last_modified"] else None
+                }
+                for entry in (entries[:limit] if truncated else entries)
+            ]
             logger.info(f"✅ Found {len(files)} file(s)")
             return {
                 "success": True,
                 "files": files,
-                "count": len(files)
+                "count": len(files),
+                "truncated": truncated
             }
         except Exception as e:
             logger.error(f"❌ Error listing files: {e}")
@@ -133,18 +488,141 @@ class FileTools:
                 "success": False,
                 "error": str(e)
             }
+    
+    def search_files(
+        self,
+        pattern: str,
+        prefix: str = "",
+        max_matches: int = 50,
+        context_lines: int = 2
+    ) -> Dict[str, Any]:
+        """
+        Search stored files for lines matching a pattern
+        
+        The scan runs server-side; only matching lines and their context
+        are returned, never whole files.
+        
+        Args:
+            pattern: Regular expression to search for
+            prefix: Only search files whose name starts with this
+            max_matches: Maximum number of matching lines returned
+            context_lines: Lines of context around each match
+            
+        Returns:
+            dict: Matching lines or error
+        """
+        logger.info(f"🔍 Searching files for: {pattern}")
+        
+        try:
+            return self.searcher.search(
+                pattern,
+                prefix=prefix,
+                max_matches=max_matches,
+                context_lines=context_lines
+            )
+        except Exception as e:
+            logger.error(f"❌ Error searching files: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def search_index(self, query: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Find the files most relevant to a query using the full-text index
+        
+        Args:
+            query: Words to look for
+            limit: Maximum number of files returned
+            
+        Returns:
+            dict: Files ranked by relevance, with matching line numbers, or error
+        """
+        logger.info(f"🔍 Index search: {query}")
+        
+        if self.index is None:
+            return {
+                "success": False,
+                "error": "Search index is disabled; use search_files instead"
+            }
+        
+        try:
+            return self.index.search(query, limit=limit)
+        except Exception as e:
+            logger.error(f"❌ Error searching index: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def query_file(
+        self,
+        filename: str,
+        columns: str = "",
+        where: str = "",
+        group_by: str = "",
+        aggregates: str = "",
+        order_by: str = "",
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Filter, project and aggregate a CSV / TSV / JSON / JSONL file
+        
+        The file is scanned server-side; only the result rows are returned.
+        
+        Args:
+            filename: File to query
+            columns: Comma-separated columns to return ('' for all)
+            where: Filter expression, e.g. "price > 10 and status == 'paid'"
+            group_by: Comma-separated columns to group by
+            aggregates: Comma-separated aggregates, e.g. 'count(*), avg(price)'
+            order_by: Result column to sort by, optionally followed by 'desc'
+            limit: Maximum number of rows returned
+            
+        Returns:
+            dict: Result columns and rows or error
+        """
+        logger.info(f"🧮 Querying file: {filename}")
+        
+        def split(value: str) -> List[str]:
+            return [item.strip() for item in value.split(",") if item.strip()] if value else []
+        
+        try:
+            return self.querier.query(
+                filename,
+                columns=split(columns),
+                where=where,
+                group_by=split(group_by),
+                aggregates=split(aggregates),
+                order_by=order_by,
+                limit=limit
+            )
+        except Exception as e:
+            logger.error(f"❌ Error querying file {filename}: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
 
 
 # Tool definitions for Google Gemini function calling
 READ_FILE_TOOL = {
     "name": "read_file",
-    "description": "Read the contents of a file from storage. Use this when the user asks to read, view, or analyze a file.",
+    "description": "Read the contents of a file from storage, one chunk at a time. Use this when the user asks to read, view, or analyze a file. If the result has a next_offset, call again with that offset to continue.",
     "parameters": {
         "type": "object",
         "properties": {
             "filename": {
                 "type": "string",
                 "description": "The name of the file to read (e.g., 'document.txt', 'data.csv')"
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Byte offset to start reading from (default 0)"
+            },
+            "max_bytes": {
+                "type": "integer",
+                "description": "Maximum number of bytes to return (default 65536)"
             }
         },
         "required": ["filename"]
@@ -153,7 +631,7 @@ READ_FILE_TOOL = {
 
 WRITE_FILE_TOOL = {
     "name": "write_file",
-    "description": "Write content to a new file in storage. Use this when the user asks to create, generate, or save a file.",
+    "description": "Write content to a new file in storage. Use this when the user asks to create, generate, or save a file. The result includes the content's sha256; unchanged=true means the file already held exactly this content.",
     "parameters": {
         "type": "object",
         "properties": {
@@ -170,11 +648,189 @@ WRITE_FILE_TOOL = {
     }
 }
 
+APPEND_FILE_TOOL = {
+    "name": "append_file",
+    "description": "Append text to the end of a file (created if missing). Much cheaper than rewriting the whole file with write_file when adding lines to logs or notes.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "filename": {
+                "type": "string",
+                "description": "The name of the file to extend"
+            },
+            "content": {
+                "type": "string",
+                "description": "The text to append (include a trailing newline to end the line)"
+            }
+        },
+        "required": ["filename", "content"]
+    }
+}
+
+PATCH_FILE_TOOL = {
+    "name": "patch_file",
+    "description": "Replace lines start_line..end_line (1-based, inclusive) of a file with new content, without rewriting the rest. Use end_line = start_line - 1 to insert before start_line, and empty content to delete lines.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "filename": {
+                "type": "string",
+                "description": "The name of the file to edit"
+            },
+            "start_line": {
+                "type": "integer",
+                "description": "First line to replace (1-based)"
+            },
+            "end_line": {
+                "type": "integer",
+                "description": "Last line to replace (inclusive)"
+            },
+            "content": {
+                "type": "string",
+                "description": "Replacement lines"
+            }
+        },
+        "required": ["filename", "start_line", "end_line", "content"]
+    }
+}
+
 LIST_FILES_TOOL = {
     "name": "list_files",
-    "description": "List all files currently in storage. Use this when the user asks what files are available.",
+    "description": "List files currently in storage with their size and modification time. Use this when the user asks what files are available, or for the largest / newest files.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "prefix": {
+                "type": "string",
+                "description": "Only list files whose name starts with this (default: all files)"
+            },
+            "sort_by": {
+                "type": "string",
+                "enum": ["name", "size", "last_modified"],
+                "description": "Sort order (default 'name')"
+            },
+            "descending": {
+                "type": "boolean",
+                "description": "Largest / newest first (default false)"
+            }
+        }
+    }
+}
+
+READ_FILES_TOOL = {
+    "name": "read_files",
+    "description": "Read several files from storage at once. Prefer this over repeated read_file calls when you need more than one file.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "filenames": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Names of the files to read"
+            }
+        },
+        "required": ["filenames"]
+    }
+}
+
+WRITE_FILES_TOOL = {
+    "name": "write_files",
+    "description": "Write several files to storage at once. contents[i] is written to filenames[i].",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "filenames": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Names for the files"
+            },
+            "contents": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Content for each file, in the same order as filenames"
+            }
+        },
+        "required": ["filenames", "contents"]
+    }
+}
+
+SEARCH_FILES_TOOL = {
+    "name": "search_files",
+    "description": "Search the contents of stored files for a regular expression and return only the matching lines with context. Use this to find which files mention something instead of reading them one by one.",
     "parameters": {
         "type": "object",
-        "properties": {}
+        "properties": {
+            "pattern": {
+                "type": "string",
+                "description": "Regular expression to search for (e.g., 'TODO', 'error|warning')"
+            },
+            "prefix": {
+                "type": "string",
+                "description": "Only search files whose name starts with this (default: all files)"
+            },
+            "max_matches": {
+                "type": "integer",
+                "description": "Maximum number of matching lines to return (default 50)"
+            }
+        },
+        "required": ["pattern"]
+    }
+}
+
+SEARCH_INDEX_TOOL = {
+    "name": "search_index",
+    "description": "Find the files most relevant to some words using the full-text index (ranked by BM25). Faster than search_files on large collections; returns file names and matching line numbers.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "Words to look for (e.g., 'quarterly revenue')"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of files to return (default 10)"
+            }
+        },
+        "required": ["query"]
+    }
+}
+
+QUERY_FILE_TOOL = {
+    "name": "query_file",
+    "description": "Filter, select columns from, group and aggregate a CSV, TSV, JSON or JSONL file server-side and return only the result rows. Use this instead of read_file to answer questions about tabular data (counts, totals, averages, top rows).",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "filename": {
+                "type": "string",
+                "description": "The data file to query (e.g., 'sales.csv', 'events.jsonl')"
+            },
+            "columns": {
+                "type": "string",
+                "description": "Comma-separated columns to return (default: all)"
+            },
+            "where": {
+                "type": "string",
+                "description": "Filter expression in Python syntax, e.g. \"price > 10 and lower(status) == 'paid'\"; quote odd column names in backticks"
+            },
+            "group_by": {
+                "type": "string",
+                "description": "Comma-separated columns to group by"
+            },
+            "aggregates": {
+                "type": "string",
+                "description": "Comma-separated aggregates: count(*), count(col), sum(col), avg(col), min(col), max(col)"
+            },
+            "order_by": {
+                "type": "string",
+                "description": "Result column to sort by, optionally followed by 'desc' (e.g., 'sum(amount) desc')"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of rows to return (default 100)"
+            }
+        },
+        "required": ["filename"]
     }
 }
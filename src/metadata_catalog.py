@@ -0,0 +1,367 @@
+"""
+Metadata Catalog Module
+Local SQLite copy of the bucket listing for fast, filterable listings
+"""
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SORT_COLUMNS = {
+    "name": "name",
+    "size": "size",
+    "last_modified": "last_modified"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    name TEXT PRIMARY KEY,
+    size INTEGER,
+    etag TEXT,
+    last_modified REAL,
+    content_type TEXT,
+    synced_at REAL NOT NULL,
+    sha256 TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objects_size ON objects (size);
+CREATE INDEX IF NOT EXISTS objects_last_modified ON objects (last_modified);
+"""
+
+COLUMNS = "name, size, etag, last_modified, content_type, sha256"
+
+# Catalogs created before content hashes were tracked lack the column
+MIGRATIONS = {
+    "sha256": "ALTER TABLE objects ADD COLUMN sha256 TEXT"
+}
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+def _entry(row) -> Dict[str, Any]:
+    """Row of COLUMNS as a listing entry"""
+    name, size, etag, modified, content_type, sha256 = row
+    return {
+        "name": name,
+        "size": size,
+        "last_modified": datetime.fromtimestamp(modified, timezone.utc) if modified else None,
+        "content_type": content_type,
+        "etag": etag,
+        "sha256": sha256
+    }
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def select_entries(
+    entries: Iterable[Dict[str, Any]],
+    start_after: Optional[str] = None,
+    limit: Optional[int] = None,
+    sort: str = "name",
+    descending: bool = False,
+    offset: int = 0,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    modified_after: Optional[datetime] = None,
+    modified_before: Optional[datetime] = None,
+    suffix: str = ""
+) -> List[Dict[str, Any]]:
+    """
+    Apply catalog query filters to a live listing
+
+    Used while the catalog is still being built, so results match what
+    MetadataCatalog.query would return.
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort}'")
+
+    selected = [
+        entry for entry in entries
+        if (start_after is None or entry["name"] > start_after)
+        and (min_size is None or (entry["size"] or 0) >= min_size)
+        and (max_size is None or (entry["size"] or 0) <= max_size)
+        and (modified_after is None or (entry["last_modified"] and entry["last_modified"] >= modified_after))
+        and (modified_before is None or (entry["last_modified"] and entry["last_modified"] < modified_before))
+        and entry["name"].endswith(suffix)
+    ]
+    if sort != "name" or descending:
+        selected.sort(
+            key=lambda entry: (_timestamp(entry[sort]) if sort == "last_modified" else entry[sort]) or 0,
+            reverse=descending
+        )
+    end = offset + limit if limit is not None else None
+    return selected[offset:end]
+
+
+class MetadataCatalog:
+    """Object metadata kept in SQLite, fed by write/delete events and periodic reconciliation"""
+
+    def __init__(self, db_path: str, reconcile_seconds: float = 60):
+        """
+        Open (or create) the catalog
+
+        Args:
+            db_path: SQLite database file
+            reconcile_seconds: Interval between full reconciliations with the bucket
+        """
+        self.reconcile_seconds = reconcile_seconds
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(objects)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self._db.execute(statement)
+        self._db.execute("CREATE INDEX IF NOT EXISTS objects_sha256 ON objects (sha256)")
+        self._lock = threading.Lock()
+        self._deleted: Dict[str, float] = {}
+        self._reconciling = False
+        self._list_live: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None
+        self._stop = threading.Event()
+        self.ready = False
+        self.last_reconcile: Optional[dict] = None
+        self.db_path = db_path
+
+    def start(self, list_live: Callable[[], Iterable[Dict[str, Any]]]):
+        """
+        Begin reconciling against the bucket in the background
+
+        Listings keep going to the bucket until the first pass has
+        finished and `ready` is set.
+
+        Args:
+            list_live: Returns a fresh, complete listing of the bucket (raises on failure)
+        """
+        self._list_live = list_live
+        threading.Thread(
+            target=self._reconcile_loop,
+            name="catalog-reconcile",
+            daemon=True
+        ).start()
+
+    def apply(self, event: dict):
+        """Storage listener: record a write or delete as it happens"""
+        with self._lock:
+            if event["type"] == "put":
+                self._db.execute(
+                    "INSERT OR REPLACE INTO objects "
+                    "(name, size, etag, last_modified, content_type, synced_at, sha256) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        event["name"], event["size"], event["etag"],
+                        _timestamp(event["last_modified"]), event["content_type"],
+                        time.time(), event.get("sha256")
+                    )
+                )
+            elif event["type"] == "delete":
+                self._db.execute("DELETE FROM objects WHERE name = ?", (event["name"],))
+                if self._reconciling:
+                    # Remembered so the in-flight reconciliation does not bring it back
+                    self._deleted[event["name"]] = time.time()
+
+    def reconcile(self) -> dict:
+        """
+        Replace the catalog's view with a fresh bucket listing
+
+        Rows touched by write/delete events after the listing started are
+        left alone, so a concurrent write or delete is never rolled back.
+
+        Returns:
+            dict: Number of objects listed and stale rows removed
+        """
+        started = time.time()
+        self._reconciling = True
+        try:
+            # Walk the bucket before taking the lock so queries are not held up
+            entries = list(self._list_live())
+        except Exception:
+            self._reconciling = False
+            raise
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT INTO objects "
+                    "(name, size, etag, last_modified, content_type, synced_at, sha256) "
+                    "VALUES (?, ?, ?, ?, NULL, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET "
+                    "size = excluded.size, etag = excluded.etag, "
+                    "last_modified = excluded.last_modified, "
+                    "content_type = CASE WHEN objects.etag = excluded.etag "
+                    "THEN objects.content_type END, "
+                    "sha256 = COALESCE(excluded.sha256, CASE WHEN objects.etag = excluded.etag "
+                    "THEN objects.sha256 END), "
+                    "synced_at = excluded.synced_at "
+                    "WHERE objects.synced_at < ?",
+                    (
+                        (
+                            entry["name"], entry["size"], entry["etag"],
+                            _timestamp(entry["last_modified"]), started,
+                            entry.get("sha256"), started
+                        )
+                        for entry in entries
+                        if entry["name"] not in self._deleted
+                    )
+                )
+                removed = self._db.execute(
+                    "DELETE FROM objects WHERE synced_at < ?", (started,)
+                ).rowcount
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            finally:
+                self._deleted = {}
+                self._reconciling = False
+        listed = len(entries)
+
+        self.ready = True
+        self.last_reconcile = {
+            "listed": listed,
+            "removed": removed,
+            "seconds": round(time.time() - started, 3)
+        }
+        logger.info(f"Catalog reconciled: {listed} object(s), {removed} removed")
+        return self.last_reconcile
+
+    def _reconcile_loop(self):
+        """Reconcile at startup, then every reconcile_seconds"""
+        while not self._stop.is_set():
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.error(f"❌ Catalog reconciliation failed: {e}")
+            if self.reconcile_seconds <= 0 or self._stop.wait(self.reconcile_seconds):
+                break
+
+    def query(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None,
+        sort: str = "name",
+        descending: bool = False,
+        offset: int = 0,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None,
+        suffix: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        List objects from the catalog
+
+        Args:
+            prefix: Only objects whose name starts with this
+            start_after: Only objects whose name sorts after this
+            limit: Maximum number of entries
+            sort: `name`, `size` or `last_modified`
+            descending: Reverse the sort order
+            offset: Entries to skip (for paging non-name sorts)
+            min_size / max_size: Size bounds in bytes (inclusive)
+            modified_after / modified_before: Last-modified bounds
+            suffix: Only names ending with this (e.g. '.csv')
+
+        Returns:
+            list: File metadata dicts, shaped like StorageService.list_files_detailed
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by '{sort}'")
+
+        clauses, params = [], []
+        if prefix:
+            clauses.append("name >= ? AND name < ?")
+            params += [prefix, _prefix_end(prefix)]
+        if start_after is not None:
+            clauses.append("name > ?")
+            params.append(start_after)
+        if min_size is not None:
+            clauses.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            clauses.append("size <= ?")
+            params.append(max_size)
+        if modified_after is not None:
+            clauses.append("last_modified >= ?")
+            params.append(modified_after.timestamp())
+        if modified_before is not None:
+            clauses.append("last_modified < ?")
+            params.append(modified_before.timestamp())
+        if suffix:
+            clauses.append("substr(name, -?) = ?")
+            params += [len(suffix), suffix]
+
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {COLUMNS} FROM objects"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {SORT_COLUMNS[sort]} {direction}"
+        if sort != "name":
+            sql += f", name {direction}"
+        sql += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [_entry(row) for row in rows]
+    
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry for one object, or None if it is not listed"""
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {COLUMNS} FROM objects WHERE name = ?", (name,)
+            ).fetchone()
+        return _entry(row) if row else None
+    
+    def find_by_hash(self, sha256: str, exclude: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find an object holding content with this SHA-256
+        
+        Args:
+            sha256: Content hash recorded at upload
+            exclude: Name to skip (usually the one being written)
+            
+        Returns:
+            dict: Catalog entry of one matching object, or None
+        """
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {COLUMNS} FROM objects WHERE sha256 = ? AND name != ? LIMIT 1",
+                (sha256, exclude or "")
+            ).fetchone()
+        return _entry(row) if row else None
+
+    def stats(self) -> dict:
+        """
+        Catalog size and reconciliation status
+
+        Returns:
+            dict: Object count, total bytes, readiness and last reconcile result
+        """
+        with self._lock:
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects"
+            ).fetchone()
+        return {
+            "objects": count,
+            "total_bytes": total,
+            "ready": self.ready,
+            "last_reconcile": self.last_reconcile
+        }
+
+    def close(self):
+        """Stop reconciling and close the database"""
+        self._stop.set()
+        with self._lock:
+            self._db.close()
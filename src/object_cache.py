@@ -0,0 +1,314 @@
+"""
+Object Cache Module
+Read-through cache for downloaded objects, validated by ETag
+"""
+import os
+import mmap
+import uuid
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWriter:
+    """Streams an object into a temp file and publishes it to the disk tier on commit"""
+
+    def __init__(self, cache: "ObjectCache", name: str, etag: str):
+        self._cache = cache
+        self.name = name
+        self.etag = etag
+        self.size = 0
+        fd, self._path = tempfile.mkstemp(dir=cache.cache_dir, suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes):
+        """Append a chunk"""
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self):
+        """Publish the written file as the cached copy of the object"""
+        self._file.close()
+        self._cache._publish(self.name, self.etag, self._path, self.size)
+        self._path = None
+
+    def discard(self):
+        """Throw the partial file away (no-op after commit)"""
+        if self._path is None:
+            return
+        self._file.close()
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+        self._path = None
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _remove_orphans(cache_dir: str):
+    """
+    Delete cache subdirectories left by processes that have exited
+
+    The disk index lives in memory, so their files can never be served again.
+    """
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        pid, _, _ = entry.partition("-")
+        if entry.endswith(".obj"):
+            # Layout used before per-process subdirectories
+            os.remove(path)
+        elif os.path.isdir(path) and pid.isdigit() and not _process_alive(int(pid)):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class ObjectCache:
+    """Two-tier LRU cache: small objects in memory, larger ones on local disk"""
+
+    def __init__(
+        self,
+        max_memory_bytes: int,
+        max_disk_bytes: int,
+        cache_dir: str,
+        memory_object_limit: int = 256 * 1024
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_memory_bytes: Byte budget for the in-memory tier
+            max_disk_bytes: Byte budget for the on-disk tier
+            cache_dir: Directory holding the on-disk tier; each process
+                keeps its files in its own subdirectory
+            memory_object_limit: Objects up to this size are kept in memory
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_object_limit = memory_object_limit
+        # Processes sharing cache_dir (web server, ADK) must not touch each other's files
+        self.cache_dir = os.path.join(cache_dir, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+
+        # name -> (etag, data) and name -> (etag, size)
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.cache_dir)
+        atexit.register(shutil.rmtree, self.cache_dir, True)
+        _remove_orphans(cache_dir)
+
+    def _path(self, name: str) -> str:
+        """Local file backing a disk-tier entry"""
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.obj")
+
+    def get(self, name: str, current_etag: Callable[[], Optional[str]]) -> Optional[bytes]:
+        """
+        Return cached content if it is still current
+
+        Args:
+            name: Object name
+            current_etag: Called (outside the lock) to fetch the object's
+                live ETag, only when a cached copy exists
+
+        Returns:
+            bytes: Cached content, or None on a miss or stale entry
+        """
+        view = self.get_view(name, current_etag)
+        if view is None:
+            return None
+        return view.obj if isinstance(view.obj, bytes) else bytes(view)
+
+    def get_view(self, name: str, current_etag: Callable[[], Optional[str]]) -> Optional[memoryview]:
+        """
+        Return a zero-copy view of cached content if it is still current
+
+        Memory-tier entries are viewed in place; disk-tier entries are
+        memory-mapped read-only, so slicing the view never copies the file
+        onto the heap. The mapping stays valid after eviction.
+
+        Args:
+            name: Object name
+            current_etag: Called (outside the lock) to fetch the object's
+                live ETag, only when a cached copy exists
+
+        Returns:
+            memoryview: View over the content, or None on a miss or stale entry
+        """
+        with self._lock:
+            entry = self._memory.get(name) or self._disk.get(name)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        etag = current_etag()
+        view = None
+        with self._lock:
+            if name in self._memory and self._memory[name][0] == etag:
+                self._memory.move_to_end(name)
+                view = memoryview(self._memory[name][1])
+            elif name in self._disk and self._disk[name][0] == etag:
+                self._disk.move_to_end(name)
+                view = self._map_disk(name)
+            else:
+                self._discard(name)
+
+            if view is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return view
+
+    def _map_disk(self, name: str) -> Optional[memoryview]:
+        """Memory-map a disk-tier entry, dropping it if the file has gone missing"""
+        try:
+            with open(self._path(name), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return memoryview(b"")
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return memoryview(mapped)
+        except OSError:
+            self._discard(name)
+            return None
+
+    def put(self, name: str, etag: str, data: bytes):
+        """
+        Store content for an object version
+
+        Args:
+            name: Object name
+            etag: ETag of the stored version
+            data: Object content
+        """
+        size = len(data)
+        if size <= self.memory_object_limit and size <= self.max_memory_bytes:
+            with self._lock:
+                self._discard(name)
+                self._memory[name] = (etag, data)
+                self._memory_bytes += size
+                self._evict()
+            return
+
+        writer = self.open_writer(name, etag, size)
+        if writer is None:
+            return
+        try:
+            writer.write(data)
+            writer.commit()
+        except OSError as e:
+            logger.warning(f"Could not cache {name} on disk: {e}")
+        finally:
+            writer.discard()
+
+    def open_writer(self, name: str, etag: str, expected_size: int) -> Optional[CacheWriter]:
+        """
+        Start streaming an object into the disk tier
+
+        Args:
+            name: Object name
+            etag: ETag of the version being written
+            expected_size: Object size, used to skip objects that cannot fit
+
+        Returns:
+            CacheWriter: Writer to feed chunks to, or None if the object is too large
+        """
+        if expected_size > self.max_disk_bytes:
+            return None
+        try:
+            return CacheWriter(self, name, etag)
+        except OSError as e:
+            logger.warning(f"Could not cache {name} on disk: {e}")
+            return None
+
+    def _publish(self, name: str, etag: str, tmp_path: str, size: int):
+        """Move a fully written temp file into the disk tier"""
+        if size > self.max_disk_bytes:
+            os.remove(tmp_path)
+            return
+        with self._lock:
+            self._discard(name)
+            os.replace(tmp_path, self._path(name))
+            self._disk[name] = (etag, size)
+            self._disk_bytes += size
+            self._evict()
+
+    def invalidate(self, name: str):
+        """Drop any cached copy of an object"""
+        with self._lock:
+            self._discard(name)
+
+    def clear(self):
+        """Drop every cached object"""
+        with self._lock:
+            for name in list(self._memory) + list(self._disk):
+                self._discard(name)
+
+    def _discard(self, name: str):
+        """Remove an entry from both tiers (caller holds the lock)"""
+        entry = self._memory.pop(name, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+        entry = self._disk.pop(name, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Evict least recently used entries until both tiers fit (caller holds the lock)"""
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, data) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(data)
+            self.evictions += 1
+        while self._disk_bytes > self.max_disk_bytes:
+            name, (_, size) = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Cache counters for sizing
+
+        Returns:
+            dict: Hit/miss/eviction counters and tier usage
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes
+            }
@@ -0,0 +1,130 @@
+"""
+Object Codec Module
+Transparent at-rest compression of stored objects
+"""
+from typing import Iterable, Iterator, Mapping, Optional, Tuple
+import logging
+
+from config.settings import Settings
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# User metadata recorded on compressed objects
+CODEC_HEADER = "X-Amz-Meta-Codec"
+ORIGINAL_SIZE_HEADER = "X-Amz-Meta-Original-Size"
+
+# Content types worth compressing; everything else is stored as is
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "application/x-yaml",
+    "application/sql",
+    "image/svg+xml",
+)
+
+
+def codec_info(headers: Optional[Mapping[str, str]]) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Read the codec and original size from object headers or user metadata
+
+    Accepts stat/GET response headers, list_objects user metadata and
+    bucket notification `userMetadata` (with or without the x-amz-meta- prefix).
+
+    Returns:
+        tuple: (codec name or None if stored plain, original size if recorded)
+    """
+    if not headers:
+        return None, None
+    lowered = {key.lower(): value for key, value in headers.items()}
+    codec = lowered.get(CODEC_HEADER.lower()) or lowered.get("codec")
+    size = lowered.get(ORIGINAL_SIZE_HEADER.lower()) or lowered.get("original-size")
+    return codec or None, int(size) if size and size.isdigit() else None
+
+
+def decompress_stream(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    """
+    Decode a compressed object body chunk by chunk
+
+    Args:
+        chunks: Stored (compressed) bytes
+        codec: Codec recorded on the object
+
+    Yields:
+        bytes: Original bytes
+    """
+    if codec != "zstd":
+        raise ValueError(f"Unsupported codec '{codec}'")
+    if zstandard is None:
+        raise RuntimeError("Object is zstd-compressed but the zstandard package is not installed")
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+
+
+def create_object_codec(settings: Settings) -> Optional["ObjectCodec"]:
+    """
+    Build the upload codec configured in settings
+
+    Returns:
+        ObjectCodec: Codec, or None if compression is disabled or zstandard is missing
+    """
+    if not settings.storage_compression_enabled:
+        return None
+    if zstandard is None:
+        logger.warning("⚠️ STORAGE_COMPRESSION_ENABLED is set but zstandard is not installed; storing objects uncompressed")
+        return None
+    return ObjectCodec(
+        min_bytes=settings.storage_compression_min_bytes,
+        level=settings.storage_compression_level
+    )
+
+
+class ObjectCodec:
+    """Decides which uploads are compressed and compresses them with zstd"""
+
+    name = "zstd"
+
+    def __init__(self, min_bytes: int = 4096, level: int = 3):
+        """
+        Args:
+            min_bytes: Smaller payloads are stored uncompressed
+            level: zstd compression level
+        """
+        if zstandard is None:
+            raise RuntimeError("Storage compression requires the zstandard package")
+        self.min_bytes = min_bytes
+        self.level = level
+
+    def should_compress(self, content_type: str, size: int) -> bool:
+        """Whether a payload of this type and (at least this) size is compressed"""
+        return size >= self.min_bytes and (content_type or "").lower().startswith(COMPRESSIBLE_TYPES)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a whole payload"""
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compress_stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Compress a stream into a single zstd frame, chunk by chunk"""
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def metadata(self, original_size: Optional[int] = None) -> dict:
+        """User metadata headers marking an object as compressed"""
+        headers = {CODEC_HEADER: self.name}
+        if original_size is not None:
+            headers[ORIGINAL_SIZE_HEADER] = str(original_size)
+        return headers
@@ -0,0 +1,409 @@
+"""
+Search Index Module
+Incremental on-disk inverted index with BM25 ranking over bucket contents
+"""
+import os
+import re
+import math
+import heapq
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from config.settings import Settings
+from src.storage_service import StorageService
+from src.file_search import iter_lines
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERM_CHARS = 64
+# Line numbers kept per (term, document) posting
+LINES_PER_POSTING = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    etag TEXT,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    lines TEXT NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of a piece of text"""
+    return [
+        token.lower() for token in TOKEN_RE.findall(text)
+        if len(token) <= MAX_TERM_CHARS
+    ]
+
+
+_shared_indexes = {}
+_shared_lock = threading.Lock()
+
+
+def get_search_index(settings: Settings, storage_service: StorageService) -> Optional["SearchIndex"]:
+    """
+    Return the process-wide search index for a storage service
+
+    Args:
+        settings: Application settings
+        storage_service: Storage service whose bucket is indexed
+
+    Returns:
+        SearchIndex: Shared index, or None when indexing is disabled
+    """
+    if not settings.search_index_enabled:
+        return None
+
+    with _shared_lock:
+        index = _shared_indexes.get(id(storage_service))
+        if index is None:
+            index = SearchIndex(
+                storage_service,
+                db_path=os.path.join(
+                    settings.search_index_dir,
+                    f"{storage_service.bucket_name}.sqlite3"
+                ),
+                max_workers=settings.search_max_workers,
+                max_object_bytes=settings.search_max_file_mb * 1024 * 1024,
+                reconcile_seconds=settings.search_index_reconcile_seconds
+            )
+            _shared_indexes[id(storage_service)] = index
+        return index
+
+
+class SearchIndex:
+    """Inverted index (term -> document/line postings) kept in SQLite"""
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        db_path: str,
+        max_workers: int = 8,
+        max_object_bytes: int = 100 * 1024 * 1024,
+        reconcile_seconds: float = 300,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        """
+        Open (or create) the index and start keeping it in sync
+
+        Writes and deletes made through the storage service are applied
+        as they happen; a background pass reconciles against the bucket
+        listing by ETag to pick up changes made by other clients. Several
+        processes (web app, ADK agent) may share one database, so BM25
+        statistics are always read from it rather than kept in memory.
+
+        Args:
+            storage_service: Storage service whose bucket is indexed
+            db_path: SQLite database file
+            max_workers: Objects fetched concurrently while reconciling
+            max_object_bytes: Larger objects are not indexed
+            reconcile_seconds: Interval between reconciliation passes (0 runs one at startup only)
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalisation
+        """
+        self.storage = storage_service
+        self.max_workers = max_workers
+        self.max_object_bytes = max_object_bytes
+        self.reconcile_seconds = reconcile_seconds
+        self.k1 = k1
+        self.b = b
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = self._connect(db_path)
+        self._db.executescript(SCHEMA)
+        # WAL lets queries run on their own connection while a write is in progress
+        self._reader = self._connect(db_path)
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+        # One worker keeps per-object updates in event order
+        self._updates = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+        self._stop = threading.Event()
+        self.last_reconcile: Optional[dict] = None
+
+        storage_service.add_listener(self._on_change)
+        threading.Thread(
+            target=self._reconcile_loop,
+            name="search-index-reconcile",
+            daemon=True
+        ).start()
+        logger.info(f"Search index at {db_path} ({self._totals(self._db)[0]} document(s))")
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        # Other processes sharing the file may hold the write lock for a while
+        db = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @staticmethod
+    def _totals(db: sqlite3.Connection) -> Tuple[int, int]:
+        """Number of indexed documents and their combined length"""
+        return db.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents").fetchone()
+
+    def _on_change(self, event: dict):
+        """Storage listener: queue the matching index update"""
+        if event["type"] == "put":
+            if event["size"] <= self.max_object_bytes:
+                self._updates.submit(self._try_index, event["name"], event["etag"])
+            else:
+                self._updates.submit(self.remove_object, event["name"])
+        elif event["type"] == "delete":
+            self._updates.submit(self.remove_object, event["name"])
+
+    def index_object(self, object_name: str, etag: Optional[str] = None) -> bool:
+        """
+        (Re)index one object
+
+        Args:
+            object_name: Object to index
+            etag: ETag the content corresponds to (looked up if omitted)
+
+        Returns:
+            bool: True if the object was indexed, False if it could not be read
+        """
+        if etag is None:
+            metadata = self.storage.get_file_metadata(object_name)
+            if metadata is None:
+                self.remove_object(object_name)
+                return False
+            etag = metadata["etag"]
+
+        # Indexing every change must not churn the object cache
+        chunks = self.storage.download_stream(object_name, fill_cache=False)
+        if chunks is None:
+            return False
+
+        postings = defaultdict(lambda: [0, []])
+        length = 0
+        try:
+            first = next(chunks, b"")
+            # Binary objects are recorded (so reconciliation skips them) without postings
+            if b"\0" not in first[:8192]:
+                def stream():
+                    yield first
+                    yield from chunks
+
+                for line_number, line in enumerate(iter_lines(stream()), start=1):
+                    for term in tokenize(line):
+                        posting = postings[term]
+                        posting[0] += 1
+                        if len(posting[1]) < LINES_PER_POSTING and line_number not in posting[1]:
+                            posting[1].append(line_number)
+                        length += 1
+        finally:
+            chunks.close()
+
+        with self._write_lock:
+            db = self._db
+            # IMMEDIATE takes the write lock up front, so another process
+            # indexing the same object waits instead of interleaving
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute(
+                    "INSERT INTO documents (name, etag, length) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET etag = excluded.etag, length = excluded.length",
+                    (object_name, etag, length)
+                )
+                doc_id = db.execute(
+                    "SELECT doc_id FROM documents WHERE name = ?", (object_name,)
+                ).fetchone()[0]
+                db.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                db.executemany(
+                    "INSERT INTO postings (term, doc_id, tf, lines) VALUES (?, ?, ?, ?)",
+                    (
+                        (term, doc_id, tf, ",".join(map(str, lines)))
+                        for term, (tf, lines) in postings.items()
+                    )
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+        logger.debug(f"Indexed {object_name}: {len(postings)} term(s)")
+        return True
+
+    def _try_index(self, object_name: str, etag: Optional[str]) -> bool:
+        """index_object that logs failures instead of raising"""
+        try:
+            return self.index_object(object_name, etag)
+        except Exception as e:
+            logger.error(f"❌ Could not index {object_name}: {e}")
+            return False
+
+    def remove_object(self, object_name: str):
+        """Drop an object from the index"""
+        with self._write_lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT doc_id FROM documents WHERE name = ?", (object_name,)
+                ).fetchone()
+                if row is not None:
+                    db.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+                    db.execute("DELETE FROM documents WHERE doc_id = ?", (row[0],))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def reconcile(self) -> dict:
+        """
+        Bring the index in line with the bucket listing
+
+        Objects whose ETag differs from the indexed one are re-indexed,
+        objects no longer listed are removed.
+
+        Returns:
+            dict: Number of objects indexed and removed
+        """
+        listing = {
+            entry["name"]: entry["etag"]
+            for entry in self.storage.list_files_detailed()
+            if entry["size"] is not None
+            and not entry["name"].endswith("/")
+            and entry["size"] <= self.max_object_bytes
+        }
+        with self._read_lock:
+            indexed = dict(self._reader.execute("SELECT name, etag FROM documents"))
+
+        stale = [name for name, etag in listing.items() if indexed.get(name) != etag]
+        gone = [name for name in indexed if name not in listing]
+        if not listing and indexed:
+            # An empty listing is more likely a failed request than an emptied bucket
+            logger.warning("Bucket listing came back empty; keeping the index as is")
+            gone = []
+
+        for name in gone:
+            self.remove_object(name)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            indexed_count = sum(executor.map(
+                lambda name: self._try_index(name, listing[name]),
+                stale
+            ))
+
+        self.last_reconcile = {"indexed": indexed_count, "removed": len(gone)}
+        if stale or gone:
+            logger.info(f"Search index reconciled: {indexed_count} indexed, {len(gone)} removed")
+        return self.last_reconcile
+
+    def _reconcile_loop(self):
+        """Reconcile at startup, then every reconcile_seconds"""
+        while not self._stop.is_set():
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.error(f"❌ Search index reconciliation failed: {e}")
+            if self.reconcile_seconds <= 0 or self._stop.wait(self.reconcile_seconds):
+                break
+
+    def search(self, query: str, limit: int = 10, prefix: str = "") -> Dict[str, Any]:
+        """
+        Rank documents for a query with BM25
+
+        Args:
+            query: Free-text query; every word is a search term
+            limit: Maximum number of documents returned
+            prefix: Only return documents whose name starts with this
+
+        Returns:
+            dict: Ranked documents with matched terms and line numbers, or error
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {
+                "success": False,
+                "error": "Query has no searchable words"
+            }
+
+        scores = defaultdict(float)
+        matched = defaultdict(list)
+        lines = defaultdict(set)
+        names = {}
+
+        with self._read_lock:
+            # One read transaction, so statistics and postings agree
+            self._reader.execute("BEGIN")
+            try:
+                indexed, total_length = self._totals(self._reader)
+                doc_count = max(indexed, 1)
+                avg_length = (total_length / doc_count) or 1
+                for term in terms:
+                    rows = self._reader.execute(
+                        "SELECT p.doc_id, p.tf, p.lines, d.name, d.length "
+                        "FROM postings p JOIN documents d ON d.doc_id = p.doc_id "
+                        "WHERE p.term = ?",
+                        (term,)
+                    ).fetchall()
+                    if not rows:
+                        continue
+
+                    idf = math.log((doc_count - len(rows) + 0.5) / (len(rows) + 0.5) + 1)
+                    for doc_id, tf, line_list, name, length in rows:
+                        if prefix and not name.startswith(prefix):
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                        scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+                        matched[doc_id].append(term)
+                        lines[doc_id].update(int(n) for n in line_list.split(","))
+                        names[doc_id] = name
+            finally:
+                self._reader.execute("COMMIT")
+
+        top = heapq.nlargest(max(1, int(limit)), scores.items(), key=lambda item: item[1])
+        results = [
+            {
+                "filename": names[doc_id],
+                "score": round(score, 4),
+                "terms": matched[doc_id],
+                "lines": sorted(lines[doc_id])[:LINES_PER_POSTING * 2]
+            }
+            for doc_id, score in top
+        ]
+        return {
+            "success": True,
+            "query": query,
+            "results": results,
+            "count": len(results),
+            "documents": indexed
+        }
+
+    def stats(self) -> dict:
+        """
+        Index size and reconciliation status
+
+        Returns:
+            dict: Indexed documents, average length and last reconcile result
+        """
+        with self._read_lock:
+            documents, total_length = self._totals(self._reader)
+        return {
+            "documents": documents,
+            "avg_length": round(total_length / documents, 1) if documents else 0,
+            "last_reconcile": self.last_reconcile
+        }
+
+    def close(self):
+        """Stop background work and close the database"""
+        self._stop.set()
+        self._updates.shutdown(wait=True)
+        self._db.close()
+        self._reader.close()
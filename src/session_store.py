@@ -0,0 +1,172 @@
+"""
+Session Store Module
+Keeps multi-turn chat sessions alive between requests
+"""
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Session:
+    """A chat session and its bookkeeping"""
+
+    session_id: str
+    chat: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    size_bytes: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def content_size(content: Any) -> int:
+    """Serialized size of a history entry in bytes"""
+    try:
+        return type(content).pb(content).ByteSize()
+    except (AttributeError, TypeError):
+        return len(str(content))
+
+
+def turn_starts(history: List[Any]) -> List[int]:
+    """
+    Indices where a user turn begins
+
+    A turn starts at a user message carrying text; function responses are
+    also sent with the user role but belong to the turn in progress.
+    """
+    return [
+        index for index, content in enumerate(history)
+        if content.role == "user"
+        and any(part.text for part in content.parts)
+    ]
+
+
+class SessionStore:
+    """LRU store of chat sessions with TTL, bounded history and memory accounting"""
+
+    def __init__(
+        self,
+        max_sessions: int = 500,
+        ttl_seconds: float = 3600,
+        max_turns: int = 20,
+        max_total_bytes: int = 128 * 1024 * 1024
+    ):
+        """
+        Initialize the store
+
+        Args:
+            max_sessions: Maximum number of live sessions
+            ttl_seconds: Idle time after which a session expires
+            max_turns: User turns of history kept per session
+            max_total_bytes: Combined history size across all sessions
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.max_total_bytes = max_total_bytes
+
+        self._sessions = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_create(self, session_id: str, new_chat: Callable[[], Any]) -> Session:
+        """
+        Return a live session, creating it if missing or expired
+
+        Args:
+            session_id: Client-supplied session identifier
+            new_chat: Factory for a fresh chat object
+
+        Returns:
+            Session: The session, marked as most recently used
+        """
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id=session_id, chat=new_chat())
+                self._sessions[session_id] = session
+                self._evict()
+                logger.info(f"Session created: {session_id}")
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_used = time.monotonic()
+            return session
+
+    def update(self, session: Session):
+        """
+        Trim a session's history after a turn and refresh memory accounting
+
+        Args:
+            session: Session whose turn just finished
+        """
+        history = list(session.chat.history)
+        starts = turn_starts(history)
+        if len(starts) > self.max_turns:
+            history = history[starts[-self.max_turns]:]
+            session.chat.history = history
+
+        size = sum(content_size(content) for content in history)
+        with self._lock:
+            if self._sessions.get(session.session_id) is session:
+                self._total_bytes += size - session.size_bytes
+                self._sessions.move_to_end(session.session_id)
+            session.size_bytes = size
+            session.last_used = time.monotonic()
+            self._evict(keep=session.session_id)
+
+    def delete(self, session_id: str) -> bool:
+        """Forget a session; returns False if it did not exist"""
+        with self._lock:
+            return self._remove(session_id)
+
+    def _remove(self, session_id: str) -> bool:
+        """Drop a session (caller holds the lock)"""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._total_bytes -= session.size_bytes
+        return True
+
+    def _expire(self):
+        """Drop sessions idle for longer than the TTL (caller holds the lock)"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used >= cutoff:
+                break
+            self._remove(session_id)
+            self.expirations += 1
+
+    def _evict(self, keep: Optional[str] = None):
+        """Evict least recently used sessions until within bounds (caller holds the lock)"""
+        while (len(self._sessions) > self.max_sessions
+               or self._total_bytes > self.max_total_bytes):
+            session_id = next((other for other in self._sessions if other != keep), None)
+            if session_id is None:
+                # Only the session being kept is left
+                break
+            self._remove(session_id)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Session counters for sizing
+
+        Returns:
+            dict: Live sessions, memory use and eviction counters
+        """
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "total_bytes": self._total_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -4,15 +4,266 @@ Handles file operations with MinIO (S3-compatible storage)
 """
 import os
 import io
-from typing import Optional, BinaryIO
-from datetime import timedelta
+import hashlib
+import socket
+import threading
+import uuid
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, BinaryIO, Iterable, Iterator, Tuple, Union
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote_plus
+import urllib3
+from urllib3.connection import HTTPConnection
 from minio import Minio
+from minio.commonconfig import REPLACE, ComposeSource, CopySource
+from minio.datatypes import Part
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 import logging
 
+from config.settings import Settings
+from src.object_cache import ObjectCache
+from src.metadata_catalog import MetadataCatalog, select_entries
+from src.object_codec import (
+    CODEC_HEADER, ORIGINAL_SIZE_HEADER, ObjectCodec, codec_info, create_object_codec, decompress_stream
+)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# S3 requires every part except the last to be at least 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# SHA-256 of the (uncompressed) content, recorded on every upload
+HASH_HEADER = "X-Amz-Meta-Sha256"
+# Identical content below this size is re-uploaded rather than copied
+DEDUP_COPY_MIN_BYTES = 256 * 1024
+# Largest source a single CopyObject request accepts
+MAX_COPY_BYTES = 5 * 1024 * 1024 * 1024
+
+# Objects the service keeps for itself; hidden from listings and change events
+INTERNAL_PREFIX = ".agent/"
+
+
+_shared_services = {}
+_shared_lock = threading.Lock()
+
+
+class _BoundedPoolManager(urllib3.PoolManager):
+    """PoolManager whose requests wait at most pool_timeout for a free connection"""
+
+    def __init__(self, *args, pool_timeout: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_timeout = pool_timeout
+
+    def urlopen(self, method, url, redirect=True, **kwargs):
+        # Raises urllib3's EmptyPoolError instead of blocking forever
+        kwargs.setdefault("pool_timeout", self.pool_timeout)
+        return super().urlopen(method, url, redirect=redirect, **kwargs)
+
+
+def create_http_client(
+    max_connections: int = 20,
+    connect_timeout: float = 5.0,
+    read_timeout: float = 60.0,
+    pool_timeout: Optional[float] = 30.0,
+    max_retries: int = 3,
+    backoff_factor: float = 0.2,
+    backoff_jitter: float = 0.2,
+    tcp_keepalive: bool = True
+) -> urllib3.PoolManager:
+    """
+    Build a bounded, retrying HTTP pool for the MinIO client
+    
+    The pool blocks (for up to pool_timeout) when all connections are
+    busy instead of opening throwaway ones, and retries transient
+    5xx/connection errors with exponential backoff plus random jitter.
+    
+    Args:
+        max_connections: Connections kept per host
+        connect_timeout: TCP connect timeout in seconds
+        read_timeout: Socket read timeout in seconds
+        pool_timeout: Longest wait for a free connection (None waits forever)
+        max_retries: Retries for failed requests
+        backoff_factor: Base of the exponential backoff in seconds
+        backoff_jitter: Maximum random delay added to each backoff
+        tcp_keepalive: Enable TCP keep-alive probes on pooled sockets
+        
+    Returns:
+        urllib3.PoolManager: HTTP client to pass to Minio
+    """
+    socket_options = list(HTTPConnection.default_socket_options)
+    if tcp_keepalive:
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    
+    return _BoundedPoolManager(
+        num_pools=4,
+        maxsize=max_connections,
+        block=True,
+        pool_timeout=pool_timeout,
+        timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+        retries=urllib3.Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=[500, 502, 503, 504]
+        ),
+        socket_options=socket_options
+    )
+
+
+def get_storage_service(settings: Settings) -> "StorageService":
+    """
+    Return the process-wide StorageService for these settings
+    
+    Every entry point in a process (web API, CLI, ADK agents) shares one
+    client and therefore one connection pool per endpoint and bucket.
+    
+    Args:
+        settings: Application settings
+        
+    Returns:
+        StorageService: Shared storage service instance
+    """
+    key = (
+        settings.minio_endpoint,
+        settings.minio_access_key,
+        settings.minio_bucket_name,
+        settings.minio_secure
+    )
+    with _shared_lock:
+        service = _shared_services.get(key)
+        if service is None:
+            service = StorageService(
+                endpoint=settings.minio_endpoint,
+                access_key=settings.minio_access_key,
+                secret_key=settings.minio_secret_key,
+                bucket_name=settings.minio_bucket_name,
+                secure=settings.minio_secure,
+                part_size=settings.upload_part_size_mb * 1024 * 1024,
+                upload_parallelism=settings.upload_parallelism,
+                batch_workers=settings.batch_max_workers,
+                http_client=create_http_client(
+                    max_connections=settings.minio_max_connections,
+                    connect_timeout=settings.minio_connect_timeout,
+                    read_timeout=settings.minio_read_timeout,
+                    pool_timeout=settings.minio_pool_timeout,
+                    max_retries=settings.minio_max_retries,
+                    backoff_factor=settings.minio_backoff_factor,
+                    backoff_jitter=settings.minio_backoff_jitter,
+                    tcp_keepalive=settings.minio_tcp_keepalive
+                ),
+                cache=ObjectCache(
+                    max_memory_bytes=settings.cache_memory_mb * 1024 * 1024,
+                    max_disk_bytes=settings.cache_disk_mb * 1024 * 1024,
+                    cache_dir=settings.cache_dir,
+                    memory_object_limit=settings.cache_memory_object_kb * 1024
+                ) if settings.cache_enabled else None,
+                catalog=MetadataCatalog(
+                    db_path=os.path.join(
+                        settings.catalog_dir,
+                        f"{settings.minio_bucket_name}.sqlite3"
+                    ),
+                    reconcile_seconds=settings.catalog_reconcile_seconds
+                ) if settings.catalog_enabled else None,
+                codec=create_object_codec(settings),
+                dedup=settings.storage_dedup_enabled
+            )
+            _shared_services[key] = service
+        return service
+
+
+def iter_text_chunks(text: str, chunk_chars: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Encode text to UTF-8 one slice at a time
+
+    Args:
+        text: Text to encode
+        chunk_chars: Number of characters encoded per chunk
+
+    Yields:
+        bytes: UTF-8 encoded chunks
+    """
+    for start in range(0, len(text), chunk_chars):
+        yield text[start:start + chunk_chars].encode('utf-8')
+
+
+def _content_hash(headers) -> Optional[str]:
+    """SHA-256 recorded in object headers or listed user metadata, if any"""
+    for key, value in (headers or {}).items():
+        if key.lower() in (HASH_HEADER.lower(), "sha256"):
+            return value
+    return None
+
+
+def _slice_chunks(
+    chunks: Iterator[bytes],
+    offset: int,
+    length: Optional[int],
+    drain: bool = False
+) -> Iterator[bytes]:
+    """
+    Yield bytes [offset, offset + length) of a chunk stream, then close it
+
+    With drain, the rest of the stream is consumed after the slice (e.g.
+    so a cache tee sees the whole body) instead of being abandoned.
+    """
+    end = None if length is None else offset + length
+    position = 0
+    try:
+        for chunk in chunks:
+            start = max(offset - position, 0)
+            stop = len(chunk) if end is None else min(end - position, len(chunk))
+            position += len(chunk)
+            if start < stop:
+                yield chunk[start:stop]
+            if end is not None and position >= end:
+                if drain:
+                    for _ in chunks:
+                        pass
+                break
+    finally:
+        chunks.close()
+
+
+class _ChunkReader:
+    """Reads fixed-size parts from a file-like object or an iterator of bytes"""
+
+    def __init__(self, source: Union[BinaryIO, Iterable[bytes]], hashed: bool = False):
+        self._file = source if hasattr(source, "read") else None
+        self._chunks = None if self._file else iter(source)
+        self._pending = b""
+        self.bytes_read = 0
+        self.sha256 = hashlib.sha256() if hashed else None
+
+    def read(self, size: int) -> bytes:
+        """Return up to `size` bytes; fewer only at end of stream"""
+        if self._file is not None:
+            buffer = bytearray()
+            while len(buffer) < size:
+                data = self._file.read(size - len(buffer))
+                if not data:
+                    break
+                buffer += data
+        else:
+            buffer = bytearray(self._pending)
+            self._pending = b""
+            while len(buffer) < size:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                buffer += chunk
+            if len(buffer) > size:
+                self._pending = bytes(buffer[size:])
+                del buffer[size:]
+        self.bytes_read += len(buffer)
+        if self.sha256 is not None:
+            self.sha256.update(buffer)
+        return bytes(buffer)
+
 
 class StorageService:
     """Manages file storage operations using MinIO"""
@@ -23,7 +274,15 @@ class StorageService:
         access_key: str,
         secret_key: str,
         bucket_name: str,
-        secure: bool = False
+        secure: bool = False,
+        part_size: int = DEFAULT_PART_SIZE,
+        upload_parallelism: int = 3,
+        batch_workers: int = 8,
+        http_client: Optional[urllib3.PoolManager] = None,
+        cache: Optional[ObjectCache] = None,
+        catalog: Optional[MetadataCatalog] = None,
+        codec: Optional[ObjectCodec] = None,
+        dedup: bool = True
     ):
         """
         Initialize MinIO client
@@ -34,15 +293,49 @@ class StorageService:
             secret_key: MinIO secret key
             bucket_name: Default bucket name
             secure: Use HTTPS if True
+            part_size: Part size in bytes for streaming multipart uploads
+            upload_parallelism: Number of parts uploaded concurrently
+            batch_workers: Worker threads used by bulk get/put
+            http_client: Preconfigured HTTP pool (see create_http_client)
+            cache: Read-through cache for download_file
+            catalog: Local metadata catalog that serves listings
+            codec: Compresses eligible uploads at rest (compressed objects
+                are decompressed on read whether or not a codec is set)
+            dedup: Skip writes of unchanged content and copy content that
+                is already stored under another name (see upload_file)
         """
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
         self.client = Minio(
             endpoint,
             access_key=access_key,
             secret_key=secret_key,
-            secure=secure
+            secure=secure,
+            http_client=http_client
+        )
+        # The notification stream holds its connection indefinitely, so it
+        # gets its own so it can never starve the shared pool
+        self._notification_client = Minio(
+            endpoint,
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=secure,
+            http_client=create_http_client(max_connections=1, read_timeout=300, pool_timeout=None)
         )
         self.bucket_name = bucket_name
+        self.part_size = part_size
+        self.upload_parallelism = max(1, upload_parallelism)
+        self.batch_workers = max(1, batch_workers)
+        self.cache = cache
+        self.codec = codec
+        self.dedup = dedup
+        self._listeners: List[Callable[[dict], None]] = []
         self._ensure_bucket_exists()
+        
+        self.catalog = catalog
+        if catalog is not None:
+            self.add_listener(catalog.apply)
+            catalog.start(self._list_live)
     
     def _ensure_bucket_exists(self):
         """Create bucket if it doesn't exist"""
@@ -56,6 +349,47 @@ class StorageService:
             logger.error(f"Error ensuring bucket exists: {e}")
             raise
     
+    def add_listener(self, listener: Callable[[dict], None]):
+        """
+        Register a callback for writes and deletes made through this service
+        
+        Listeners receive event dicts: `{"type": "put", "name", "size",
+        "etag", "content_type", "sha256", "last_modified"}` or
+        `{"type": "delete", "name"}`. They run on the writing thread, so
+        they should be quick and hand heavy work off to their own executor.
+        
+        Args:
+            listener: Callable taking one event dict
+        """
+        self._listeners.append(listener)
+    
+    def _notify(self, event: dict):
+        """Deliver a change event to every listener, isolating their failures"""
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Storage listener failed on {event['type']} {event['name']}: {e}")
+    
+    def _notify_put(
+        self,
+        object_name: str,
+        size: int,
+        etag: Optional[str],
+        content_type: str,
+        sha256: Optional[str] = None
+    ):
+        """Announce a completed write"""
+        self._notify({
+            "type": "put",
+            "name": object_name,
+            "size": size,
+            "etag": etag,
+            "content_type": content_type,
+            "sha256": sha256,
+            "last_modified": datetime.now(timezone.utc)
+        })
+    
     def upload_file(
         self,
         file_data: bytes,
@@ -71,36 +405,454 @@ class StorageService:
             content_type: MIME type of the file
             
         Returns:
-            dict: Upload result with S3 key and metadata
+            dict: Upload result with S3 key, metadata, SHA-256 of the
+            content and whether it was `unchanged` (nothing written)
         """
         try:
-            file_stream = io.BytesIO(file_data)
-            file_size = len(file_data)
+            result = self._put_bytes(file_data, object_name, content_type)
+            logger.info(f"File uploaded successfully: {object_name}")
+            return result
+        except S3Error as e:
+            logger.error(f"Error uploading file: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def upload_stream(
+        self,
+        source: Union[BinaryIO, Iterable[bytes]],
+        object_name: str,
+        content_type: str = "application/octet-stream",
+        part_size: Optional[int] = None,
+        parallelism: Optional[int] = None
+    ) -> dict:
+        """
+        Upload a stream of unknown length to MinIO
+        
+        Payloads smaller than one part go up in a single request (and are
+        deduplicated like upload_file). Larger ones are sent as a multipart
+        upload with at most `parallelism` parts in flight, so memory use
+        stays bounded by a few parts. Eligible content is compressed on
+        the fly when a codec is set.
+        
+        Args:
+            source: File-like object with read() or an iterator of bytes
+            object_name: Name for the object in storage
+            content_type: MIME type of the file
+            part_size: Part size in bytes (defaults to the service setting)
+            parallelism: Concurrent part uploads (defaults to the service setting)
             
-            result = self.client.put_object(
+        Returns:
+            dict: Upload result with S3 key, metadata and SHA-256 of the content
+        """
+        part_size = part_size or self.part_size
+        parallelism = parallelism or self.upload_parallelism
+        reader = _ChunkReader(source, hashed=self.dedup)
+        
+        try:
+            first_part = reader.read(part_size)
+            if len(first_part) < part_size:
+                result = self._put_bytes(first_part, object_name, content_type)
+                logger.info(f"File streamed successfully: {object_name} ({reader.bytes_read} bytes)")
+                return result
+            
+            packed, metadata = reader, {}
+            if self.codec is not None and self.codec.should_compress(content_type, len(first_part)):
+                # Parts are cut from the compressed stream, not the source
+                packed = _ChunkReader(self.codec.compress_stream(
+                    chain([first_part], iter(lambda: reader.read(part_size), b""))
+                ))
+                first_part = packed.read(part_size)
+                metadata = self.codec.metadata()
+            
+            etag = self._multipart_upload(
+                packed, first_part, object_name, content_type,
+                part_size, parallelism, metadata
+            )
+            
+            # The hash and original size are only known once the whole source
+            # is read; recording them takes a server-side copy, so it is only
+            # made when dedup or the codec needs them
+            sha256 = reader.sha256.hexdigest() if self.dedup else None
+            if metadata or sha256:
+                if metadata:
+                    metadata = self.codec.metadata(reader.bytes_read)
+                if sha256:
+                    metadata[HASH_HEADER] = sha256
+                etag = self._replace_metadata(
+                    object_name, content_type, metadata, etag, packed.bytes_read
+                ) or etag
+            
+            self._invalidate(object_name)
+            self._notify_put(object_name, reader.bytes_read, etag, content_type, sha256)
+            logger.info(f"File streamed successfully: {object_name} ({reader.bytes_read} bytes)")
+            
+            return {
+                "success": True,
+                "s3_key": object_name,
+                "bucket": self.bucket_name,
+                "size": reader.bytes_read,
+                "stored_size": packed.bytes_read,
+                "etag": etag,
+                "sha256": sha256,
+                "unchanged": False
+            }
+        except (S3Error, OSError) as e:
+            logger.error(f"Error streaming file: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def _put_bytes(self, data: bytes, object_name: str, content_type: str) -> dict:
+        """
+        Store a payload held in memory (raises S3Error)
+        
+        With dedup on, content the object already holds is not sent again,
+        and content stored under another name is copied server-side.
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        result = {
+            "success": True,
+            "s3_key": object_name,
+            "bucket": self.bucket_name,
+            "size": len(data),
+            "sha256": sha256,
+            "unchanged": False
+        }
+        
+        stored = None
+        if self.dedup:
+            current = self._version_with_hash(object_name, sha256, content_type)
+            if current is not None:
+                logger.info(f"Content unchanged, nothing written: {object_name}")
+                return {
+                    **result,
+                    "stored_size": current["stored_size"],
+                    "etag": current["etag"],
+                    "unchanged": True
+                }
+            if len(data) >= DEDUP_COPY_MIN_BYTES:
+                stored = self._copy_duplicate(object_name, sha256, content_type)
+        
+        if stored is None:
+            payload, metadata = data, {HASH_HEADER: sha256}
+            if self.codec is not None and self.codec.should_compress(content_type, len(data)):
+                payload = self.codec.compress(data)
+                metadata.update(self.codec.metadata(len(data)))
+            put = self.client.put_object(
                 self.bucket_name,
                 object_name,
-                file_stream,
-                file_size,
-                content_type=content_type
+                io.BytesIO(payload),
+                len(payload),
+                content_type=content_type,
+                metadata=metadata
             )
+            stored = {"etag": put.etag, "stored_size": len(payload)}
+        
+        self._invalidate(object_name)
+        self._notify_put(object_name, len(data), stored["etag"], content_type, sha256)
+        return {**result, **stored}
+    
+    def _version_with_hash(self, object_name: str, sha256: str, content_type: str) -> Optional[dict]:
+        """Metadata of the stored object if it already holds this content with this type"""
+        if self.catalog is not None and self.catalog.ready:
+            entry = self.catalog.lookup(object_name)
+            if entry is None or entry["sha256"] != sha256 or entry["content_type"] not in (None, content_type):
+                # Only a match is confirmed against the server; a stale
+                # mismatch just costs one redundant write. Rows filled in
+                # by a bucket listing have no content type, so the stat
+                # below decides for them
+                return None
+        try:
+            current = self._stat(object_name)
+        except S3Error:
+            return None
+        if current["sha256"] != sha256 or current["content_type"] != content_type:
+            return None
+        return current
+    
+    def _copy_duplicate(self, object_name: str, sha256: str, content_type: str) -> Optional[dict]:
+        """Copy identical content from another object server-side, if the catalog knows one"""
+        if self.catalog is None or not self.catalog.ready:
+            return None
+        entry = self.catalog.find_by_hash(sha256, exclude=object_name)
+        if entry is None:
+            return None
+        
+        try:
+            source = self._stat(entry["name"])
+            if source["sha256"] != sha256:
+                return None
+            metadata = {"Content-Type": content_type, HASH_HEADER: sha256}
+            if source["codec"] is not None:
+                metadata.update({CODEC_HEADER: source["codec"], ORIGINAL_SIZE_HEADER: str(source["size"])})
+            result = self.client.copy_object(
+                self.bucket_name,
+                object_name,
+                CopySource(self.bucket_name, entry["name"], match_etag=source["etag"]),
+                metadata=metadata,
+                metadata_directive=REPLACE
+            )
+        except S3Error as e:
+            logger.warning(f"Could not copy duplicate content from {entry['name']}: {e}")
+            return None
+        
+        logger.info(f"♻️ Copied identical content from {entry['name']} to {object_name}")
+        return {"etag": result.etag, "stored_size": source["stored_size"]}
+    
+    def _multipart_upload(
+        self,
+        reader: _ChunkReader,
+        first_part: bytes,
+        object_name: str,
+        content_type: str,
+        part_size: int,
+        parallelism: int,
+        metadata: Optional[dict] = None
+    ) -> str:
+        """Upload parts concurrently, blocking the reader while all slots are busy"""
+        upload_id = self.client._create_multipart_upload(
+            self.bucket_name, object_name, {"Content-Type": content_type, **(metadata or {})}
+        )
+        slots = threading.BoundedSemaphore(parallelism)
+        failed = threading.Event()
+        
+        def on_done(future):
+            if future.exception() is not None:
+                failed.set()
+            slots.release()
+        
+        try:
+            futures = []
+            with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                data = first_part
+                while data and not failed.is_set():
+                    slots.acquire()
+                    future = executor.submit(
+                        self.client._upload_part,
+                        self.bucket_name, object_name, data, None,
+                        upload_id, len(futures) + 1
+                    )
+                    future.add_done_callback(on_done)
+                    futures.append(future)
+                    data = reader.read(part_size)
             
-            logger.info(f"File uploaded successfully: {object_name}")
+            parts = [
+                Part(number, future.result())
+                for number, future in enumerate(futures, start=1)
+            ]
+            result = self.client._complete_multipart_upload(
+                self.bucket_name, object_name, upload_id, parts
+            )
+            return result.etag
+        except Exception:
+            self.client._abort_multipart_upload(self.bucket_name, object_name, upload_id)
+            raise
+    
+    def _replace_metadata(
+        self,
+        object_name: str,
+        content_type: str,
+        metadata: dict,
+        etag: str,
+        stored_size: int
+    ) -> Optional[str]:
+        """
+        Set user metadata on a finished multipart upload
+        
+        The hash (and original size) of a streamed source are only known
+        once all parts are up, so they are set afterwards with a
+        server-side copy onto itself, which MinIO applies as a metadata
+        update without rewriting the data. Objects too large for one
+        CopyObject are copied part by part with compose_object.
+        
+        Returns:
+            str: ETag of the updated object, or None if it could not be updated
+        """
+        metadata = {"Content-Type": content_type, **metadata}
+        try:
+            if stored_size > MAX_COPY_BYTES:
+                result = self.client.compose_object(
+                    self.bucket_name,
+                    object_name,
+                    [ComposeSource(self.bucket_name, object_name, match_etag=etag)],
+                    metadata=metadata
+                )
+            else:
+                result = self.client.copy_object(
+                    self.bucket_name,
+                    object_name,
+                    CopySource(self.bucket_name, object_name, match_etag=etag),
+                    metadata=metadata,
+                    metadata_directive=REPLACE
+                )
+            return result.etag
+        except (S3Error, ValueError) as e:
+            # Reads still work; the object just goes without a hash (and original size)
+            logger.warning(f"Could not update metadata of {object_name}: {e}")
+            return None
+    
+    def append_file(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream"
+    ) -> dict:
+        """
+        Append bytes to the end of a file, creating it if needed
+        
+        Args:
+            object_name: Name of the object to extend
+            data: Bytes to append
+            content_type: MIME type used if the file is created
             
+        Returns:
+            dict: Write result with the new size (see splice_file)
+        """
+        try:
+            size = self._stat(object_name)["size"]
+        except S3Error as e:
+            if e.code != "NoSuchKey":
+                logger.error(f"Error appending to file: {e}")
+                return {
+                    "success": False,
+                    "error": str(e)
+                }
+            return self.upload_file(data, object_name, content_type)
+        return self.splice_file(object_name, size, size, data)
+    
+    def splice_file(
+        self,
+        object_name: str,
+        start: int,
+        end: int,
+        data: bytes,
+        content_type: Optional[str] = None
+    ) -> dict:
+        """
+        Replace bytes [start, end) of a file with new bytes
+        
+        Large plain objects are rebuilt server-side with compose_object:
+        the unchanged head and tail are copied within MinIO and only the
+        new bytes (padded to the 5 MiB minimum part size with neighbouring
+        original bytes) are uploaded. Small or compressed objects are
+        rewritten whole.
+        
+        Args:
+            object_name: Name of the object to edit
+            start: First byte replaced
+            end: Byte after the last one replaced (start == end inserts)
+            data: Replacement bytes
+            content_type: MIME type to store (defaults to the current one)
+            
+        Returns:
+            dict: Write result with the new size and whether it was `composed`
+        """
+        try:
+            current = self._stat(object_name)
+            size = current["size"]
+            if not 0 <= start <= end <= size:
+                return {
+                    "success": False,
+                    "error": f"Range {start}-{end} is outside the file ({size} bytes)"
+                }
+            content_type = content_type or current["content_type"] or "application/octet-stream"
+            
+            if current["codec"] is not None or size < MIN_PART_SIZE:
+                original = self.download_file(object_name)
+                if original is None:
+                    return {
+                        "success": False,
+                        "error": f"File '{object_name}' could not be read"
+                    }
+                result = self._put_bytes(original[:start] + data + original[end:], object_name, content_type)
+                result["composed"] = False
+                logger.info(f"File rewritten: {object_name} ({result['size']} bytes)")
+                return result
+            
+            etag = self._compose(object_name, current, start, end, data, content_type)
+            new_size = size - (end - start) + len(data)
+            self._invalidate(object_name)
+            self._notify_put(object_name, new_size, etag, content_type)
+            logger.info(f"File composed server-side: {object_name} ({len(data)} new bytes)")
             return {
                 "success": True,
                 "s3_key": object_name,
                 "bucket": self.bucket_name,
-                "size": file_size,
-                "etag": result.etag
+                "size": new_size,
+                "etag": etag,
+                "sha256": None,
+                "unchanged": False,
+                "composed": True
             }
-        except S3Error as e:
-            logger.error(f"Error uploading file: {e}")
+        except (S3Error, OSError) as e:
+            logger.error(f"Error editing file: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    def _compose(
+        self,
+        object_name: str,
+        current: dict,
+        start: int,
+        end: int,
+        data: bytes,
+        content_type: str
+    ) -> str:
+        """
+        Rebuild an object from ranges of itself plus a staged middle part
+        
+        Every compose source except the last must be at least 5 MiB, so a
+        short head and enough of the tail to fill the staged part are
+        downloaded and re-uploaded with the new bytes. The sources are
+        pinned to the stat'ed ETag, so a concurrent write makes the
+        compose fail instead of mixing versions.
+        
+        Returns:
+            str: ETag of the new object
+        """
+        etag, size = current["etag"], current["size"]
+        head = start if start >= MIN_PART_SIZE else 0
+        staged = bytearray(self._read_exact(object_name, 0, start, etag) if not head else b"")
+        staged += data
+        tail = end
+        if len(staged) < MIN_PART_SIZE and tail < size:
+            take = min(MIN_PART_SIZE - len(staged), size - tail)
+            staged += self._read_exact(object_name, tail, take, etag)
+            tail += take
+        
+        sources = []
+        if head:
+            sources.append(ComposeSource(self.bucket_name, object_name, offset=0, length=head, match_etag=etag))
+        staging_name = f"{INTERNAL_PREFIX}staging/{uuid.uuid4().hex}"
+        self.client.put_object(self.bucket_name, staging_name, io.BytesIO(bytes(staged)), len(staged))
+        try:
+            sources.append(ComposeSource(self.bucket_name, staging_name))
+            if tail < size:
+                sources.append(ComposeSource(
+                    self.bucket_name, object_name, offset=tail, length=size - tail, match_etag=etag
+                ))
+            result = self.client.compose_object(
+                self.bucket_name, object_name, sources,
+                metadata={"Content-Type": content_type}
+            )
+            return result.etag
+        finally:
+            self.client.remove_object(self.bucket_name, staging_name)
+    
+    def _read_exact(self, object_name: str, offset: int, length: int, etag: str) -> bytes:
+        """Read a byte range that must exist (raises S3Error)"""
+        if length == 0:
+            return b""
+        chunk = self.read_chunk(object_name, offset, length, etag)
+        if chunk is None or len(chunk[0]) != length:
+            raise OSError(f"'{object_name}' changed while being edited")
+        return bytes(chunk[0])
+    
     def download_file(self, object_name: str) -> Optional[bytes]:
         """
         Download a file from MinIO
@@ -111,11 +863,28 @@ class StorageService:
         Returns:
             bytes: File content or None if error
         """
+        if self.cache is not None:
+            data = self.cache.get(object_name, lambda: self._current_etag(object_name))
+            if data is not None:
+                logger.info(f"File served from cache: {object_name}")
+                return data
+        
+        return self._fetch(object_name)
+    
+    def _fetch(self, object_name: str) -> Optional[bytes]:
+        """GET a whole object and store it in the cache"""
         try:
             response = self.client.get_object(self.bucket_name, object_name)
             data = response.read()
+            etag = response.headers.get("ETag", "").strip('"')
+            codec, _ = codec_info(response.headers)
             response.close()
             response.release_conn()
+            if codec is not None:
+                data = b"".join(decompress_stream([data], codec))
+            
+            if self.cache is not None and etag:
+                self.cache.put(object_name, etag, data)
             
             logger.info(f"File downloaded successfully: {object_name}")
             return data
@@ -123,6 +892,242 @@ class StorageService:
             logger.error(f"Error downloading file: {e}")
             return None
     
+    def read_range(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> Optional[memoryview]:
+        """
+        Read a file (or a byte range of it) as a memoryview
+        
+        Cached objects are sliced in place; disk-tier entries are
+        memory-mapped, so hot large files are neither re-downloaded nor
+        copied onto the heap. Uncached partial reads fetch just the range.
+        
+        Args:
+            object_name: Name of the object to read
+            offset: First byte to read
+            length: Number of bytes to read (None reads to the end)
+            etag: Current ETag if the caller already stat'ed the object
+                (saves the cache revalidation request)
+            
+        Returns:
+            memoryview: Requested bytes or None if error
+        """
+        result = self.read_chunk(object_name, offset, length, etag)
+        return None if result is None else result[0]
+    
+    def read_chunk(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> Optional[Tuple[memoryview, int]]:
+        """
+        Read a byte range together with the object's total size
+        
+        The total comes from the cached copy or the ranged GET's
+        Content-Range header, so no extra stat request is needed.
+        Reading past the end returns an empty chunk.
+        
+        Args:
+            object_name: Name of the object to read
+            offset: First byte to read
+            length: Number of bytes to read (None reads to the end)
+            etag: Current ETag if already known (skips cache revalidation)
+            
+        Returns:
+            tuple: (requested bytes, total object size) or None if error
+        """
+        view = self._cached_view(object_name, etag)
+        if view is not None:
+            end = len(view) if length is None else min(offset + length, len(view))
+            return view[offset:end], len(view)
+        
+        if offset == 0 and length is None:
+            data = self._fetch(object_name)
+            return None if data is None else (memoryview(data), len(data))
+        
+        try:
+            response, codec = self._open(object_name, offset, length)
+            if codec is not None:
+                # Decode the whole object once and cache it, so paging through
+                # it slices the cached copy instead of decoding from byte 0 again
+                etag = response.headers.get("ETag", "").strip('"')
+                data = b"".join(self._iter_response(response, DEFAULT_CHUNK_SIZE, codec))
+                if self.cache is not None and etag:
+                    self.cache.put(object_name, etag, data)
+                view = memoryview(data)
+                end = len(view) if length is None else min(offset + length, len(view))
+                return view[offset:end], len(view)
+            data = response.read()
+            content_range = response.headers.get("Content-Range", "")
+            response.close()
+            response.release_conn()
+            
+            _, _, total = content_range.rpartition("/")
+            size = int(total) if total.isdigit() else offset + len(data)
+            return memoryview(data), size
+        except S3Error as e:
+            if e.code == "InvalidRange":
+                metadata = self.get_file_metadata(object_name)
+                if metadata is not None:
+                    return memoryview(b""), metadata["size"]
+            logger.error(f"Error downloading file: {e}")
+            return None
+    
+    def _open(self, object_name: str, offset: int, length: Optional[int]) -> Tuple[object, Optional[str]]:
+        """
+        GET an object for reading a byte range (raises S3Error)
+        
+        Ranges are requested from the server for plain objects only; a
+        compressed object is fetched whole since its stored bytes do not
+        line up with the original ones.
+        
+        Returns:
+            tuple: (response, codec of the object or None)
+        """
+        try:
+            response = self.client.get_object(
+                self.bucket_name,
+                object_name,
+                offset=offset,
+                length=length or 0
+            )
+        except S3Error as e:
+            if e.code != "InvalidRange":
+                raise
+            # Past the end of the stored bytes, but maybe not of the original ones
+            metadata = self.get_file_metadata(object_name)
+            if metadata is None or metadata["codec"] is None:
+                raise
+        else:
+            codec, _ = codec_info(response.headers)
+            if codec is None or not (offset or length):
+                return response, codec
+            response.close()
+            response.release_conn()
+        
+        response = self.client.get_object(self.bucket_name, object_name)
+        return response, codec_info(response.headers)[0]
+    
+    def _cached_view(self, object_name: str, etag: Optional[str] = None) -> Optional[memoryview]:
+        """Validated cache view of an object, checking the live ETag unless one is given"""
+        if self.cache is None:
+            return None
+        return self.cache.get_view(
+            object_name,
+            lambda: etag or self._current_etag(object_name)
+        )
+    
+    def _current_etag(self, object_name: str) -> Optional[str]:
+        """Fetch the live ETag of an object, or None if it cannot be stat'ed"""
+        try:
+            return self.client.stat_object(self.bucket_name, object_name).etag
+        except S3Error:
+            return None
+    
+    def _invalidate(self, object_name: str):
+        """Drop cached state for an object after it was written or deleted"""
+        if self.cache is not None:
+            self.cache.invalidate(object_name)
+    
+    def download_stream(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        etag: Optional[str] = None,
+        fill_cache: bool = True
+    ) -> Optional[Iterator[bytes]]:
+        """
+        Stream a file (or a byte range of it) from MinIO
+        
+        Cached objects are streamed from their local copy. Otherwise the
+        GET request is issued immediately so missing objects are reported
+        up front, and the body is read lazily chunk by chunk; full-object
+        streams are teed into the disk cache as they go. Compressed
+        objects are decoded on the fly; a range of one is decoded from the
+        start and the whole object is cached for the next range.
+        
+        Args:
+            object_name: Name of the object to download
+            offset: First byte to read
+            length: Number of bytes to read (None reads to the end)
+            chunk_size: Size of the chunks yielded
+            etag: Known current ETag, saves a stat when validating the cache
+            fill_cache: Tee full-object reads into the disk cache; background
+                scans pass False so they don't evict what users are reading
+            
+        Returns:
+            Iterator[bytes]: Chunk iterator or None if error
+        """
+        view = self._cached_view(object_name, etag)
+        if view is not None:
+            end = len(view) if length is None else min(offset + length, len(view))
+            return self._iter_view(view[offset:end], chunk_size)
+        
+        ranged = bool(offset or length)
+        try:
+            response, codec = self._open(object_name, offset, length)
+        except S3Error as e:
+            logger.error(f"Error downloading file: {e}")
+            return None
+        
+        chunks = self._iter_response(response, chunk_size, codec)
+        if self.cache is not None and fill_cache and (codec is not None or not ranged):
+            # Ranges of compressed objects are decoded from the start anyway;
+            # the slice drains the rest so the whole object lands in the cache
+            chunks = self._iter_and_cache(chunks, response.headers, object_name)
+        if codec is not None and ranged:
+            return _slice_chunks(chunks, offset, length or None, drain=self.cache is not None and fill_cache)
+        return chunks
+    
+    @staticmethod
+    def _iter_response(response, chunk_size: int, codec: Optional[str] = None) -> Iterator[bytes]:
+        """Yield a (decoded) response body in chunks and release the connection when done"""
+        try:
+            stream = response.stream(chunk_size)
+            if codec is not None:
+                stream = decompress_stream(stream, codec)
+            yield from stream
+        finally:
+            response.close()
+            response.release_conn()
+    
+    @staticmethod
+    def _iter_view(view: memoryview, chunk_size: int) -> Iterator[bytes]:
+        """Yield a cached view in chunks"""
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+    
+    def _iter_and_cache(self, chunks: Iterator[bytes], headers, object_name: str) -> Iterator[bytes]:
+        """Yield a full (decoded) object body while writing it to the disk cache"""
+        etag = headers.get("ETag", "").strip('"')
+        codec, original_size = codec_info(headers)
+        size = original_size if codec is not None else int(headers.get("Content-Length", 0))
+        writer = self.cache.open_writer(object_name, etag, size) if etag and size is not None else None
+        try:
+            for chunk in chunks:
+                if writer is not None:
+                    try:
+                        writer.write(chunk)
+                    except OSError as e:
+                        logger.warning(f"Stopped caching {object_name}: {e}")
+                        writer.discard()
+                        writer = None
+                yield chunk
+            if writer is not None:
+                writer.commit()
+        finally:
+            if writer is not None:
+                writer.discard()
+            chunks.close()
+    
     def delete_file(self, object_name: str) -> bool:
         """
         Delete a file from MinIO
@@ -135,33 +1140,261 @@ class StorageService:
         """
         try:
             self.client.remove_object(self.bucket_name, object_name)
+            self._invalidate(object_name)
+            self._notify({"type": "delete", "name": object_name})
             logger.info(f"File deleted successfully: {object_name}")
             return True
         except S3Error as e:
             logger.error(f"Error deleting file: {e}")
             return False
     
+    def delete_files(self, object_names: List[str]) -> dict:
+        """
+        Delete many files with S3 multi-object delete
+        
+        Args:
+            object_names: Names of the objects to delete
+            
+        Returns:
+            dict: Deleted names and per-object errors
+        """
+        try:
+            errors = list(self.client.remove_objects(
+                self.bucket_name,
+                (DeleteObject(name) for name in object_names)
+            ))
+        except S3Error as e:
+            logger.error(f"Error deleting files: {e}")
+            return {
+                "success": False,
+                "deleted": [],
+                "errors": [{"name": name, "error": str(e)} for name in object_names]
+            }
+        
+        failed = {error.name for error in errors}
+        deleted = [name for name in object_names if name not in failed]
+        for name in object_names:
+            self._invalidate(name)
+        for name in deleted:
+            self._notify({"type": "delete", "name": name})
+        
+        logger.info(f"Deleted {len(deleted)} file(s), {len(errors)} error(s)")
+        return {
+            "success": not errors,
+            "deleted": deleted,
+            "errors": [{"name": error.name, "error": error.message} for error in errors]
+        }
+    
+    def put_internal(self, name: str, data: bytes, metadata: Optional[dict] = None) -> Optional[str]:
+        """
+        Store a service-owned object under INTERNAL_PREFIX
+        
+        Internal objects bypass compression, deduplication, the object
+        cache and change listeners, and are hidden from listings.
+        
+        Args:
+            name: Name relative to INTERNAL_PREFIX
+            data: Object bytes
+            metadata: User metadata headers
+        
+        Returns:
+            str: ETag, or None if the upload failed
+        """
+        try:
+            result = self.client.put_object(
+                self.bucket_name,
+                INTERNAL_PREFIX + name,
+                io.BytesIO(data),
+                len(data),
+                metadata=metadata
+            )
+            return result.etag
+        except S3Error as e:
+            logger.error(f"Error storing internal object {name}: {e}")
+            return None
+    
+    def get_internal(self, name: str) -> Optional[Tuple[bytes, dict]]:
+        """
+        Fetch a service-owned object stored with put_internal
+        
+        Returns:
+            tuple: (bytes, response headers), or None if it does not exist
+        """
+        response = None
+        try:
+            response = self.client.get_object(self.bucket_name, INTERNAL_PREFIX + name)
+            return response.read(), dict(response.headers)
+        except S3Error as e:
+            if e.code != "NoSuchKey":
+                logger.error(f"Error reading internal object {name}: {e}")
+            return None
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+    
+    def remove_internal(self, name: str):
+        """Delete a service-owned object (missing objects are ignored)"""
+        try:
+            self.client.remove_object(self.bucket_name, INTERNAL_PREFIX + name)
+        except S3Error as e:
+            logger.error(f"Error removing internal object {name}: {e}")
+    
+    def download_files(self, object_names: List[str]) -> Dict[str, Optional[bytes]]:
+        """
+        Download many files in parallel on a bounded worker pool
+        
+        Args:
+            object_names: Names of the objects to download
+            
+        Returns:
+            dict: Object name -> content, or None for objects that failed
+        """
+        unique_names = list(dict.fromkeys(object_names))
+        with ThreadPoolExecutor(max_workers=self.batch_workers) as executor:
+            contents = executor.map(self.download_file, unique_names)
+            return dict(zip(unique_names, contents))
+    
+    def upload_files(self, files: List[dict]) -> List[dict]:
+        """
+        Upload many files in parallel on a bounded worker pool
+        
+        Args:
+            files: Dicts with `name`, `data` (bytes, file-like or iterator
+                of bytes) and optional `content_type`
+            
+        Returns:
+            list: Upload results in input order
+        """
+        def upload(item: dict) -> dict:
+            content_type = item.get("content_type", "application/octet-stream")
+            if isinstance(item["data"], (bytes, bytearray)):
+                return self.upload_file(item["data"], item["name"], content_type)
+            return self.upload_stream(item["data"], item["name"], content_type)
+        
+        with ThreadPoolExecutor(max_workers=self.batch_workers) as executor:
+            return list(executor.map(upload, files))
+    
     def list_files(self, prefix: str = "") -> list:
         """
         List files in the bucket
         
+        Served from the metadata catalog once it is ready.
+        
         Args:
             prefix: Filter objects by prefix
             
         Returns:
             list: List of object names
         """
+        return [entry["name"] for entry in self.list_files_detailed(prefix)]
+    
+    def list_files_detailed(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        limit: Optional[int] = None,
+        **filters
+    ) -> list:
+        """
+        List files with their metadata
+        
+        Served from the metadata catalog once it is ready; otherwise from
+        a single list_objects pass (size, ETag and last-modified come with
+        the listing, so no per-object stat request is needed).
+        
+        Args:
+            prefix: Filter objects by prefix
+            start_after: Only return objects after this name (pagination cursor)
+            limit: Maximum number of entries to return
+            **filters: Further MetadataCatalog.query options (sort,
+                descending, offset, min_size, max_size, modified_after,
+                modified_before, suffix)
+            
+        Returns:
+            list: File metadata dicts (lexical order unless sorted otherwise)
+        """
+        if self.catalog is not None and self.catalog.ready:
+            return self.catalog.query(prefix, start_after, limit, **filters)
+        
         try:
-            objects = self.client.list_objects(self.bucket_name, prefix=prefix)
-            return [obj.object_name for obj in objects]
+            entries = self._list_live(prefix, start_after)
+            if filters:
+                return select_entries(entries, limit=limit, **filters)
+            return list(islice(entries, limit))
         except S3Error as e:
             logger.error(f"Error listing files: {e}")
             return []
     
+    def _list_live(self, prefix: str = "", start_after: Optional[str] = None) -> Iterator[dict]:
+        """Walk the bucket with list_objects (raises S3Error on failure)"""
+        # User metadata carries original sizes of compressed objects and content hashes
+        objects = self.client.list_objects(
+            self.bucket_name,
+            prefix=prefix,
+            start_after=start_after,
+            recursive=True,
+            include_user_meta=self.codec is not None or self.dedup
+        )
+        for obj in objects:
+            if obj.object_name.startswith(INTERNAL_PREFIX):
+                continue
+            _, original_size = codec_info(obj.metadata)
+            yield {
+                "name": obj.object_name,
+                "size": original_size if original_size is not None else obj.size,
+                "last_modified": obj.last_modified,
+                "content_type": None,
+                "etag": obj.etag,
+                "sha256": _content_hash(obj.metadata)
+            }
+    
+    def listen_bucket_events(self) -> Iterator[dict]:
+        """
+        Follow MinIO bucket notifications for changes made by any client
+        
+        Blocks while waiting for events; events have the same shape as
+        the ones passed to listeners (see add_listener).
+        
+        Yields:
+            dict: `put` or `delete` change events
+        """
+        with self._notification_client.listen_bucket_notification(
+            self.bucket_name,
+            events=("s3:ObjectCreated:*", "s3:ObjectRemoved:*")
+        ) as notifications:
+            for notification in notifications:
+                for record in notification.get("Records") or []:
+                    obj = record["s3"]["object"]
+                    name = unquote_plus(obj["key"])
+                    if name.startswith(INTERNAL_PREFIX):
+                        continue
+                    if record["eventName"].startswith("s3:ObjectCreated:"):
+                        event_time = record.get("eventTime")
+                        user_metadata = obj.get("userMetadata")
+                        _, original_size = codec_info(user_metadata)
+                        yield {
+                            "type": "put",
+                            "name": name,
+                            "size": original_size if original_size is not None else obj.get("size"),
+                            "etag": obj.get("eTag"),
+                            "content_type": obj.get("contentType"),
+                            "sha256": _content_hash(user_metadata),
+                            "last_modified": datetime.fromisoformat(
+                                event_time.replace("Z", "+00:00")
+                            ) if event_time else datetime.now(timezone.utc)
+                        }
+                    elif record["eventName"].startswith("s3:ObjectRemoved:"):
+                        yield {"type": "delete", "name": name}
+    
     def get_file_metadata(self, object_name: str) -> Optional[dict]:
         """
         Get metadata for a file
         
+        `size` is the original size; `stored_size` and `codec` differ
+        from it for objects compressed at rest. `sha256` is the content
+        hash recorded at upload (None for objects written elsewhere).
+        
         Args:
             object_name: Name of the object
             
@@ -169,18 +1402,26 @@ class StorageService:
             dict: File metadata or None if error
         """
         try:
-            stat = self.client.stat_object(self.bucket_name, object_name)
-            return {
-                "name": object_name,
-                "size": stat.size,
-                "last_modified": stat.last_modified,
-                "content_type": stat.content_type,
-                "etag": stat.etag
-            }
+            return self._stat(object_name)
         except S3Error as e:
             logger.error(f"Error getting file metadata: {e}")
             return None
     
+    def _stat(self, object_name: str) -> dict:
+        """Stat an object into a metadata dict (raises S3Error)"""
+        stat = self.client.stat_object(self.bucket_name, object_name)
+        codec, original_size = codec_info(stat.metadata)
+        return {
+            "name": object_name,
+            "size": original_size if original_size is not None else stat.size,
+            "stored_size": stat.size,
+            "codec": codec,
+            "sha256": _content_hash(stat.metadata),
+            "last_modified": stat.last_modified,
+            "content_type": stat.content_type,
+            "etag": stat.etag
+        }
+    
     def generate_presigned_url(
         self,
         object_name: str,
@@ -189,6 +1430,9 @@ class StorageService:
         """
         Generate a presigned URL for temporary file access
         
+        The URL serves the stored bytes, so objects compressed at rest
+        are returned compressed.
+        
         Args:
             object_name: Name of the object
             expires: URL expiration time
@@ -0,0 +1,178 @@
+"""
+Tool Memo Module
+Memoizes read-only tool results until the objects they read change
+"""
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+import logging
+
+from src.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class ToolMemo:
+    """
+    LRU of serialized tool results, invalidated by storage writes and deletes
+
+    A result is keyed by tool name and arguments and depends either on
+    named objects (read_file, query_file, ...) or on the whole bucket
+    (list_files, search_files, ...). A write or delete drops the results
+    depending on that object and every bucket-wide result. Changes made
+    by other clients are not seen as events, so entries also expire
+    after ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        max_entries: int = 1000,
+        max_total_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 30
+    ):
+        """
+        Initialize the memo and subscribe to storage changes
+
+        Args:
+            storage_service: Storage service whose changes invalidate results
+            max_entries: Maximum number of memoized results
+            max_total_bytes: Combined size of memoized results
+            ttl_seconds: Age after which a result is recomputed (0 disables expiry)
+        """
+        self.max_entries = max_entries
+        self.max_total_bytes = max_total_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (serialized result, object names or None for bucket-wide, stored at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, Optional[Tuple[str, ...]], float]]" = OrderedDict()
+        self._by_object: Dict[str, Set[Tuple[str, str]]] = {}
+        self._bucket_wide: Set[Tuple[str, str]] = set()
+        self._total_bytes = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        storage_service.add_listener(self._on_change)
+
+    def call(
+        self,
+        tool: str,
+        args: Any,
+        objects: Optional[Iterable[str]],
+        compute: Callable[[], Dict[str, Any]]
+    ) -> str:
+        """
+        Return a tool's JSON result, computing it only on a miss
+
+        Failed results are returned but not memoized.
+
+        Args:
+            tool: Tool name
+            args: JSON-serializable tool arguments
+            objects: Names of the objects the result is read from, or None
+                if it depends on the whole bucket
+            compute: Runs the tool and returns its result dict
+
+        Returns:
+            str: Result serialized with json.dumps
+        """
+        key = (tool, json.dumps(args, sort_keys=True, default=str))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl_seconds <= 0 or now - entry[2] < self.ttl_seconds):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            started = self._seq
+
+        result = compute()
+        value = json.dumps(result)
+        if not result.get("success"):
+            return value
+
+        with self._lock:
+            # A change during the call may not be reflected in the result
+            if self._seq != started or len(value) > self.max_total_bytes:
+                return value
+            if key in self._entries:
+                self._remove(key)
+            names = tuple(objects) if objects is not None else None
+            self._entries[key] = (value, names, now)
+            self._total_bytes += len(value)
+            if names is None:
+                self._bucket_wide.add(key)
+            else:
+                for name in names:
+                    self._by_object.setdefault(name, set()).add(key)
+            self._evict()
+        return value
+
+    def _remove(self, key: Tuple[str, str]):
+        """Drop one entry and its dependency records (lock held)"""
+        value, names, _ = self._entries.pop(key)
+        self._total_bytes -= len(value)
+        if names is None:
+            self._bucket_wide.discard(key)
+            return
+        for name in names:
+            keys = self._by_object.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_object[name]
+
+    def _evict(self):
+        """Drop least recently used entries until within bounds (lock held)"""
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or self._total_bytes > self.max_total_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _on_change(self, event: dict):
+        """Storage listener: drop results that may have read the changed object"""
+        with self._lock:
+            self._seq += 1
+            stale = self._by_object.get(event["name"], set()) | self._bucket_wide
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """Drop every memoized result"""
+        with self._lock:
+            self._seq += 1
+            self._entries.clear()
+            self._by_object.clear()
+            self._bucket_wide.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Memo counters for sizing
+
+        Returns:
+            dict: Entries, memory use, hit rate and eviction / invalidation counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
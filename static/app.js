@@ -2,6 +2,14 @@
 
 // State
 let isProcessing = false;
+let sessionId = null;
+
+// Files currently shown, by name; kept in sync by the change feed
+const filesByName = new Map();
+let renderPending = false;
+
+// Number of files requested per listing page
+const FILES_PAGE_SIZE = 1000;
 
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', () => {
@@ -10,14 +18,11 @@ document.addEventListener('DOMContentLoaded', () => {
     // Check server health
     checkHealth();
 
-    // Load initial files
-    loadFiles();
+    // Load files, then keep them current from the change feed
+    watchFileChanges();
 
     // Setup keyboard shortcuts
     setupKeyboardShortcuts();
-
-    // Auto-refresh files every 10 seconds
-    setInterval(loadFiles, 10000);
 });
 
 // Check server health
@@ -70,28 +75,50 @@ async function sendMessage() {
     isProcessing = true;
     updateSendButton(true);
 
+    let agentMessage = null;
+
     try {
-        const response = await fetch('/api/chat', {
+        const response = await fetch('/api/chat/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ message })
+            body: JSON.stringify({ message, session_id: sessionId })
         });
 
-        const data = await response.json();
+        if (!response.ok || !response.body) {
+            throw new Error(`HTTP ${response.status}`);
+        }
 
-        // Remove typing indicator
-        removeTypingIndicator(typingId);
+        // Render the reply incrementally as events arrive
+        await readEventStream(response.body, (event) => {
+            if (event.type === 'session') {
+                sessionId = event.session_id;
+                return;
+            }
+
+            if (!agentMessage) {
+                removeTypingIndicator(typingId);
+                agentMessage = createAgentMessage();
+            }
+
+            if (event.type === 'text') {
+                appendAgentText(agentMessage, event.text);
+            } else if (event.type === 'tool_call') {
+                setAgentStatus(agentMessage, `🔧 Running ${event.name}...`);
+            } else if (event.type === 'tool_result') {
+                setAgentStatus(agentMessage, `${event.success ? '✅' : '⚠️'} ${event.name} finished`);
+            } else if (event.type === 'error') {
+                appendAgentText(agentMessage, `Error: ${event.error}`);
+            }
+        });
 
-        if (data.success) {
-            // Add agent response
-            addMessageToChat('agent', data.response);
+        removeTypingIndicator(typingId);
 
-            // Refresh files list (in case files were created/modified)
-            setTimeout(loadFiles, 1000);
+        if (agentMessage) {
+            setAgentStatus(agentMessage, '');
         } else {
-            addMessageToChat('agent', `Error: ${data.error || 'Unknown error'}`);
+            addMessageToChat('agent', 'Error: Empty response from server');
         }
     } catch (error) {
         console.error('❌ Error sending message:', error);
@@ -104,6 +131,83 @@ async function sendMessage() {
     }
 }
 
+// Read a Server-Sent Events body, calling onEvent with each parsed JSON payload
+async function readEventStream(body, onEvent) {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            const data = frame
+                .split('\n')
+                .filter(line => line.startsWith('data:'))
+                .map(line => line.slice(5).trim())
+                .join('\n');
+
+            if (data) {
+                onEvent(JSON.parse(data));
+            }
+        }
+    }
+}
+
+// Create an empty agent message that streamed text is appended to
+function createAgentMessage() {
+    const chatContainer = document.getElementById('chatContainer');
+
+    const welcomeMessage = chatContainer.querySelector('.welcome-message');
+    if (welcomeMessage) {
+        welcomeMessage.remove();
+    }
+
+    const messageDiv = document.createElement('div');
+    messageDiv.className = 'chat-message agent';
+
+    const timeString = new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+
+    messageDiv.innerHTML = `
+        <div class="message-content">
+            <span class="message-label">🤖 Agent</span>
+            <span class="message-text"></span>
+            <span class="message-status"></span>
+            <span class="message-time">${timeString}</span>
+        </div>
+    `;
+
+    chatContainer.appendChild(messageDiv);
+    chatContainer.scrollTop = chatContainer.scrollHeight;
+
+    return {
+        text: messageDiv.querySelector('.message-text'),
+        status: messageDiv.querySelector('.message-status')
+    };
+}
+
+// Append streamed text to an agent message
+function appendAgentText(agentMessage, text) {
+    agentMessage.text.textContent += text;
+
+    const chatContainer = document.getElementById('chatContainer');
+    chatContainer.scrollTop = chatContainer.scrollHeight;
+}
+
+// Show tool progress under an agent message
+function setAgentStatus(agentMessage, status) {
+    agentMessage.status.textContent = status;
+}
+
 // Add message to chat UI
 function addMessageToChat(sender, text) {
     const chatContainer = document.getElementById('chatContainer');
@@ -177,8 +281,14 @@ function updateSendButton(disabled) {
     }
 }
 
-// Clear chat
+// Clear chat and start a new conversation
 function clearChat() {
+    if (sessionId) {
+        fetch(`/api/sessions/${encodeURIComponent(sessionId)}`, { method: 'DELETE' })
+            .catch(error => console.warn('⚠️ Failed to end session:', error));
+        sessionId = null;
+    }
+
     const chatContainer = document.getElementById('chatContainer');
     chatContainer.innerHTML = `
         <div class="welcome-message">
@@ -194,22 +304,82 @@ function clearChat() {
     `;
 }
 
-// Load files from storage
+// Load files from storage, following pagination cursors
 async function loadFiles() {
     try {
-        const response = await fetch('/api/files');
-        const data = await response.json();
-
-        if (data.success) {
-            updateFilesUI(data.files);
-        } else {
-            console.error('❌ Error loading files:', data.error);
-        }
+        let files = [];
+        let startAfter = null;
+
+        do {
+            const params = new URLSearchParams({ limit: FILES_PAGE_SIZE });
+            if (startAfter) {
+                params.set('start_after', startAfter);
+            }
+
+            const response = await fetch(`/api/files?${params}`);
+            const data = await response.json();
+
+            if (!data.success) {
+                console.error('❌ Error loading files:', data.error);
+                return;
+            }
+
+            files = files.concat(data.files);
+            startAfter = data.is_truncated ? data.next_start_after : null;
+        } while (startAfter);
+
+        filesByName.clear();
+        files.forEach(file => filesByName.set(file.name, file));
+        scheduleFilesRender();
     } catch (error) {
         console.error('❌ Error loading files:', error);
     }
 }
 
+// Follow /api/changes and apply each change to the file list
+function watchFileChanges() {
+    const source = new EventSource('/api/changes');
+
+    source.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+
+        if (event.type === 'ready' || event.type === 'reset') {
+            // (Re)connected or fell behind: start from a fresh listing
+            loadFiles();
+        } else if (event.type === 'put') {
+            filesByName.set(event.name, {
+                name: event.name,
+                size: event.size,
+                last_modified: event.last_modified,
+                etag: event.etag
+            });
+            scheduleFilesRender();
+        } else if (event.type === 'delete') {
+            filesByName.delete(event.name);
+            scheduleFilesRender();
+        }
+    };
+
+    source.onerror = () => {
+        // EventSource reconnects on its own and gets a fresh 'ready' event
+        console.warn('⚠️ Change feed disconnected, reconnecting...');
+    };
+}
+
+// Re-render the file list at most once per frame
+function scheduleFilesRender() {
+    if (renderPending) {
+        return;
+    }
+    renderPending = true;
+    requestAnimationFrame(() => {
+        renderPending = false;
+        const files = Array.from(filesByName.values())
+            .sort((a, b) => (a.name < b.name ? -1 : a.name > b.name ? 1 : 0));
+        updateFilesUI(files);
+    });
+}
+
 // Update files UI
 function updateFilesUI(files) {
     const filesList = document.getElementById('filesList');
@@ -264,7 +434,10 @@ async function viewFile(filename) {
         const response = await fetch(`/api/files/${encodeURIComponent(filename)}`);
         const data = await response.json();
 
-        if (data.success) {
+        if (data.success && data.binary) {
+            // Binary content is not inlined in JSON; show the raw bytes instead
+            window.open(data.raw_url, '_blank');
+        } else if (data.success) {
             showFileModal(data.filename, data.content);
         } else {
             alert(`Error: ${data.error || 'Failed to load file'}`);
@@ -290,7 +463,7 @@ async function deleteFile(filename) {
 
         if (data.success) {
             console.log(`✅ Deleted: ${filename}`);
-            loadFiles(); // Refresh files list
+            // The change feed removes it from the list
         } else {
             alert(`Error: ${data.message || 'Failed to delete file'}`);
         }
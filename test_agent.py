@@ -6,7 +6,7 @@ import sys
 sys.path.append('.')
 
 from src.agent import Agent
-from src.storage_service import StorageService
+from src.storage_service import get_storage_service
 from config.settings import load_settings
 import logging
 
@@ -32,13 +32,7 @@ def test_agent():
     
     # Initialize storage
     print("2️⃣ Connecting to storage...")
-    storage = StorageService(
-        endpoint=settings.minio_endpoint,
-        access_key=settings.minio_access_key,
-        secret_key=settings.minio_secret_key,
-        bucket_name=settings.minio_bucket_name,
-        secure=settings.minio_secure
-    )
+    storage = get_storage_service(settings)
     print("✅ Storage connected\n")
     
     # Initialize agent
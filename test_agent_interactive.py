@@ -3,10 +3,11 @@ Interactive AI Agent Test
 Chat with the AI agent in real-time
 """
 import sys
+import uuid
 sys.path.append('.')
 
 from src.agent import Agent
-from src.storage_service import StorageService
+from src.storage_service import get_storage_service
 from config.settings import load_settings
 import logging
 
@@ -36,13 +37,7 @@ def main():
     # Initialize storage
     print("🗄️  Connecting to storage...")
     try:
-        storage = StorageService(
-            endpoint=settings.minio_endpoint,
-            access_key=settings.minio_access_key,
-            secret_key=settings.minio_secret_key,
-            bucket_name=settings.minio_bucket_name,
-            secure=settings.minio_secure
-        )
+        storage = get_storage_service(settings)
         print("✅ Storage connected\n")
     except Exception as e:
         print(f"❌ Error connecting to storage: {e}")
@@ -71,6 +66,9 @@ def main():
     print("  - Write a report about AI trends to report.txt")
     print()
 
+    # One session for the whole CLI run so follow-ups keep their context
+    session_id = uuid.uuid4().hex
+
     while True:
         try:
             # Get user input
@@ -86,7 +84,7 @@ def main():
 
             # Process with agent
             print()
-            response = agent.chat(user_input)
+            response = agent.chat(user_input, session_id=session_id)
             print(f"\n🤖 Agent: {response}\n")
 
         except KeyboardInterrupt:
@@ -0,0 +1,172 @@
+"""
+Test script for Parquet sidecars
+Queries must return the same rows whether a file is read from its
+sidecar or parsed directly; runs against in-memory files, no MinIO needed
+"""
+import sys
+import json
+import tempfile
+sys.path.append('.')
+
+from src.file_query import FileQuery
+from src.columnar_cache import ColumnarCache, pyarrow
+from test_file_query import FakeStorage
+
+
+CSV_DATA = (
+    b"id,name,price,qty,note,zip\n"
+    b"1,apple,1.5,3,NA,00501\n"
+    b"2,Banana,0.25,,null,12\n"
+    b"3,carrot,,7,N/A,x\n"
+    b"4,dates,3,1,,7\n"
+    b"5,eggplant,2,10,\"\",8\n"
+)
+
+JSONL_DATA = b"\n".join(json.dumps(row).encode() for row in [
+    {"a": 1, "b": "x", "ok": True},
+    {"a": 5, "b": None, "ok": False},
+    {"a": 3, "b": "y", "ok": None},
+]) + b"\n"
+
+TABULAR_QUERIES = [
+    {},
+    {"columns": ["name", "note"], "where": "note == None"},
+    {"columns": ["id", "qty"], "where": "qty > 2", "order_by": "qty desc"},
+    {"columns": ["name", "zip"], "where": "zip == 12 or zip == 'x' or zip == '00501'"},
+    {"columns": ["id"], "where": "price >= 2 and name in ('eggplant', 'dates')"},
+    {"columns": ["name"], "where": "price == 3 or price == '3'"},
+    {"aggregates": ["count(*)", "count(price)", "sum(qty)", "avg(price)", "max(note)"]},
+]
+
+JSONL_QUERIES = [
+    {},
+    {"columns": ["a", "b"], "where": "a >= 3", "order_by": "a desc"},
+    {"columns": ["a"], "where": "ok == True or b == None"},
+    {"aggregates": ["sum(a)", "count(b)", "min(b)"]},
+]
+
+# JSONL rows Parquet would hand back changed
+ODD_JSONL = [
+    [{"a": 1}, {"a": 2.5}],
+    [{"a": 1}, {"a": "x"}],
+    [{"a": {"x": 1}}, {"a": {"y": 2}}],
+    [{"a": [1, 2]}],
+    [{"a": 1, "b": 2}, {"a": 3}],
+]
+
+
+def mismatches(storage, cache, filename, queries):
+    """Queries whose rows differ between the sidecar and parsing the file"""
+    if not cache.convert(filename):
+        return [f"{filename} was not converted"]
+    failed = []
+    for query in queries:
+        from_sidecar = FileQuery(storage, columnar=cache).query(filename, **query)
+        parsed = FileQuery(storage).query(filename, **query)
+        typed = [[type(value) for value in row] for row in from_sidecar.get("rows", [])]
+        if (not from_sidecar["success"]
+                or from_sidecar["columns"] != parsed["columns"]
+                or from_sidecar["rows"] != parsed["rows"]
+                or typed != [[type(value) for value in row] for row in parsed["rows"]]
+                or from_sidecar["truncated"] != parsed["truncated"]):
+            failed.append(query)
+    return failed
+
+
+def test_columnar_cache():
+    """Test sidecar parity, numeric pushdown and refusal of lossy JSONL"""
+    
+    print("🗂️ Testing Parquet sidecars...\n")
+    
+    if pyarrow is None:
+        print("⚠️ pyarrow is not installed, skipping sidecar tests")
+        return
+    
+    storage = FakeStorage({
+        "items.csv": CSV_DATA,
+        "items.tsv": CSV_DATA.replace(b",", b"\t"),
+        "events.jsonl": JSONL_DATA,
+    })
+    cache_dir = tempfile.TemporaryDirectory()
+    cache = ColumnarCache(storage, cache_dir.name)
+    
+    # Test 1: CSV and TSV sidecars return the parsed rows
+    print("1️⃣ Testing CSV/TSV parity...")
+    failed = mismatches(storage, cache, "items.csv", TABULAR_QUERIES)
+    failed += mismatches(storage, cache, "items.tsv", TABULAR_QUERIES)
+    if not failed:
+        print("✅ Same rows and types from sidecars and parsing\n")
+    else:
+        print(f"❌ Sidecar rows differ for: {failed}\n")
+    
+    # Test 2: Only columns of numbers are stored as numbers
+    print("2️⃣ Testing column types...")
+    schema = pyarrow.parquet.read_schema(cache._local_path("items.csv"))
+    types = {field.name: str(field.type) for field in schema}
+    expected = {
+        "id": "int64", "name": "string", "price": "double",
+        "qty": "int64", "note": "string", "zip": "string"
+    }
+    if types == expected:
+        print("✅ Numeric columns typed, text markers kept as text\n")
+    else:
+        print(f"❌ Column types were {types}\n")
+    
+    # Test 3: Numeric conditions are pushed into the Parquet scan
+    print("3️⃣ Testing numeric pushdown...")
+    from_sidecar = FileQuery(storage, columnar=cache).query("items.csv", columns=["id"], where="qty > 2")
+    if from_sidecar["rows"] == [[1], [3], [5]] and from_sidecar["rows_scanned"] == 3:
+        print("✅ Only matching rows were read from the sidecar\n")
+    else:
+        print(f"❌ Pushdown failed: {from_sidecar}\n")
+    
+    # Test 4: Large files are converted in batches
+    print("4️⃣ Testing a multi-batch CSV...")
+    lines = [b"n,signed,ratio,mixed"]
+    for n in range(50000):
+        mixed = f"{n}.5" if n % 3 else str(n)
+        lines.append(f"{n},+{n},{n / 7:.4f},{mixed}".encode())
+    storage.put("large.csv", b"\n".join(lines) + b"\n")
+    failed = mismatches(storage, cache, "large.csv", [
+        {"where": "n >= 49990", "limit": 20},
+        {"where": "signed < 5 or mixed == 49998"},
+        {"aggregates": ["count(*)", "sum(n)", "max(ratio)", "sum(mixed)"]},
+    ])
+    if not failed:
+        print("✅ Same rows from a sidecar built over several batches\n")
+    else:
+        print(f"❌ Large CSV rows differ for: {failed}\n")
+    
+    # Test 5: JSONL sidecars return the parsed rows
+    print("5️⃣ Testing JSONL parity...")
+    failed = mismatches(storage, cache, "events.jsonl", JSONL_QUERIES)
+    if not failed:
+        print("✅ Same rows from the JSONL sidecar and parsing\n")
+    else:
+        print(f"❌ Sidecar rows differ for: {failed}\n")
+    
+    # Test 6: JSONL that Parquet would change is left to the parser
+    print("6️⃣ Testing lossy JSONL is not converted...")
+    converted = []
+    for index, rows in enumerate(ODD_JSONL):
+        name = f"odd{index}.jsonl"
+        storage.put(name, b"\n".join(json.dumps(row).encode() for row in rows))
+        if (cache.convert(name)
+                or cache.open(name, storage.get_file_metadata(name)["etag"]) is not None
+                or not FileQuery(storage, columnar=cache).query(name)["success"]):
+            converted.append(rows)
+    if not converted:
+        print("✅ Lossy JSONL queried by parsing\n")
+    else:
+        print(f"❌ Converted lossy JSONL: {converted}\n")
+    
+    cache.close()
+    cache_dir.cleanup()
+    
+    print("=" * 50)
+    print("🎉 All tests completed!")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    test_columnar_cache()
@@ -0,0 +1,207 @@
+"""
+Test script for the query_file engine
+Runs against in-memory files, no MinIO needed
+"""
+import sys
+import json
+import hashlib
+sys.path.append('.')
+
+from src.file_query import FileQuery, QueryError, compile_where
+
+
+CSV_DATA = (
+    b"id,name,price,cat\n"
+    b"1,apple,1.5,fruit\n"
+    b"2,Banana,0.25,fruit\n"
+    b"3,carrot,,veg\n"
+    b"4,dates,3,fruit\n"
+    b"5,eggplant,2,veg\n"
+)
+
+TIES_DATA = b"id,score\n1,5\n2,7\n3,5\n4,7\n5,5\n6,1\n"
+
+JSONL_DATA = b"\n".join(
+    json.dumps(row).encode() for row in [{"a": 1, "b": "x"}, {"a": 5, "b": "y"}, {"a": 3}]
+) + b"\n"
+
+UNSAFE_WHERE = [
+    "__import__('os').system('true')",
+    "name.upper() == 'X'",
+    "name[0] == 'a'",
+    "(lambda: 1)()",
+    "[x for x in name]",
+    "open('/etc/passwd')",
+    "__builtins__",
+]
+
+
+class FakeStorage:
+    """In-memory stand-in for StorageService, streaming in small chunks"""
+
+    bucket_name = "test"
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.internal = {}
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def put(self, name, data):
+        self.files[name] = data
+
+    def get_file_metadata(self, name):
+        if name not in self.files:
+            return None
+        data = self.files[name]
+        return {"etag": hashlib.md5(data).hexdigest(), "size": len(data)}
+
+    def download_stream(self, name, fill_cache=True):
+        if name not in self.files:
+            return None
+        data = self.files[name]
+        return (data[i:i + 7] for i in range(0, len(data), 7))
+
+    def put_internal(self, name, data, metadata=None):
+        self.internal[name] = (data, dict(metadata or {}))
+
+    def get_internal(self, name):
+        return self.internal.get(name)
+
+    def remove_internal(self, name):
+        self.internal.pop(name, None)
+
+
+def test_file_query():
+    """Test filtering, aggregation, ordering and the where sandbox"""
+    
+    print("🧮 Testing query_file engine...\n")
+    
+    querier = FileQuery(FakeStorage({
+        "products.csv": CSV_DATA,
+        "ties.csv": TIES_DATA,
+        "events.jsonl": JSONL_DATA,
+        "doc.json": json.dumps({"items": [{"a": 1}, {"a": 2}]}).encode(),
+        "table.tsv": b"x\ty\n1\t2\n",
+    }))
+    
+    # Test 1: Filter with numbers coerced from CSV text
+    print("1️⃣ Testing filters...")
+    result = querier.query("products.csv", columns=["name"], where="price > 1")
+    if result["success"] and result["rows"] == [["apple"], ["dates"], ["eggplant"]] and result["rows_scanned"] == 5:
+        print("✅ Filtered rows by a numeric column\n")
+    else:
+        print(f"❌ Filter failed: {result}\n")
+    
+    # Test 2: Where functions and boolean logic
+    print("2️⃣ Testing where functions...")
+    result = querier.query("products.csv", columns=["name"], where="lower(name) == 'banana' or cat == 'veg'")
+    if result["rows"] == [["Banana"], ["carrot"], ["eggplant"]]:
+        print("✅ Functions and boolean operators evaluated\n")
+    else:
+        print(f"❌ Where functions failed: {result}\n")
+    
+    # Test 3: Group by with aggregates
+    print("3️⃣ Testing group by...")
+    result = querier.query(
+        "products.csv",
+        group_by=["cat"],
+        aggregates=["count(*)", "count(price)", "sum(price)", "max(name)"],
+        order_by="cat"
+    )
+    if (result["columns"] == ["cat", "count(*)", "count(price)", "sum(price)", "max(name)"]
+            and result["rows"] == [["fruit", 3, 3, 4.75, "dates"], ["veg", 2, 1, 2, "eggplant"]]):
+        print("✅ Groups aggregated\n")
+    else:
+        print(f"❌ Group by failed: {result}\n")
+    
+    # Test 4: Missing values sort last in both directions
+    print("4️⃣ Testing ordering of missing values...")
+    last = [
+        querier.query("products.csv", columns=["name", "price"], order_by=order_by)["rows"][-1]
+        for order_by in ("price", "price desc")
+    ]
+    if last == [["carrot", None], ["carrot", None]]:
+        print("✅ Missing values sorted last\n")
+    else:
+        print(f"❌ Missing values sorted as {last}\n")
+    
+    # Test 5: Sorted limits keep the best rows, earlier rows first on ties
+    print("5️⃣ Testing sorted limits...")
+    best = querier.query("products.csv", columns=["name", "price"], order_by="-price", limit=2)
+    ascending = querier.query("ties.csv", columns=["id", "score"], order_by="score", limit=4)
+    descending = querier.query("ties.csv", columns=["id", "score"], order_by="score desc", limit=4)
+    if (best["rows"] == [["dates", 3], ["eggplant", 2]] and best["truncated"]
+            and [row[0] for row in ascending["rows"]] == [6, 1, 3, 5]
+            and [row[0] for row in descending["rows"]] == [2, 4, 1, 3]):
+        print("✅ Top rows kept, ties in file order\n")
+    else:
+        print(f"❌ Sorted limit failed: {best['rows']}, {ascending['rows']}, {descending['rows']}\n")
+    
+    # Test 6: Limits passed as floats by function calls
+    print("6️⃣ Testing float limits...")
+    result = querier.query("products.csv", columns=["id"], limit=2.0)
+    if result["rows"] == [[1], [2]] and result["truncated"]:
+        print("✅ Float limit applied\n")
+    else:
+        print(f"❌ Float limit failed: {result}\n")
+    
+    # Test 7: Other formats
+    print("7️⃣ Testing JSONL, JSON and TSV...")
+    jsonl = querier.query("events.jsonl", columns=["a"], where="a >= 3", order_by="a desc")["rows"]
+    json_doc = querier.query("doc.json", aggregates=["sum(a)"])["rows"]
+    tsv = querier.query("table.tsv")["rows"]
+    if jsonl == [[5], [3]] and json_doc == [[3]] and tsv == [[1, 2]]:
+        print("✅ All formats queried\n")
+    else:
+        print(f"❌ Formats failed: {jsonl}, {json_doc}, {tsv}\n")
+    
+    # Test 8: Errors are reported, not raised
+    print("8️⃣ Testing error reporting...")
+    unknown = querier.query("products.csv", where="nope > 1")
+    if (not querier.query("missing.csv")["success"]
+            and not querier.query("image.bin")["success"]
+            and not unknown["success"] and "nope" in unknown["error"]):
+        print("✅ Errors returned in the result\n")
+    else:
+        print(f"❌ Error reporting failed: {unknown}\n")
+    
+    # Test 9: The where sandbox
+    print("9️⃣ Testing where sandbox...")
+    allowed = []
+    for where in UNSAFE_WHERE:
+        try:
+            compile_where(where)
+            allowed.append(where)
+        except QueryError:
+            pass
+    predicate, columns = compile_where("contains(name, 'an') and not price in (1, 2)")
+    if (not allowed and columns == ["name", "price"]
+            and predicate({"name": "banana", "price": 3})
+            and not predicate({"name": "banana", "price": 2})
+            and not predicate({"name": "kiwi", "price": None})):
+        print("✅ Unsafe expressions refused, allowed ones evaluated\n")
+    else:
+        print(f"❌ Sandbox failed, allowed: {allowed}\n")
+    
+    # Test 10: Backticked column names
+    print("1️⃣0️⃣ Testing backticked columns...")
+    predicate, columns = compile_where("`unit price` > 10 and `__column_1` == 'x'")
+    result = querier.query("products.csv", columns=["name"], where="`price` >= 2 and `cat` == 'veg'")
+    if (columns == ["unit price", "__column_1"]
+            and predicate({"unit price": 12, "__column_1": "x"})
+            and not predicate({"unit price": 8, "__column_1": "x"})
+            and result["rows"] == [["eggplant"]]):
+        print("✅ Backticked names resolved\n")
+    else:
+        print(f"❌ Backticked columns failed: {columns}, {result}\n")
+    
+    print("=" * 50)
+    print("🎉 All tests completed!")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    test_file_query()
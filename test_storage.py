@@ -6,6 +6,7 @@ import sys
 sys.path.append('.')
 
 from src.storage_service import StorageService
+from src.file_search import FileSearcher
 import time
 
 def test_storage_service():
@@ -97,6 +98,71 @@ def test_storage_service():
     else:
         print("❌ File still exists\n")
     
+    # Test 7: Streaming multipart upload
+    print("9️⃣ Testing streaming multipart upload...")
+    chunk = b"x" * (1024 * 1024)
+    result = storage.upload_stream(
+        (chunk for _ in range(11)),
+        "test_stream.bin",
+        part_size=5 * 1024 * 1024
+    )
+    if result["success"] and result["size"] == 11 * len(chunk):
+        print(f"✅ Streamed upload: {result['size']} bytes in 3 parts\n")
+    else:
+        print(f"❌ Streaming upload failed: {result.get('error')}\n")
+    storage.delete_file("test_stream.bin")
+    
+    # Test 8: Ranged streaming download
+    print("🔟 Testing ranged streaming download...")
+    storage.upload_file(b"0123456789", "test_range.txt", "text/plain")
+    chunks = storage.download_stream("test_range.txt", offset=2, length=5)
+    if chunks is not None and b"".join(chunks) == b"23456":
+        print("✅ Range read returned bytes 2-6\n")
+    else:
+        print("❌ Range read failed\n")
+    storage.delete_file("test_range.txt")
+    
+    # Test 9: Batch upload, download and delete
+    print("1️⃣1️⃣ Testing batch operations...")
+    names = [f"test_batch_{i}.txt" for i in range(5)]
+    uploads = storage.upload_files([
+        {"name": name, "data": name.encode(), "content_type": "text/plain"}
+        for name in names
+    ])
+    contents = storage.download_files(names)
+    deleted = storage.delete_files(names)
+    if (all(u["success"] for u in uploads)
+            and all(contents[name] == name.encode() for name in names)
+            and deleted["success"] and len(deleted["deleted"]) == len(names)):
+        print(f"✅ Uploaded, downloaded and deleted {len(names)} files in batches\n")
+    else:
+        print(f"❌ Batch operations failed: {deleted['errors']}\n")
+    
+    # Test 10: Server-side search
+    print("1️⃣2️⃣ Testing server-side search...")
+    storage.upload_file(b"alpha\nneedle here\nomega\n", "test_search.txt", "text/plain")
+    result = FileSearcher(storage).search("needle", prefix="test_search", context_lines=1)
+    storage.delete_file("test_search.txt")
+    if (result["success"] and result["count"] == 1
+            and result["matches"][0]["line_number"] == 2
+            and result["matches"][0]["before"] == ["alpha"]):
+        print("✅ Found the matching line with context\n")
+    else:
+        print(f"❌ Search failed: {result}\n")
+    
+    # Test 11: Patterns that backtrack exponentially are refused
+    print("1️⃣3️⃣ Testing search pattern limits...")
+    searcher = FileSearcher(storage)
+    refused = [
+        pattern for pattern in ["(a+)+$", "(a|a)*b", "(a|aa)*b", "(.|a)*b"]
+        if not searcher.search(pattern, prefix="test_search")["success"]
+    ]
+    accepted = searcher.search("(foo|bar)+|(a|ab)*c", prefix="test_search")["success"]
+    if len(refused) == 4 and accepted:
+        print("✅ Ambiguous patterns refused, safe ones accepted\n")
+    else:
+        print(f"❌ Pattern limits failed: refused {refused}, accepted safe pattern: {accepted}\n")
+    
     print("=" * 50)
     print("🎉 All tests completed!")
     print("=" * 50)